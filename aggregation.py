@@ -0,0 +1,100 @@
+"""One-pass aggregation of a user's ledger into the figures the dashboards show.
+
+Rows are (year, month, transaction_type, category, amount_paise, last_date) tuples:
+monthly rollup rows, transactions grouped the same way, or single transactions
+through transaction_rows(). Amounts stay in integer paise; callers convert them
+for display.
+
+bucket_series() buckets (day, transaction_type, category, amount_paise) rows of an
+arbitrary date window into day, week, month, quarter or year series instead.
+"""
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+
+BUCKETS = ('day', 'week', 'month', 'quarter', 'year')
+
+
+def transaction_rows(transactions):
+    """Rows of individual transactions (anything with date, transaction_type, category and amount_paise)"""
+    for transaction in transactions:
+        if transaction.date is not None:
+            date = transaction.date
+            yield date.year, date.month, transaction.transaction_type, transaction.category, transaction.amount_paise, date
+
+
+def aggregate(rows, now, default_category=None):
+    """All-time and current-month totals per type, expense categories and per-month totals from one pass over rows"""
+    totals = {}
+    months = {}
+    categories = {}
+    for year, month, transaction_type, category, amount_paise, last_date in rows:
+        totals[transaction_type] = totals.get(transaction_type, 0) + amount_paise
+        month_totals = months.get((year, month))
+        if month_totals is None:
+            month_totals = months[(year, month)] = {}
+        month_totals[transaction_type] = month_totals.get(transaction_type, 0) + amount_paise
+        if transaction_type == 'expense':
+            if default_category is not None:
+                category = category or default_category
+            previous = categories.get(category)
+            if previous is None:
+                categories[category] = (amount_paise, last_date)
+            else:
+                categories[category] = (previous[0] + amount_paise, max(previous[1], last_date))
+    # Most recently used category first; ties keep the order they were first seen in
+    ordered = sorted(categories.items(), key=lambda item: item[1][1], reverse=True)
+    return {
+        'totals': totals,
+        'current_month': months.get((now.year, now.month), {}),
+        'categories': {category: paise for category, (paise, _) in ordered},
+        'months': months,
+    }
+
+
+def bucket_start(day, bucket):
+    """First day of the bucket a date falls in; weeks start on Monday"""
+    if bucket == 'day':
+        return day
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    if bucket == 'quarter':
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    if bucket == 'year':
+        return day.replace(month=1, day=1)
+    raise ValueError(f'Unknown bucket: {bucket}')
+
+
+def bucket_step(bucket):
+    """Distance from one bucket start to the next"""
+    return {
+        'day': relativedelta(days=1),
+        'week': relativedelta(weeks=1),
+        'month': relativedelta(months=1),
+        'quarter': relativedelta(months=3),
+        'year': relativedelta(years=1),
+    }[bucket]
+
+
+def bucket_starts(start, end, bucket):
+    """Start of every bucket overlapping the dates [start, end), the first one possibly before start"""
+    step = bucket_step(bucket)
+    current = bucket_start(start, bucket)
+    while current < end:
+        yield current
+        current += step
+
+
+def bucket_series(rows, start, end, bucket, default_category=None):
+    """Per-bucket totals per type and expense categories of rows dated in [start, end), with empty buckets kept"""
+    series = {current: {'totals': {}, 'categories': {}} for current in bucket_starts(start, end, bucket)}
+    for day, transaction_type, category, amount_paise in rows:
+        figures = series[bucket_start(day, bucket)]
+        figures['totals'][transaction_type] = figures['totals'].get(transaction_type, 0) + amount_paise
+        if transaction_type == 'expense':
+            if default_category is not None:
+                category = category or default_category
+            figures['categories'][category] = figures['categories'].get(category, 0) + amount_paise
+    return series
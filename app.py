@@ -1,15 +1,54 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from flask.cli import AppGroup
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from datetime import datetime
+from sqlalchemy import case, event, extract, func, inspect, literal, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.hybrid import hybrid_property
+import click
+from datetime import MAXYEAR, date, datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from dateutil.relativedelta import relativedelta
 from werkzeug.security import generate_password_hash, check_password_hash
+from aggregation import BUCKETS, aggregate, bucket_series, bucket_starts
 import re
+import base64
+import binascii
 import pandas as pd
 import numpy as np
 from functools import lru_cache
+from contextlib import contextmanager
 import json
+import hashlib
+import hmac
 import os
+import copy
+import shutil
+import csv
+import io
+import time
+import threading
+import bisect
+import itertools
+import multiprocessing
+import sqlite3
+import cProfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import pyinstrument
+except ImportError:  # optional, only used for ?profile=pyinstrument
+    pyinstrument = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional, only used for `flask analytics build --format parquet`
+    pyarrow = None
 
 # Telugu translations dictionary
 TRANSLATIONS = {
@@ -65,7 +104,8 @@ TRANSLATIONS = {
         'or_continue_with': 'Or continue with',
         'google': 'Google',
         'apple': 'Apple',
-        'invalid_credentials': 'Invalid email or password'
+        'invalid_credentials': 'Invalid email or password',
+        'login_busy': 'Too many people are logging in right now. Please try again in a moment.'
     },
     'te': {
         'choose_account_type': 'మీ ఖాతా రకాన్ని ఎంచుకోండి',
@@ -119,18 +159,131 @@ TRANSLATIONS = {
         'or_continue_with': 'లేదా వీటితో కొనసాగించండి',
         'google': 'గూగుల్',
         'apple': 'ఆపిల్',
-        'invalid_credentials': 'చెల్లని ఇమెయిల్ లేదా పాస్‌వర్డ్'
+        'invalid_credentials': 'చెల్లని ఇమెయిల్ లేదా పాస్‌వర్డ్',
+        'login_busy': 'ప్రస్తుతం చాలా మంది లాగిన్ అవుతున్నారు. దయచేసి కొద్దిసేపటి తర్వాత మళ్లీ ప్రయత్నించండి.'
     }
 }
 
+# Parsed CSV analytics kept per dataset file; older versions are evicted first
+ANALYTICS_CACHE_SIZE = 8
+# Per-entity analytics kept across users and dataset versions
+ENTITY_ANALYTICS_CACHE_SIZE = 1024
+# Datasets smaller than this are not worth splitting across worker processes
+ANALYTICS_PARTITION_MIN_ROWS = 200000
+# Rows read at a time while converting a dataset CSV to columnar files
+COLUMNAR_CONVERSION_CHUNK_SIZE = 100000
+TRANSACTION_TYPES = ('income', 'expense')
+# Grouped rows fetched at a time by the offline analytics build
+ANALYTICS_BUILD_FETCH_SIZE = 10000
+# Per-row errors returned by the import endpoint; the total count is always reported
+IMPORT_MAX_REPORTED_ERRORS = 100
+
 def get_text(key, lang='en'):
     """Get text in specified language"""
     return TRANSLATIONS.get(lang, TRANSLATIONS['en']).get(key, TRANSLATIONS['en'].get(key, key))
 
+# Database configuration
+SQLITE_JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SQLITE_SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+def sqlite_pragmas(config):
+    """PRAGMA statements applied to every new SQLite connection, validated since they are formatted into SQL"""
+    journal_mode = str(config['SQLITE_JOURNAL_MODE']).upper()
+    synchronous = str(config['SQLITE_SYNCHRONOUS']).upper()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f'Unsupported SQLITE_JOURNAL_MODE: {journal_mode}')
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f'Unsupported SQLITE_SYNCHRONOUS: {synchronous}')
+    return [
+        f'PRAGMA busy_timeout = {int(config["SQLITE_BUSY_TIMEOUT"])}',
+        f'PRAGMA journal_mode = {journal_mode}',
+        f'PRAGMA synchronous = {synchronous}',
+        f'PRAGMA cache_size = {int(config["SQLITE_CACHE_SIZE"])}',
+        f'PRAGMA mmap_size = {int(config["SQLITE_MMAP_SIZE"])}',
+    ]
+
+def engine_options(config):
+    """SQLAlchemy engine options for the configured database URL"""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            return options  # Flask-SQLAlchemy shares one in-memory connection
+        # SQLAlchemy 1.4 defaults file databases to NullPool, which reconnects and reruns the pragmas on every checkout
+        options.setdefault('poolclass', QueuePool)
+        connect_args = dict(options.get('connect_args') or {})
+        connect_args.setdefault('check_same_thread', False)
+        connect_args.setdefault('timeout', config['SQLITE_BUSY_TIMEOUT'] / 1000)
+        options['connect_args'] = connect_args
+    if options.get('poolclass', QueuePool) is QueuePool:
+        options.setdefault('pool_size', config['DATABASE_POOL_SIZE'])
+        options.setdefault('max_overflow', config['DATABASE_MAX_OVERFLOW'])
+        options.setdefault('pool_timeout', config['DATABASE_POOL_TIMEOUT'])
+        options.setdefault('pool_recycle', config['DATABASE_POOL_RECYCLE'])
+        options.setdefault('pool_pre_ping', url.get_backend_name() != 'sqlite')
+    return options
+
+@event.listens_for(Engine, 'connect')
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for pragma in sqlite_pragmas(app.config):
+        cursor.execute(pragma)
+    cursor.close()
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///finance.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///finance.db')
 app.config['PERMANENT_SESSION_LIFETIME'] = 1800  # 30 minutes
+app.config['TRANSACTIONS_PAGE_SIZE'] = 50  # transactions per page on dashboards and /api/transactions
+app.config['TRANSACTIONS_MAX_PAGE_SIZE'] = 200
+app.config['RANGE_MAX_BUCKETS'] = 1000  # buckets one /api/v1/analytics/range request may ask for
+app.config['DATASET_DIR'] = os.environ.get('DATASET_DIR', 'dataset')
+app.config['CROP_YIELD_EXTRA_STATS'] = []  # e.g. ['std', 'count'] for extra per-crop yield statistics
+app.config['DATASET_ENTITY_COLUMNS'] = {'agriculture.csv': 'Farm_ID', 'company.csv': None, 'person.csv': 'Person_ID'}  # column matched against User.dataset_id
+app.config['CSV_CHUNK_SIZE'] = None  # rows per chunk when streaming dataset CSVs; None reads whole files
+app.config['COLUMNAR_CACHE'] = True  # read datasets from typed .npy column files converted once from the CSVs
+app.config['COLUMNAR_CACHE_DIR'] = None  # defaults to a .columnar directory next to the CSVs
+app.config['IMPORT_BATCH_SIZE'] = 5000  # rows inserted and committed together by bulk imports
+app.config['DASHBOARD_CACHE_ENABLED'] = True
+app.config['DASHBOARD_CACHE_SIZE'] = 1024  # entries in the in-process dashboard cache
+app.config['DASHBOARD_CACHE_TTL'] = 300  # seconds
+app.config['DASHBOARD_CACHE_HTML'] = False  # also cache the rendered HTML, not just the computed context
+app.config['DASHBOARD_ASYNC_CHARTS'] = False  # render the dashboard shell at once and load charts from /api/v1/analytics
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')  # werkzeug method, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'; older hashes are replaced at login
+app.config['PASSWORD_HASH_SALT_LENGTH'] = 16
+app.config['PASSWORD_HASH_POOL'] = None  # 'thread' or 'process' to hash and verify passwords off the request thread; None hashes inline
+app.config['PASSWORD_HASH_WORKERS'] = 2  # passwords hashed at the same time by the pool
+app.config['PASSWORD_HASH_MAX_PENDING'] = 32  # logins waiting for or running in the pool; more are turned away
+app.config['PASSWORD_HASH_QUEUE_TIMEOUT'] = 5  # seconds a login waits for a pending slot
+app.config['USER_CACHE_ENABLED'] = True  # serve the per-request user lookup from an in-process cache
+app.config['USER_CACHE_SIZE'] = 4096  # users held by the identity cache
+app.config['USER_CACHE_TTL'] = 60  # seconds; bounds how long other processes can serve a changed user
+app.config['DASHBOARD_CACHE_BACKEND'] = None  # shared backend with get/set/delete/incr; None uses an in-process TTLCache
+app.config['METRICS_ENABLED'] = True  # collect latency histograms and cache counters
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')  # bearer token /metrics requires; None keeps the endpoint off
+app.config['METRICS_BUCKETS'] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # seconds
+app.config['SERVER_TIMING'] = True  # per-stage timings in a Server-Timing response header
+app.config['PROFILING_ENABLED'] = False  # allow X-Profile: 1 or ?profile=1 (or =pyinstrument) to dump a per-request profile
+app.config['PROFILE_DIR'] = None  # defaults to instance/profiles
+app.config['ANALYTICS_PROCESSES'] = None  # worker processes splitting large columnar datasets by row range; None computes in-process
+app.config['ANALYTICS_WORKER_ENABLED'] = False  # serve dataset analytics from snapshots computed in the background
+app.config['ANALYTICS_WORKER_THREADS'] = 1
+app.config['ANALYTICS_REFRESH_INTERVAL'] = 60  # seconds between checks of the dataset files for changes
+# Database tuning, overridable by environment variables of the same name
+app.config['SQLITE_JOURNAL_MODE'] = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')  # WAL lets readers run alongside a writer
+app.config['SQLITE_SYNCHRONOUS'] = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')  # NORMAL is durable across crashes in WAL mode
+app.config['SQLITE_CACHE_SIZE'] = int(os.environ.get('SQLITE_CACHE_SIZE', -65536))  # pages, or KiB when negative
+app.config['SQLITE_MMAP_SIZE'] = int(os.environ.get('SQLITE_MMAP_SIZE', 268435456))  # bytes
+app.config['SQLITE_BUSY_TIMEOUT'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))  # milliseconds to wait for a lock
+app.config['DATABASE_POOL_SIZE'] = int(os.environ.get('DATABASE_POOL_SIZE', 10))
+app.config['DATABASE_MAX_OVERFLOW'] = int(os.environ.get('DATABASE_MAX_OVERFLOW', 20))
+app.config['DATABASE_POOL_TIMEOUT'] = int(os.environ.get('DATABASE_POOL_TIMEOUT', 30))  # seconds to wait for a free connection
+app.config['DATABASE_POOL_RECYCLE'] = int(os.environ.get('DATABASE_POOL_RECYCLE', 1800))  # seconds
+# Optional settings file overriding any of the above, e.g. FINANCE_SETTINGS=/etc/finance.cfg
+app.config.from_envvar('FINANCE_SETTINGS', silent=True)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
 db = SQLAlchemy(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -143,16 +296,83 @@ def unauthorized():
     flash('Please log in to access this page.', 'info')
     return redirect(url_for('user_type_selection'))
 
+# Money amounts
+# Amounts are stored and summed as integer paise so totals are exact
+PAISE_PER_RUPEE = 100
+MAX_AMOUNT_PAISE = 2 ** 63 - 1
+
+def to_paise(amount):
+    """Convert a rupee amount (str, int, float or Decimal) to integer paise, rounding half up"""
+    paise = (Decimal(str(amount).strip()) * PAISE_PER_RUPEE).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    return int(paise)
+
+def from_paise(paise):
+    """Rupee amount of an integer number of paise, for display and JSON"""
+    return int(paise) / PAISE_PER_RUPEE
+
+# Password hashing
+# Hashing is deliberately slow, so a bounded pool keeps login bursts from occupying every request worker
+PASSWORD_POOL_LOCK = threading.Lock()
+
+class LoginBusy(Exception):
+    """Raised when more passwords are waiting to be hashed than PASSWORD_HASH_MAX_PENDING allows"""
+
+def password_pool():
+    """(executor, pending-slot semaphore) of the configured hashing pool, or None to hash inline"""
+    kind = app.config['PASSWORD_HASH_POOL']
+    if kind is None:
+        return None
+    settings = (kind, app.config['PASSWORD_HASH_WORKERS'], app.config['PASSWORD_HASH_MAX_PENDING'])
+    with PASSWORD_POOL_LOCK:
+        current, pool = app.extensions.get('password_pool', (None, None))
+        if current != settings:
+            if pool is not None:
+                pool[0].shutdown(wait=False)
+            if kind == 'process':
+                executor = ProcessPoolExecutor(max_workers=settings[1])
+            else:
+                executor = ThreadPoolExecutor(max_workers=settings[1], thread_name_prefix='password-hash')
+            pool = (executor, threading.BoundedSemaphore(settings[2]))
+            app.extensions['password_pool'] = (settings, pool)
+    return pool
+
+def run_password_job(function, *args, **kwargs):
+    """Call a hashing function in the password pool, raising LoginBusy if no slot frees up in time"""
+    pool = password_pool()
+    if pool is None:
+        return function(*args, **kwargs)
+    executor, pending = pool
+    if not pending.acquire(timeout=app.config['PASSWORD_HASH_QUEUE_TIMEOUT']):
+        raise LoginBusy()
+    try:
+        return executor.submit(function, *args, **kwargs).result()
+    finally:
+        pending.release()
+
+def hash_password(password):
+    return run_password_job(generate_password_hash, password, method=app.config['PASSWORD_HASH_METHOD'],
+                            salt_length=app.config['PASSWORD_HASH_SALT_LENGTH'])
+
+@lru_cache(maxsize=None)
+def resolved_hash_method(method):
+    """Full parameters werkzeug records for a method, e.g. 'scrypt' -> 'scrypt:32768:8:1'"""
+    return generate_password_hash('', method=method, salt_length=1).split('$', 1)[0]
+
+def password_needs_rehash(password_hash):
+    """Whether a stored hash was made with other parameters than PASSWORD_HASH_METHOD"""
+    return password_hash.split('$', 1)[0] != resolved_hash_method(app.config['PASSWORD_HASH_METHOD'])
+
 # Database Models
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(120), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)  # scrypt hashes are 162 characters
     user_type = db.Column(db.String(20), nullable=False)  # 'farmer', 'individual'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
     is_active = db.Column(db.Boolean, default=True)
+    dataset_id = db.Column(db.String(50))  # entity id of the user's rows in the dataset CSVs; None shows global figures
 
     @property
     def password(self):
@@ -160,10 +380,10 @@ class User(UserMixin, db.Model):
 
     @password.setter
     def password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def verify_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return run_password_job(check_password_hash, self.password_hash, password)
         
     def get_id(self):
         return str(self.id)
@@ -171,15 +391,261 @@ class User(UserMixin, db.Model):
 class Transaction(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
+    amount_paise = db.Column(db.BigInteger, nullable=False)
     category = db.Column(db.String(50), nullable=False)
     description = db.Column(db.String(200))
     date = db.Column(db.DateTime, default=datetime.utcnow)
     transaction_type = db.Column(db.String(20), nullable=False)  # 'income' or 'expense'
 
+    __table_args__ = (
+        # Transaction pages of a user, newest first (rowid id breaks date ties)
+        db.Index('ix_transaction_user_date', 'user_id', 'date'),
+        # Covers the per-user ledger totals check-balances compares running balances with
+        db.Index('ix_transaction_user_type_date', 'user_id', 'transaction_type', 'date', 'amount_paise'),
+        # Covers the per-month, per-category sums that rebuild the monthly rollup
+        db.Index('ix_transaction_user_type_category', 'user_id', 'transaction_type', 'category', 'date', 'amount_paise'),
+    )
+
+    @hybrid_property
+    def amount(self):
+        return from_paise(self.amount_paise)
+
+    @amount.setter
+    def amount(self, value):
+        self.amount_paise = to_paise(value)
+
+    @amount.expression
+    def amount(cls):
+        return cls.amount_paise / float(PAISE_PER_RUPEE)
+
+class MonthlySummary(db.Model):
+    """Per-user monthly totals by transaction type and category, kept in step with the transaction table"""
+    __tablename__ = 'monthly_summary'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    transaction_type = db.Column(db.String(20), nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    total_paise = db.Column(db.BigInteger, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    last_date = db.Column(db.DateTime)  # latest transaction date, orders categories by recent use
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'year', 'month', 'transaction_type', 'category', name='uq_monthly_summary_key'),
+    )
+
+class UserBalance(db.Model):
+    """Running per-user ledger totals, kept in step with the transaction table so dashboard totals are one row read"""
+    __tablename__ = 'user_balance'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    income_paise = db.Column(db.BigInteger, nullable=False, default=0)
+    expense_paise = db.Column(db.BigInteger, nullable=False, default=0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Schema migrations
+def table_columns(table):
+    inspector = inspect(db.engine)
+    if not inspector.has_table(table.name):
+        return set()
+    return {column['name'] for column in inspector.get_columns(table.name)}
+
+def migrate_amounts_to_paise():
+    """Move float transaction amounts into the integer amount_paise column; True if anything was migrated"""
+    columns = table_columns(Transaction.__table__)
+    if 'amount' not in columns or 'amount_paise' in columns:
+        return False
+    quote = db.engine.dialect.identifier_preparer
+    table = quote.format_table(Transaction.__table__)
+    # Indexes covering the old column must go before it can be dropped; create_all() recreates them
+    indexes = [index['name'] for index in inspect(db.engine).get_indexes(Transaction.__tablename__)
+               if 'amount' in index['column_names']]
+    with db.engine.begin() as connection:
+        for name in indexes:
+            connection.exec_driver_sql(f'DROP INDEX {quote.quote(name)}')
+        connection.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN amount_paise BIGINT NOT NULL DEFAULT 0')
+        connection.exec_driver_sql(f'UPDATE {table} SET amount_paise = CAST(ROUND(amount * {PAISE_PER_RUPEE}) AS BIGINT)')
+        connection.exec_driver_sql(f'ALTER TABLE {table} DROP COLUMN amount')
+    return True
+
+def upgrade_database():
+    """Create missing tables and indexes so existing databases are upgraded in place"""
+    summary_columns = table_columns(MonthlySummary.__table__)
+    backfill_monthly_summary = not summary_columns
+    backfill_balances = not table_columns(UserBalance.__table__)
+    if migrate_amounts_to_paise() or (summary_columns and 'total_paise' not in summary_columns):
+        # The rollup is derived data, so it is rebuilt in paise rather than converted; databases
+        # older than the rollup have no table to drop
+        MonthlySummary.__table__.drop(db.engine, checkfirst=True)
+        backfill_monthly_summary = True
+    db.create_all()
+    if 'dataset_id' not in table_columns(User.__table__):
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql(f'ALTER TABLE {db.engine.dialect.identifier_preparer.format_table(User.__table__)} ADD COLUMN dataset_id VARCHAR(50)')
+    for index in Transaction.__table__.indexes:
+        index.create(bind=db.engine, checkfirst=True)
+    if backfill_monthly_summary:
+        rebuild_monthly_summary()
+    if backfill_balances:
+        rebuild_user_balances()
+    if db.engine.dialect.name == 'sqlite':
+        # Refresh planner statistics so SQLite picks the new indexes
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('ANALYZE')
+
+@app.cli.command('upgrade-db')
+def upgrade_db_command():
+    """Upgrade the database schema in place"""
+    upgrade_database()
+    print('Database upgraded')
+
+# Upserts
+UPSERT_DIALECTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+def upsert(table, values, key, updates):
+    """INSERT a row, or apply updates(existing table, excluded row) to the row already holding its unique key, in one statement"""
+    dialect = db.engine.dialect.name
+    if dialect not in UPSERT_DIALECTS:
+        raise RuntimeError(f'Upserts are not supported on {dialect}')
+    insert = UPSERT_DIALECTS[dialect](table).values(**values)
+    db.session.execute(insert.on_conflict_do_update(index_elements=key, set_=updates(table.c, insert.excluded)))
+
+# Monthly rollup
+def record_monthly_summary(user_id, transaction_date, transaction_type, category, amount_paise, count=1):
+    """Add a ledger change to the user's monthly rollup inside the caller's DB transaction"""
+    # A single upsert on uq_monthly_summary_key, so two first writes for a month cannot both insert
+    upsert(MonthlySummary.__table__, {
+        'user_id': user_id,
+        'year': transaction_date.year,
+        'month': transaction_date.month,
+        'transaction_type': transaction_type,
+        'category': category,
+        'total_paise': amount_paise,
+        'count': count,
+        'last_date': transaction_date
+    }, ['user_id', 'year', 'month', 'transaction_type', 'category'], lambda current, new: {
+        'total_paise': current.total_paise + new.total_paise,
+        'count': current.count + new.count,
+        'last_date': case((current.last_date > new.last_date, current.last_date), else_=new.last_date)
+    })
+
+def rebuild_monthly_summary(user_id=None):
+    """Recompute the monthly rollup from the transaction table, for one user or everyone"""
+    year_col = extract('year', Transaction.date)
+    month_col = extract('month', Transaction.date)
+    source = db.session.query(
+        Transaction.user_id,
+        year_col,
+        month_col,
+        Transaction.transaction_type,
+        Transaction.category,
+        func.sum(Transaction.amount_paise),
+        func.count(Transaction.id),
+        func.max(Transaction.date)
+    ).filter(Transaction.date.isnot(None))
+    delete = MonthlySummary.query
+    if user_id is not None:
+        source = source.filter(Transaction.user_id == user_id)
+        delete = delete.filter_by(user_id=user_id)
+    source = source.group_by(Transaction.user_id, year_col, month_col, Transaction.transaction_type, Transaction.category)
+    delete.delete(synchronize_session=False)
+    db.session.execute(MonthlySummary.__table__.insert().from_select(
+        ['user_id', 'year', 'month', 'transaction_type', 'category', 'total_paise', 'count', 'last_date'],
+        source.subquery().select()
+    ))
+    db.session.commit()
+    invalidate_dashboard_cache(user_id)
+
+# Running balances
+def record_balance(user_id, transaction_type, amount_paise, count=1):
+    """Add a ledger change to the user's running balance inside the caller's DB transaction; removals pass negative amounts and counts"""
+    column = 'income_paise' if transaction_type == 'income' else 'expense_paise'
+    # A single upsert, so two first writes for a user cannot both insert
+    upsert(UserBalance.__table__, {
+        'user_id': user_id,
+        'income_paise': amount_paise if transaction_type == 'income' else 0,
+        'expense_paise': amount_paise if transaction_type == 'expense' else 0,
+        'transaction_count': count,
+        'updated_at': datetime.utcnow()
+    }, ['user_id'], lambda current, new: {
+        column: current[column] + new[column],
+        'transaction_count': current.transaction_count + new.transaction_count,
+        'updated_at': new.updated_at
+    })
+
+def ledger_balances(user_id=None):
+    """(user_id, income_paise, expense_paise, transaction_count) of every user, summed from the transaction table"""
+    query = db.session.query(
+        Transaction.user_id,
+        func.sum(case((Transaction.transaction_type == 'income', Transaction.amount_paise), else_=0)),
+        func.sum(case((Transaction.transaction_type == 'expense', Transaction.amount_paise), else_=0)),
+        func.count(Transaction.id)
+    )
+    if user_id is not None:
+        query = query.filter(Transaction.user_id == user_id)
+    return query.group_by(Transaction.user_id)
+
+def rebuild_user_balances(user_id=None):
+    """Recompute running balances from the transaction table, for one user or everyone"""
+    delete = UserBalance.query
+    if user_id is not None:
+        delete = delete.filter_by(user_id=user_id)
+    delete.delete(synchronize_session=False)
+    source = ledger_balances(user_id).add_columns(literal(datetime.utcnow(), db.DateTime))
+    db.session.execute(UserBalance.__table__.insert().from_select(
+        ['user_id', 'income_paise', 'expense_paise', 'transaction_count', 'updated_at'],
+        source.subquery().select()
+    ))
+    db.session.commit()
+    invalidate_dashboard_cache(user_id)
+
+def check_user_balances(user_id=None, fix=False):
+    """Compare running balances with the ledger; returns the drifted ones and rewrites them from the ledger if fix"""
+    expected = {row[0]: tuple(row[1:]) for row in ledger_balances(user_id)}
+    stored_query = db.session.query(UserBalance.user_id, UserBalance.income_paise, UserBalance.expense_paise, UserBalance.transaction_count)
+    if user_id is not None:
+        stored_query = stored_query.filter(UserBalance.user_id == user_id)
+    stored = {row[0]: tuple(row[1:]) for row in stored_query}
+    drift = []
+    for drifted_id in sorted(set(expected) | set(stored)):
+        # A user without transactions may have no balance row at all
+        ledger = expected.get(drifted_id, (0, 0, 0))
+        balance = stored.get(drifted_id, (0, 0, 0))
+        if ledger != balance:
+            drift.append({'user_id': drifted_id, 'ledger': ledger, 'stored': balance})
+    if fix:
+        for entry in drift:
+            rebuild_user_balances(entry['user_id'])
+    return drift
+
+@app.cli.command('check-balances')
+@click.option('--user-id', type=int, help='Only check this user\'s balance')
+@click.option('--fix', is_flag=True, help='Recompute drifted balances from the ledger')
+def check_balances_command(user_id, fix):
+    """Report running balances that differ from the transaction table"""
+    drift = check_user_balances(user_id, fix)
+    for entry in drift:
+        (ledger_income, ledger_expenses, ledger_count), (income, expenses, count) = entry['ledger'], entry['stored']
+        print(f"User {entry['user_id']}: stored income {from_paise(income)}, expenses {from_paise(expenses)}, {count} transactions; "
+              f"ledger income {from_paise(ledger_income)}, expenses {from_paise(ledger_expenses)}, {ledger_count} transactions")
+    if not drift:
+        print('All balances match the ledger')
+    elif fix:
+        print(f'Fixed {len(drift)} balances')
+    else:
+        raise click.ClickException(f'{len(drift)} balances differ from the ledger; rerun with --fix to repair them')
+
+@app.cli.command('rebuild-monthly-summary')
+@click.option('--user-id', type=int, help='Only rebuild this user\'s rollup')
+def rebuild_monthly_summary_command(user_id):
+    """Backfill the monthly rollup from existing transactions"""
+    rebuild_monthly_summary(user_id)
+    print(f"Monthly summary rebuilt ({MonthlySummary.query.count()} rows)")
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return load_cached_user(int(user_id))
 
 def validate_email(email):
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -196,30 +662,491 @@ def validate_password(password):
         return False
     return True
 
-def process_agricultural_data():
+def parse_transaction_fields(data):
+    """Validate submitted transaction fields, raising ValueError with the message to show the user"""
+    try:
+        amount_paise = to_paise(data.get('amount'))
+    except (InvalidOperation, ValueError, OverflowError):  # malformed, NaN or infinite
+        raise ValueError('Invalid amount. Please enter a valid number.')
+    if amount_paise > MAX_AMOUNT_PAISE:
+        raise ValueError('Invalid amount. Please enter a valid number.')
+    if amount_paise <= 0:
+        raise ValueError('Amount must be greater than 0')
+    category = data.get('category')
+    if category is None:
+        raise ValueError('Category is required')
+    # Statement files can hold any JSON value, so text fields are type-checked too
+    if not isinstance(category, str):
+        raise ValueError('Category must be text')
+    description = data.get('description')
+    if description is not None and not isinstance(description, str):
+        raise ValueError('Description must be text')
+    transaction_type = data.get('transaction_type')
+    if not isinstance(transaction_type, str) or transaction_type not in TRANSACTION_TYPES:
+        raise ValueError('Transaction type must be income or expense')
+    return {
+        'amount_paise': amount_paise,
+        'category': category,
+        'description': description,
+        'transaction_type': transaction_type
+    }
+
+# Transaction aggregation
+def summary_figures(figures, now, trend_months, totals=None):
+    """Dashboard summary in rupees from aggregate() output; totals=(income, expenses) in paise overrides its all-time totals"""
+    total_income, total_expenses = totals or (figures['totals'].get('income', 0), figures['totals'].get('expense', 0))
+    month_start = datetime(now.year, now.month, 1)
+    # Expense totals of the last few months, current month first
+    expense_trends = []
+    for i in range(trend_months):
+        start = month_start - relativedelta(months=i)
+        expense_trends.append({
+            'month': start.strftime('%B %Y'),
+            'amount': from_paise(figures['months'].get((start.year, start.month), {}).get('expense', 0))
+        })
+    return {
+        'total_income': from_paise(total_income),
+        'total_expenses': from_paise(total_expenses),
+        'remaining_balance': from_paise(total_income - total_expenses),
+        'monthly_income': from_paise(figures['current_month'].get('income', 0)),
+        'monthly_expenses': from_paise(figures['current_month'].get('expense', 0)),
+        'category_expenses': {category: from_paise(total) for category, total in figures['categories'].items()},
+        'expense_trends': expense_trends
+    }
+
+def summarize_transactions(user_id, default_category=None, trend_months=3):
+    """Calculate a user's dashboard totals in one pass over their monthly rollup rows, with all-time totals from the running balance"""
+    now = datetime.utcnow()
+    rows = db.session.query(
+        MonthlySummary.year,
+        MonthlySummary.month,
+        MonthlySummary.transaction_type,
+        MonthlySummary.category,
+        MonthlySummary.total_paise,
+        MonthlySummary.last_date
+    ).filter(MonthlySummary.user_id == user_id)
+    figures = aggregate(rows, now, default_category)
+    balance = db.session.query(UserBalance.income_paise, UserBalance.expense_paise).filter(UserBalance.user_id == user_id).first()
+    return summary_figures(figures, now, trend_months, tuple(balance) if balance else (0, 0))
+
+def transaction_day_rows(user_id, start, end):
+    """(day, type, category, paise) totals of a user's transactions dated in [start, end), read through ix_transaction_user_date"""
+    year = extract('year', Transaction.date)
+    month = extract('month', Transaction.date)
+    day = extract('day', Transaction.date)
+    rows = db.session.query(
+        year, month, day,
+        Transaction.transaction_type,
+        Transaction.category,
+        func.sum(Transaction.amount_paise)
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.date >= datetime.combine(start, datetime.min.time()),
+        Transaction.date < datetime.combine(end, datetime.min.time())
+    ).group_by(year, month, day, Transaction.transaction_type, Transaction.category)
+    for y, m, d, transaction_type, category, total_paise in rows:
+        yield date(int(y), int(m), int(d)), transaction_type, category, total_paise
+
+def rollup_month_rows(user_id, start, end):
+    """(month start, type, category, paise) rollup rows of the whole months from start to end, read through uq_monthly_summary_key"""
+    rows = db.session.query(
+        MonthlySummary.year,
+        MonthlySummary.month,
+        MonthlySummary.transaction_type,
+        MonthlySummary.category,
+        MonthlySummary.total_paise
+    ).filter(
+        MonthlySummary.user_id == user_id,
+        tuple_(MonthlySummary.year, MonthlySummary.month) >= (start.year, start.month),
+        tuple_(MonthlySummary.year, MonthlySummary.month) < (end.year, end.month)
+    )
+    for year, month, transaction_type, category, total_paise in rows:
+        yield date(year, month, 1), transaction_type, category, total_paise
+
+def aggregate_range(user_id, start, end, bucket='month', default_category=None):
+    """Per-bucket income, expense and expense-category totals in paise of a user's transactions dated in [start, end)"""
+    if bucket not in BUCKETS:
+        raise ValueError(f'Unknown bucket: {bucket}')
+    if end <= start:
+        raise ValueError('The range must end after it starts')
+    first_month = start if start.day == 1 else start.replace(day=1) + relativedelta(months=1)
+    last_month = end.replace(day=1)
+    if bucket in ('day', 'week') or first_month >= last_month:
+        rows = transaction_day_rows(user_id, start, end)
+    else:
+        # Whole months come from the rollup, so long windows cost about as much as short ones;
+        # only the partial months at either edge read transactions
+        rows = itertools.chain(
+            transaction_day_rows(user_id, start, first_month),
+            rollup_month_rows(user_id, first_month, last_month),
+            transaction_day_rows(user_id, last_month, end)
+        )
+    return bucket_series(rows, start, end, bucket, default_category)
+
+def encode_transaction_cursor(transaction):
+    """Opaque cursor pointing just past a transaction in (date, id) order"""
+    raw = f'{transaction.date.isoformat()}|{transaction.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_transaction_cursor(cursor):
+    """Decode a cursor into its (date, id) position, raising ValueError for malformed cursors"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        date, transaction_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(date), int(transaction_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+def get_transaction_page(user_id, cursor=None, limit=None):
+    """One page of a user's transactions, newest first, seeking past the cursor on (date, id) instead of using OFFSET"""
+    if limit is None:
+        limit = app.config['TRANSACTIONS_PAGE_SIZE']
+    query = Transaction.query.filter_by(user_id=user_id)
+    if cursor:
+        query = query.filter(tuple_(Transaction.date, Transaction.id) < decode_transaction_cursor(cursor))
+    # ix_transaction_user_date ends in the implicit rowid, so this order needs no sort step
+    transactions = query.order_by(Transaction.date.desc(), Transaction.id.desc()).limit(limit + 1).all()
+    next_cursor = encode_transaction_cursor(transactions[limit - 1]) if len(transactions) > limit else None
+    return transactions[:limit], next_cursor
+
+def transaction_to_dict(transaction):
+    """Plain-dict view of a transaction that can be cached and rendered without a DB session"""
+    return {
+        'id': transaction.id,
+        'date': transaction.date,
+        'amount': transaction.amount,
+        'category': transaction.category,
+        'description': transaction.description,
+        'transaction_type': transaction.transaction_type
+    }
+
+# Dataset analytics
+def dataset_path(filename):
+    """Path of a dataset CSV inside the configured dataset directory"""
+    return os.path.join(app.config['DATASET_DIR'], filename)
+
+def file_signature(path):
+    """Identify the current version of a file by its modification time and size"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def columnar_path(csv_path, signature):
+    """Directory holding the columnar copy of one version of a dataset CSV"""
+    cache_dir = app.config['COLUMNAR_CACHE_DIR'] or os.path.join(os.path.dirname(csv_path), '.columnar')
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir, f'{stem}-{signature[0]}-{signature[1]}')
+
+def convert_to_columnar(csv_path, chunk_size=None):
+    """Convert a dataset CSV once into typed, memory-mappable .npy column files and return their directory"""
+    signature = file_signature(csv_path)
+    target = columnar_path(csv_path, signature)
+    if os.path.exists(os.path.join(target, 'manifest.json')):
+        return target
+    chunk_size = chunk_size or COLUMNAR_CONVERSION_CHUNK_SIZE
+
+    # First pass, in chunks so files larger than memory convert: row count and the
+    # narrowest lossless type of each column (int32/float32 when no precision is lost)
+    rows = 0
+    columns = {name: {'text': False, 'integral': True, 'float32': True, 'min': 0, 'max': 0}
+               for name in pd.read_csv(csv_path, nrows=0).columns}
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+        rows += len(chunk)
+        for name, values in chunk.items():
+            info = columns[name]
+            if info['text']:
+                continue
+            if not pd.api.types.is_numeric_dtype(values):
+                info['text'] = True
+                continue
+            data = values.to_numpy(dtype='float64')
+            finite = data[~np.isnan(data)]
+            if len(finite) < len(data) or not np.array_equal(finite, np.round(finite)):
+                info['integral'] = False
+            elif len(finite):
+                info['min'] = min(info['min'], finite.min())
+                info['max'] = max(info['max'], finite.max())
+            if info['float32'] and not np.array_equal(data.astype(np.float32).astype(np.float64), data, equal_nan=True):
+                info['float32'] = False
+    for info in columns.values():
+        if info['text']:
+            info['dtype'] = 'int32'
+        elif info['integral']:
+            int32 = np.iinfo(np.int32)
+            info['dtype'] = 'int32' if int32.min <= info['min'] and info['max'] <= int32.max else 'int64'
+        else:
+            info['dtype'] = 'float32' if info['float32'] else 'float64'
+
+    # Second pass: write the columns, storing text as int32 category codes assigned as values appear
+    workdir = f'{target}.tmp-{os.getpid()}'
+    os.makedirs(workdir, exist_ok=True)
+    arrays = {}
+    categories = {name: {} for name, info in columns.items() if info['text']}
+    for i, (name, info) in enumerate(columns.items()):
+        info['file'] = f'{i}.npy'
+        shape = (rows,)
+        if rows:
+            arrays[name] = np.lib.format.open_memmap(os.path.join(workdir, info['file']), mode='w+', dtype=info['dtype'], shape=shape)
+        else:
+            arrays[name] = np.zeros(shape, dtype=info['dtype'])
+    start = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype={name: str for name in categories}):
+        stop = start + len(chunk)
+        for name, values in chunk.items():
+            if name in categories:
+                codes, uniques = pd.factorize(values)
+                lookup = np.array([categories[name].setdefault(value, len(categories[name])) for value in uniques] + [-1], dtype=np.int32)
+                arrays[name][start:stop] = lookup[codes]
+            else:
+                arrays[name][start:stop] = values.to_numpy()
+        start = stop
+    # Renumber codes so categories sort like the original strings
+    for name, seen in categories.items():
+        ordered = sorted(seen)
+        remap = np.empty(len(seen) + 1, dtype=np.int32)
+        remap[[seen[value] for value in ordered]] = np.arange(len(ordered), dtype=np.int32)
+        remap[-1] = -1
+        for offset in range(0, rows, chunk_size):
+            arrays[name][offset:offset + chunk_size] = remap[arrays[name][offset:offset + chunk_size]]
+        columns[name]['categories'] = ordered
+    for name, array in arrays.items():
+        if rows:
+            array.flush()
+        else:
+            np.save(os.path.join(workdir, columns[name]['file']), array)
+    del arrays
+
+    manifest = {
+        'source': os.path.basename(csv_path),
+        'signature': list(signature),
+        'rows': rows,
+        'columns': {name: {key: info[key] for key in ('file', 'dtype', 'categories') if key in info}
+                    for name, info in columns.items()}
+    }
+    with open(os.path.join(workdir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+    try:
+        os.rename(workdir, target)
+    except OSError:
+        # Another worker finished the same conversion first
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    # Drop conversions of older versions of the file
+    stale = re.compile(re.escape(os.path.basename(target).rsplit('-', 2)[0]) + r'-\d+-\d+$')
+    for entry in os.listdir(os.path.dirname(target)):
+        path = os.path.join(os.path.dirname(target), entry)
+        if stale.match(entry) and path != target:
+            shutil.rmtree(path, ignore_errors=True)
+    return target
+
+def columnar_rows(directory):
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        return json.load(f)['rows']
+
+def decode_categories(codes, categories):
+    """Plain values of stored category codes, missing ones (code -1) as NaN, so frames match what the CSV reader gives"""
+    return np.asarray(categories + [np.nan], dtype=object)[codes]
+
+def read_columnar_rows(directory, columns, rows):
+    """The given columns at the given row numbers of a columnar dataset, reading only those rows"""
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        manifest = json.load(f)
+    frame = {}
+    for name in columns:
+        info = manifest['columns'][name]
+        values = np.load(os.path.join(directory, info['file']), mmap_mode='r')[rows]
+        if info.get('categories') is None:
+            frame[name] = values
+        else:
+            frame[name] = decode_categories(values, info['categories'])
+    return pd.DataFrame(frame, index=pd.Index(rows))
+
+def read_columnar(directory, columns, chunk_size=None, row_range=None):
+    """Yield the given columns of a columnar dataset (or a (start, stop) row range of it) as DataFrames, memory-mapping the column files"""
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        manifest = json.load(f)
+    rows = manifest['rows']
+    first, rows = row_range if row_range is not None else (0, rows)
+    arrays = {}
+    for name in columns:
+        info = manifest['columns'][name]
+        arrays[name] = (np.load(os.path.join(directory, info['file']), mmap_mode='r' if rows else None), info.get('categories'))
+    step = chunk_size or max(rows - first, 1)
+    for start in range(first, max(rows, first + 1), step):
+        stop = min(start + step, rows)
+        frame = {}
+        for name, (array, categories) in arrays.items():
+            if categories is None:
+                frame[name] = np.asarray(array[start:stop])
+            else:
+                frame[name] = decode_categories(np.asarray(array[start:stop]), categories)
+        yield pd.DataFrame(frame, index=pd.RangeIndex(start, stop))
+
+def read_dataset(csv_path, columns, chunk_size=None):
+    """Yield the given dataset columns, in chunks of chunk_size rows when a chunk size is set"""
+    return timed_iter(_read_dataset(csv_path, columns, chunk_size), 'csv')
+
+def _read_dataset(csv_path, columns, chunk_size=None):
+    if app.config['COLUMNAR_CACHE']:
+        try:
+            directory = convert_to_columnar(csv_path, chunk_size)
+        except OSError as e:
+            print(f"Error building columnar cache for {csv_path}: {str(e)}")
+        else:
+            yield from read_columnar(directory, columns, chunk_size)
+            return
+    if chunk_size:
+        yield from pd.read_csv(csv_path, usecols=columns, chunksize=chunk_size)
+    else:
+        yield pd.read_csv(csv_path, usecols=columns)
+
+def first_rows(frames, key):
+    """First row per key value across frames, keeping file order (row index) for ties"""
+    frame = pd.concat([f for f in frames if f is not None]).sort_index(kind='mergesort')
+    return frame.drop_duplicates(key, keep='first')
+
+def last_rows(frames, key=None, n=2):
+    """Last n rows across frames once stably sorted by key (or by file order when key is None)"""
+    frame = pd.concat([f for f in frames if f is not None]).sort_index(kind='mergesort')
+    if key is not None:
+        frame = frame.sort_values(key, kind='mergesort', na_position='last')
+    return frame.tail(n)
+
+def merge_moments(a, b):
+    """Combine two per-key frames of count/sum/min/max/m2 (Chan's parallel variance update)"""
+    index = a.index.append(b.index[~b.index.isin(a.index)])
+    a = a.reindex(index)
+    b = b.reindex(index)
+    count_a = a['count'].fillna(0)
+    count_b = b['count'].fillna(0)
+    count = count_a + count_b
+    delta = b['sum'] / count_b - a['sum'] / count_a
+    return pd.DataFrame({
+        'count': count,
+        'sum': a['sum'].fillna(0) + b['sum'].fillna(0),
+        'min': np.fmin(a['min'], b['min']),
+        'max': np.fmax(a['max'], b['max']),
+        'm2': a['m2'].fillna(0) + b['m2'].fillna(0) + (delta ** 2 * count_a * count_b / count).fillna(0)
+    }, index=index)
+
+def accumulate(stats_class, csv_path, args=(), chunk_size=None, processes=None):
+    """Run a stats accumulator over a dataset, merging row-range partitions computed in worker processes when processes > 1"""
+    if processes and processes > 1 and app.config['COLUMNAR_CACHE']:
+        try:
+            directory = convert_to_columnar(csv_path, chunk_size)
+            rows = columnar_rows(directory)
+        except OSError as e:
+            print(f"Error building columnar cache for {csv_path}: {str(e)}")
+        else:
+            if rows >= ANALYTICS_PARTITION_MIN_ROWS:
+                bounds = np.linspace(0, rows, processes + 1, dtype=np.int64)
+                pool = analytics_process_pool(processes)
+                futures = [pool.submit(accumulate_partition, stats_class, args, directory, (int(start), int(stop)), chunk_size)
+                           for start, stop in zip(bounds[:-1], bounds[1:])]
+                # Merging in row order keeps first-seen ordering (e.g. of crops) identical to a sequential scan
+                stats = futures[0].result()
+                for future in futures[1:]:
+                    stats.merge(future.result())
+                return stats
+    stats = stats_class(*args)
+    for chunk in read_dataset(csv_path, stats_class.COLUMNS, chunk_size):
+        stats.update(chunk)
+    return stats
+
+def accumulate_partition(stats_class, args, directory, row_range, chunk_size=None):
+    """Accumulate one row range of a columnar dataset; runs in a worker process"""
+    stats = stats_class(*args)
+    for chunk in read_columnar(directory, stats_class.COLUMNS, chunk_size, row_range):
+        stats.update(chunk)
+    return stats
+
+ANALYTICS_PROCESS_POOL_LOCK = threading.Lock()
+
+def analytics_process_pool(processes):
+    """Process pool for partitioned dataset analytics, created on first use and replaced if the size changes"""
+    with ANALYTICS_PROCESS_POOL_LOCK:
+        size, pool = app.extensions.get('analytics_process_pool', (None, None))
+        if size != processes:
+            if pool is not None:
+                pool.shutdown(wait=False)
+            pool = ProcessPoolExecutor(max_workers=processes)
+            app.extensions['analytics_process_pool'] = (processes, pool)
+    return pool
+
+def process_agricultural_data(entity_id=None):
     """Process agricultural data from CSV file"""
+    args = (tuple(app.config['CROP_YIELD_EXTRA_STATS']),)
+    if app.config['ANALYTICS_WORKER_ENABLED']:
+        return analytics_snapshot('agricultural', entity_id, AgriculturalStats, args)
+    # A user linked to dataset rows sees only those rows, otherwise the global figures
+    data = entity_analytics('agriculture.csv', AgriculturalStats, entity_id, args)
+    if data is not None:
+        return data
     try:
-        df = pd.read_csv('dataset/agriculture.csv')
-        
-        # Calculate total metrics
-        total_area = df['Farm_Area(acres)'].sum()
-        total_yield = df['Yield(tons)'].sum()
-        total_water = df['Water_Usage(cubic meters)'].sum()
-        total_fertilizer = df['Fertilizer_Used(tons)'].sum()
-        total_pesticide = df['Pesticide_Used(kg)'].sum()
+        csv_path = dataset_path('agriculture.csv')
+        extra_stats = tuple(app.config['CROP_YIELD_EXTRA_STATS'])
+        return copy.deepcopy(_agricultural_analytics(csv_path, file_signature(csv_path), extra_stats, app.config['CSV_CHUNK_SIZE'],
+                                                     app.config['ANALYTICS_PROCESSES'], app.config['COLUMNAR_CACHE']))
+    except Exception as e:
+        print(f"Error processing agricultural data: {str(e)}")
+        return None
+
+class AgriculturalStats:
+    """Farm totals and per-crop yield moments, accumulated one chunk of rows at a time"""
+    TOTAL_COLUMNS = ['Farm_Area(acres)', 'Yield(tons)', 'Water_Usage(cubic meters)', 'Fertilizer_Used(tons)', 'Pesticide_Used(kg)']
+    COLUMNS = ['Crop_Type'] + TOTAL_COLUMNS
+    CROP_STATS = ('count', 'sum', 'mean', 'min', 'max', 'std', 'var')
+
+    def __init__(self, extra_stats=()):
+        unsupported = set(extra_stats) - set(self.CROP_STATS)
+        if unsupported:
+            raise ValueError(f"Unsupported crop statistics: {', '.join(sorted(unsupported))}")
+        self.extra_stats = tuple(extra_stats)
+        self.totals = pd.Series(0.0, index=self.TOTAL_COLUMNS)
+        self.crops = pd.DataFrame(columns=['count', 'sum', 'min', 'max', 'm2'], dtype='float64')
+
+    def update(self, chunk):
+        self.totals = self.totals + chunk[self.TOTAL_COLUMNS].sum()
+        # Per-crop yield moments in one grouped pass, crops in order of appearance
+        yields = chunk.groupby('Crop_Type', sort=False, observed=True)['Yield(tons)']
+        count = yields.count()
+        crops = pd.DataFrame({
+            'count': count,
+            'sum': yields.sum(),
+            'min': yields.min(),
+            'max': yields.max(),
+            'm2': yields.var(ddof=0) * count
+        })
+        self.crops = merge_moments(self.crops, crops)
+
+    def merge(self, other):
+        self.totals = self.totals + other.totals
+        self.crops = merge_moments(self.crops, other.crops)
+
+    def result(self):
+        total_area, total_yield, total_water, total_fertilizer, total_pesticide = self.totals
         
         # Calculate crop-specific data
+        count = self.crops['count']
+        var = self.crops['m2'] / (count - 1)
+        crop_stats = {
+            'count': count.astype(int),
+            'sum': self.crops['sum'],
+            'mean': self.crops['sum'] / count,
+            'min': self.crops['min'],
+            'max': self.crops['max'],
+            'std': np.sqrt(var),
+            'var': var
+        }
+        growth = (crop_stats['mean'] / crop_stats['max'] * 100).where(crop_stats['max'] > 0, 0)
         crops_data = []
-        for crop in df['Crop_Type'].unique():
-            crop_df = df[df['Crop_Type'] == crop]
-            avg_yield = crop_df['Yield(tons)'].mean()
-            max_yield = crop_df['Yield(tons)'].max()
-            growth_percentage = (avg_yield / max_yield) * 100 if max_yield > 0 else 0
-            
-            crops_data.append({
+        for crop, growth_percentage, *extra_values in zip(self.crops.index, growth, *(crop_stats[stat] for stat in self.extra_stats)):
+            crop_data = {
                 'name': crop,
                 'growth_percentage': round(growth_percentage, 1)
-            })
+            }
+            for stat, value in zip(self.extra_stats, extra_values):
+                crop_data[f'yield_{stat}'] = round(value, 2)
+            crops_data.append(crop_data)
         
         # Calculate resource usage percentages
         fertilizer_percentage = (total_fertilizer / (total_area * 0.1)) * 100  # Assuming 0.1 tons per acre is optimal
@@ -241,115 +1168,225 @@ def process_agricultural_data():
             'pesticide_percentage': round(pesticide_percentage, 1),
             'water_efficiency': round(water_efficiency, 1)
         }
-    except Exception as e:
-        print(f"Error processing agricultural data: {str(e)}")
+
+@lru_cache(maxsize=ANALYTICS_CACHE_SIZE)
+def _agricultural_analytics(csv_path, signature, extra_stats=(), chunk_size=None, processes=None, columnar=False):
+    """Calculate agricultural metrics, cached until the file signature changes; columnar (COLUMNAR_CACHE) keeps the two readers' results apart"""
+    return accumulate(AgriculturalStats, csv_path, (extra_stats,), chunk_size, processes).result()
+
+# Recommendation rules
+# A rule fires when `metric op threshold` holds for an entity. The threshold is a number or
+# the name of another metric, multiplied by factor. Rules sharing a group act like if/elif:
+# only the first one that fires for an entity is kept. A rule with items is checked against
+# every row of that item table (crops, departments), and {name} in its text is filled from
+# the row. message_from/action_from take the text from a column, and 'present' fires when
+# the metric is truthy, like the `if value:` checks it replaced (so NaN fires, '' and None
+# do not). Dotted metric names reach into nested dicts of single-entity data.
+RULE_OPERATORS = {'<': np.less, '>': np.greater, 'present': None}
+
+def compile_rules(rules):
+    """Check a rule table once and record the metric and item columns it reads"""
+    compiled = []
+    metrics = set()
+    items = {}
+    for order, rule in enumerate(rules):
+        if rule['op'] not in RULE_OPERATORS:
+            raise ValueError(f"Unknown operator {rule['op']!r} in {rule['type']} rule")
+        columns = items.setdefault(rule['items'], {'entity', 'name'}) if 'items' in rule else metrics
+        columns.add(rule['metric'])
+        if isinstance(rule.get('threshold'), str):
+            columns.add(rule['threshold'])
+        columns.update(rule[key] for key in ('message_from', 'action_from') if key in rule)
+        compiled.append(dict(rule, order=order, rank=0 if rule['priority'] == 'high' else 1,
+                             compare=RULE_OPERATORS[rule['op']], factor=rule.get('factor', 1)))
+    return {'rules': compiled, 'metrics': sorted(metrics), 'items': {name: sorted(columns) for name, columns in items.items()}}
+
+def rule_text(rule, key, table, rows):
+    if key + '_from' in rule:
+        return np.asarray(table[rule[key + '_from']], dtype=object)[rows]
+    if '{name}' in rule[key]:
+        # Item names repeat across entities, so each distinct one is formatted once
+        codes, names = pd.factorize(np.asarray(table['name'])[rows])
+        return np.array([rule[key].format(name=name) for name in names], dtype=object)[codes]
+    return np.full(len(rows), rule[key], dtype=object)
+
+def match_rules(ruleset, metrics, count, items):
+    """Columns of every fired rule, ordered by entity position and then high priority first as the rules are listed"""
+    parts = []
+    taken = {}
+    for rule in ruleset['rules']:
+        table = items[rule['items']] if 'items' in rule else metrics
+        values = np.asarray(table[rule['metric']])
+        if rule['compare'] is None:
+            mask = np.fromiter(map(bool, values), dtype=bool, count=len(values))
+        else:
+            threshold = rule['threshold']
+            if isinstance(threshold, str):
+                threshold = np.asarray(table[threshold]) * rule['factor']
+            mask = rule['compare'](values, threshold)
+        if 'group' in rule:
+            previous = taken.get(rule['group'], np.zeros(count, dtype=bool))
+            mask = mask & ~previous
+            taken[rule['group']] = previous | mask
+        rows = np.flatnonzero(mask)
+        if len(rows):
+            entities = np.asarray(table['entity'])[rows] if 'items' in rule else rows
+            parts.append((entities, rule, rows, rule_text(rule, 'message', table, rows), rule_text(rule, 'action', table, rows)))
+    if not parts:
         return None
+    columns = {
+        'entity': np.concatenate([part[0] for part in parts]),
+        'rank': np.concatenate([np.full(len(part[2]), part[1]['rank']) for part in parts]),
+        'order': np.concatenate([np.full(len(part[2]), part[1]['order']) for part in parts]),
+        'item': np.concatenate([part[2] for part in parts]),
+        'type': np.concatenate([np.full(len(part[2]), part[1]['type'], dtype=object) for part in parts]),
+        'priority': np.concatenate([np.full(len(part[2]), part[1]['priority'], dtype=object) for part in parts]),
+        'message': np.concatenate([part[3] for part in parts]),
+        'action': np.concatenate([part[4] for part in parts]),
+    }
+    # Same order as the old stable sort on priority == 'high' of recommendations appended rule by rule
+    order = np.lexsort((columns['item'], columns['order'], columns['rank'], columns['entity']))
+    return {key: columns[key][order] for key in ('entity', 'type', 'priority', 'message', 'action')}
+
+def evaluate_recommendations(ruleset, metrics, items=None):
+    """Recommendations of every entity in a metrics DataFrame (one row per entity) as one DataFrame in priority order"""
+    # items maps an item table name to a DataFrame whose 'entity' column holds labels of metrics.index
+    tables = {}
+    for name, columns in ruleset['items'].items():
+        table = (items or {})[name]
+        tables[name] = {column: table[column].to_numpy() for column in columns if column != 'entity'}
+        tables[name]['entity'] = metrics.index.get_indexer(table['entity'])
+    matched = match_rules(ruleset, {column: metrics[column].to_numpy() for column in ruleset['metrics']}, len(metrics), tables)
+    if matched is None:
+        return pd.DataFrame(columns=['entity', 'type', 'priority', 'message', 'action'])
+    matched['entity'] = metrics.index.to_numpy()[matched['entity']]
+    return pd.DataFrame(matched)
+
+def metric_value(data, name):
+    for key in name.split('.'):
+        data = data[key]
+    return data
+
+def entity_recommendations(ruleset, data):
+    """Recommendations of a single entity's analytics dict, highest priority first"""
+    metrics = {name: np.array([metric_value(data, name)]) for name in ruleset['metrics']}
+    tables = {}
+    for name, columns in ruleset['items'].items():
+        tables[name] = {column: np.array([item[column] for item in data[name]]) for column in columns if column != 'entity'}
+        tables[name]['entity'] = np.zeros(len(data[name]), dtype=int)
+    matched = match_rules(ruleset, metrics, 1, tables)
+    if matched is None:
+        return []
+    return [{'type': kind, 'priority': priority, 'message': message, 'action': action}
+            for kind, priority, message, action in zip(matched['type'], matched['priority'], matched['message'], matched['action'])]
+
+FARMING_RULES = [
+    {'type': 'water', 'priority': 'high', 'metric': 'water_efficiency', 'op': '<', 'threshold': 50, 'group': 'water',
+     'message': 'Water efficiency is low. Consider implementing drip irrigation systems to reduce water wastage and improve crop yield.',
+     'action': 'Upgrade irrigation system to drip irrigation'},
+    {'type': 'water', 'priority': 'medium', 'metric': 'water_efficiency', 'op': '<', 'threshold': 70, 'group': 'water',
+     'message': 'Water efficiency can be improved. Monitor soil moisture levels and adjust irrigation schedules accordingly.',
+     'action': 'Optimize irrigation schedule'},
+    {'type': 'fertilizer', 'priority': 'high', 'metric': 'fertilizer_percentage', 'op': '>', 'threshold': 120, 'group': 'fertilizer',
+     'message': 'Fertilizer usage is excessive. This can harm soil health and increase costs. Consider soil testing and balanced fertilization.',
+     'action': 'Conduct soil test and adjust fertilizer application'},
+    {'type': 'fertilizer', 'priority': 'medium', 'metric': 'fertilizer_percentage', 'op': '<', 'threshold': 80, 'group': 'fertilizer',
+     'message': 'Fertilizer usage is below optimal. Consider increasing fertilizer application to improve crop yield.',
+     'action': 'Increase fertilizer application'},
+    {'type': 'pesticide', 'priority': 'high', 'metric': 'pesticide_percentage', 'op': '>', 'threshold': 120,
+     'message': 'Pesticide usage is high. Consider integrated pest management (IPM) practices to reduce chemical dependency.',
+     'action': 'Implement IPM practices'},
+    {'type': 'crop_health', 'priority': 'high', 'metric': 'crop_health', 'op': '<', 'threshold': 60, 'group': 'crop_health',
+     'message': 'Overall crop health is poor. Review soil quality, nutrient levels, and pest management practices.',
+     'action': 'Conduct comprehensive crop health assessment'},
+    {'type': 'crop_health', 'priority': 'medium', 'metric': 'crop_health', 'op': '<', 'threshold': 80, 'group': 'crop_health',
+     'message': 'Crop health needs improvement. Consider crop rotation and soil enrichment practices.',
+     'action': 'Implement crop rotation'},
+    {'type': 'crop_specific', 'priority': 'high', 'items': 'crops', 'metric': 'growth_percentage', 'op': '<', 'threshold': 60,
+     'message': '{name} is performing poorly. Review growing conditions and management practices for this crop.',
+     'action': 'Review {name} growing conditions'},
+]
+FARMING_RULESET = compile_rules(FARMING_RULES)
 
 def generate_farming_recommendations(farm_data):
     """Generate AI-powered recommendations for better farming practices"""
-    recommendations = []
-    
-    # Analyze water efficiency
-    if farm_data['water_efficiency'] < 50:
-        recommendations.append({
-            'type': 'water',
-            'priority': 'high',
-            'message': 'Water efficiency is low. Consider implementing drip irrigation systems to reduce water wastage and improve crop yield.',
-            'action': 'Upgrade irrigation system to drip irrigation'
-        })
-    elif farm_data['water_efficiency'] < 70:
-        recommendations.append({
-            'type': 'water',
-            'priority': 'medium',
-            'message': 'Water efficiency can be improved. Monitor soil moisture levels and adjust irrigation schedules accordingly.',
-            'action': 'Optimize irrigation schedule'
-        })
-    
-    # Analyze fertilizer usage
-    if farm_data['fertilizer_percentage'] > 120:
-        recommendations.append({
-            'type': 'fertilizer',
-            'priority': 'high',
-            'message': 'Fertilizer usage is excessive. This can harm soil health and increase costs. Consider soil testing and balanced fertilization.',
-            'action': 'Conduct soil test and adjust fertilizer application'
-        })
-    elif farm_data['fertilizer_percentage'] < 80:
-        recommendations.append({
-            'type': 'fertilizer',
-            'priority': 'medium',
-            'message': 'Fertilizer usage is below optimal. Consider increasing fertilizer application to improve crop yield.',
-            'action': 'Increase fertilizer application'
-        })
-    
-    # Analyze pesticide usage
-    if farm_data['pesticide_percentage'] > 120:
-        recommendations.append({
-            'type': 'pesticide',
-            'priority': 'high',
-            'message': 'Pesticide usage is high. Consider integrated pest management (IPM) practices to reduce chemical dependency.',
-            'action': 'Implement IPM practices'
-        })
-    
-    # Analyze crop health
-    if farm_data['crop_health'] < 60:
-        recommendations.append({
-            'type': 'crop_health',
-            'priority': 'high',
-            'message': 'Overall crop health is poor. Review soil quality, nutrient levels, and pest management practices.',
-            'action': 'Conduct comprehensive crop health assessment'
-        })
-    elif farm_data['crop_health'] < 80:
-        recommendations.append({
-            'type': 'crop_health',
-            'priority': 'medium',
-            'message': 'Crop health needs improvement. Consider crop rotation and soil enrichment practices.',
-            'action': 'Implement crop rotation'
-        })
-    
-    # Analyze individual crops
-    for crop in farm_data['crops']:
-        if crop['growth_percentage'] < 60:
-            recommendations.append({
-                'type': 'crop_specific',
-                'priority': 'high',
-                'message': f"{crop['name']} is performing poorly. Review growing conditions and management practices for this crop.",
-                'action': f'Review {crop["name"]} growing conditions'
-            })
-    
-    # Sort recommendations by priority
-    recommendations.sort(key=lambda x: x['priority'] == 'high', reverse=True)
-    return recommendations
+    return entity_recommendations(FARMING_RULESET, farm_data)
 
-def process_company_data():
+def process_company_data(entity_id=None):
     """Process company data from CSV file"""
+    if app.config['ANALYTICS_WORKER_ENABLED']:
+        return analytics_snapshot('company', entity_id, CompanyStats)
+    # A user linked to dataset rows sees only those rows, otherwise the global figures
+    data = entity_analytics('company.csv', CompanyStats, entity_id)
+    if data is not None:
+        return data
     try:
         # Check if file exists
-        csv_path = 'dataset/company.csv'
+        csv_path = dataset_path('company.csv')
         if not os.path.exists(csv_path):
             print(f"Error: File not found at {csv_path}")
             return None
-            
-        df = pd.read_csv(csv_path)
-        
+
+        return copy.deepcopy(_company_analytics(csv_path, file_signature(csv_path), app.config['CSV_CHUNK_SIZE'],
+                                                app.config['ANALYTICS_PROCESSES'], app.config['COLUMNAR_CACHE']))
+    except Exception as e:
+        print(f"Error processing company data: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+class CompanyStats:
+    """Company financial totals and the latest two months' revenue, accumulated one chunk of rows at a time"""
+    COLUMNS = ['Month', 'Total Revenue (₹)', 'Expenses (₹)', 'Total Cost (₹)', 'Variance Income %']
+
+    def __init__(self):
+        self.total_revenue = 0
+        self.total_expenses = 0
+        self.total_costs = 0
+        self.variance_sum = 0
+        self.variance_count = 0
+        self.latest = None  # last two rows in month order
+
+    def update(self, chunk):
+        self.total_revenue += chunk['Total Revenue (₹)'].sum()
+        self.total_expenses += chunk['Expenses (₹)'].sum()
+        self.total_costs += chunk['Total Cost (₹)'].sum()
+        self.variance_sum += chunk['Variance Income %'].sum()
+        self.variance_count += chunk['Variance Income %'].count()
+        months = pd.DataFrame({
+            'Month': pd.to_datetime(chunk['Month'], format='%B'),
+            'Total Revenue (₹)': chunk['Total Revenue (₹)']
+        })
+        self.latest = last_rows([self.latest, months], 'Month')
+
+    def merge(self, other):
+        self.total_revenue += other.total_revenue
+        self.total_expenses += other.total_expenses
+        self.total_costs += other.total_costs
+        self.variance_sum += other.variance_sum
+        self.variance_count += other.variance_count
+        if other.latest is not None:
+            self.latest = last_rows([self.latest, other.latest], 'Month')
+
+    def result(self):
         # Calculate financial metrics
-        total_revenue = df['Total Revenue (₹)'].sum()
-        total_expenses = df['Expenses (₹)'].sum()
-        total_costs = df['Total Cost (₹)'].sum()
+        total_revenue = self.total_revenue
+        total_expenses = self.total_expenses
+        total_costs = self.total_costs
         net_profit = total_revenue - (total_expenses + total_costs)
         profit_margin = (net_profit / total_revenue) * 100 if total_revenue > 0 else 0
         
         # Calculate revenue growth
-        df['Month'] = pd.to_datetime(df['Month'], format='%B')
-        df = df.sort_values('Month')
-        current_month_revenue = df.iloc[-1]['Total Revenue (₹)'] if not df.empty else 0
-        previous_month_revenue = df.iloc[-2]['Total Revenue (₹)'] if len(df) > 1 else 0
+        revenues = self.latest['Total Revenue (₹)'] if self.latest is not None else pd.Series(dtype='float64')
+        current_month_revenue = revenues.iloc[-1] if not revenues.empty else 0
+        previous_month_revenue = revenues.iloc[-2] if len(revenues) > 1 else 0
         revenue_growth = ((current_month_revenue - previous_month_revenue) / previous_month_revenue) * 100 if previous_month_revenue > 0 else 0
 
         # Calculate resource utilization based on available metrics
         resource_utilization = round((total_revenue / (total_costs + total_expenses) * 100) if (total_costs + total_expenses) > 0 else 0, 1)
         
         # Calculate employee and customer satisfaction based on variance metrics
-        variance_income_percent = df['Variance Income %'].mean()
+        variance_income_percent = self.variance_sum / self.variance_count if self.variance_count else np.nan
         employee_satisfaction = round(max(0, min(100, 75 + variance_income_percent)), 1)
         customer_satisfaction = round(max(0, min(100, 80 + variance_income_percent)), 1)
         
@@ -376,125 +1413,134 @@ def process_company_data():
             'customer_satisfaction': customer_satisfaction,
             'revenue_growth': round(revenue_growth, 1)
         }
-    except Exception as e:
-        print(f"Error processing company data: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return None
+
+@lru_cache(maxsize=ANALYTICS_CACHE_SIZE)
+def _company_analytics(csv_path, signature, chunk_size=None, processes=None, columnar=False):
+    """Calculate company metrics, cached until the file signature changes; columnar (COLUMNAR_CACHE) keeps the two readers' results apart"""
+    return accumulate(CompanyStats, csv_path, (), chunk_size, processes).result()
+
+COMPANY_RULES = [
+    {'type': 'financial', 'priority': 'high', 'metric': 'profit_margin', 'op': '<', 'threshold': 10,
+     'message': 'Low profit margin. Review pricing strategy and cost structure.',
+     'action': 'Conduct pricing and cost analysis'},
+    {'type': 'operations', 'priority': 'high', 'metric': 'resource_utilization', 'op': '<', 'threshold': 70,
+     'message': 'Resource utilization is below optimal. Optimize resource allocation and workflow.',
+     'action': 'Implement resource optimization plan'},
+    {'type': 'hr', 'priority': 'high', 'metric': 'employee_satisfaction', 'op': '<', 'threshold': 75,
+     'message': 'Employee satisfaction needs improvement. Review HR policies and work environment.',
+     'action': 'Conduct employee satisfaction survey and implement improvements'},
+    {'type': 'customer', 'priority': 'high', 'metric': 'customer_satisfaction', 'op': '<', 'threshold': 80,
+     'message': 'Customer satisfaction could be improved. Review customer service and product quality.',
+     'action': 'Implement customer feedback system'},
+    {'type': 'department', 'priority': 'medium', 'items': 'departments', 'metric': 'performance', 'op': '<', 'threshold': 70,
+     'message': '{name} department performance is below target. Review operations and provide necessary support.',
+     'action': 'Review {name} department operations'},
+    {'type': 'growth', 'priority': 'medium', 'metric': 'revenue_growth', 'op': '<', 'threshold': 5,
+     'message': 'Revenue growth is slow. Consider new market opportunities and sales strategies.',
+     'action': 'Develop revenue growth strategy'},
+]
+COMPANY_RULESET = compile_rules(COMPANY_RULES)
 
 def generate_company_recommendations(company_data):
     """Generate AI-powered recommendations for better business practices"""
-    recommendations = []
-    
-    # Analyze profit margin
-    if company_data['profit_margin'] < 10:
-        recommendations.append({
-            'type': 'financial',
-            'priority': 'high',
-            'message': 'Low profit margin. Review pricing strategy and cost structure.',
-            'action': 'Conduct pricing and cost analysis'
-        })
-    
-    # Analyze resource utilization
-    if company_data['resource_utilization'] < 70:
-        recommendations.append({
-            'type': 'operations',
-            'priority': 'high',
-            'message': 'Resource utilization is below optimal. Optimize resource allocation and workflow.',
-            'action': 'Implement resource optimization plan'
-        })
-    
-    # Analyze employee satisfaction
-    if company_data['employee_satisfaction'] < 75:
-        recommendations.append({
-            'type': 'hr',
-            'priority': 'high',
-            'message': 'Employee satisfaction needs improvement. Review HR policies and work environment.',
-            'action': 'Conduct employee satisfaction survey and implement improvements'
-        })
-    
-    # Analyze customer satisfaction
-    if company_data['customer_satisfaction'] < 80:
-        recommendations.append({
-            'type': 'customer',
-            'priority': 'high',
-            'message': 'Customer satisfaction could be improved. Review customer service and product quality.',
-            'action': 'Implement customer feedback system'
-        })
-    
-    # Analyze department performance
-    for dept in company_data['departments']:
-        if dept['performance'] < 70:
-            recommendations.append({
-                'type': 'department',
-                'priority': 'medium',
-                'message': f"{dept['name']} department performance is below target. Review operations and provide necessary support.",
-                'action': f'Review {dept["name"]} department operations'
-            })
-    
-    # Revenue growth recommendations
-    if company_data['revenue_growth'] < 5:
-        recommendations.append({
-            'type': 'growth',
-            'priority': 'medium',
-            'message': 'Revenue growth is slow. Consider new market opportunities and sales strategies.',
-            'action': 'Develop revenue growth strategy'
-        })
-    
-    # Sort recommendations by priority
-    recommendations.sort(key=lambda x: x['priority'] == 'high', reverse=True)
-    return recommendations
+    return entity_recommendations(COMPANY_RULESET, company_data)
 
-def process_individual_data():
+def process_individual_data(entity_id=None):
     """Process individual financial data from CSV file"""
+    if app.config['ANALYTICS_WORKER_ENABLED']:
+        return analytics_snapshot('individual', entity_id, IndividualStats)
+    # A user linked to dataset rows sees only those rows, otherwise the global figures
+    data = entity_analytics('person.csv', IndividualStats, entity_id)
+    if data is not None:
+        return data
     try:
         # Check if file exists
-        csv_path = 'dataset/person.csv'
+        csv_path = dataset_path('person.csv')
         if not os.path.exists(csv_path):
             print(f"Error: File not found at {csv_path}")
             return None
-            
-        df = pd.read_csv(csv_path)
+
+        return copy.deepcopy(_individual_analytics(csv_path, file_signature(csv_path), app.config['CSV_CHUNK_SIZE'],
+                                                   app.config['ANALYTICS_PROCESSES'], app.config['COLUMNAR_CACHE']))
+    except Exception as e:
+        print(f"Error processing individual data: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+class IndividualStats:
+    """Personal finance averages, the latest month's savings and tips and the first row of each month, accumulated one chunk of rows at a time"""
+    EXPENSE_COLUMNS = {
+        'Rent': ['Rent (₹)'],
+        'Utilities': ['Electricity Bill (₹)', 'Water Bill (₹)'],
+        'Grocery': ['Grocery (₹)'],
+        'Transportation': ['Transportation (₹)'],
+        'Entertainment': ['Entertainment (₹)'],
+        'Healthcare': ['Healthcare (₹)'],
+        'Miscellaneous': ['Miscellaneous (₹)']
+    }
+    MEAN_COLUMNS = ['Salary (₹)', 'Total Expenses (₹)', 'Savings (₹)'] + [column for columns in EXPENSE_COLUMNS.values() for column in columns]
+    LATEST_COLUMNS = ['Month', 'Savings (₹)', 'Savings Improvement Tips', 'Suggested Changes']
+    COLUMNS = MEAN_COLUMNS + ['Month', 'User Savings Goal (₹)', 'Savings Improvement Tips', 'Suggested Changes']
+
+    def __init__(self):
+        self.sums = pd.Series(0.0, index=self.MEAN_COLUMNS)
+        self.counts = pd.Series(0, index=self.MEAN_COLUMNS)
+        self.last_row = None  # last row in file order, for the savings goal
+        self.latest = None  # last two rows in month order
+        self.month_firsts = None  # first row of each month
+
+    def update(self, chunk):
+        self.sums = self.sums + chunk[self.MEAN_COLUMNS].sum()
+        self.counts = self.counts + chunk[self.MEAN_COLUMNS].count()
+        self.last_row = last_rows([self.last_row, chunk[['User Savings Goal (₹)']]], n=1)
+        self.latest = last_rows([self.latest, chunk[self.LATEST_COLUMNS]], 'Month')
+        self.month_firsts = first_rows([self.month_firsts, chunk[['Month', 'Total Expenses (₹)', 'Savings (₹)']]], 'Month')
+
+    def merge(self, other):
+        self.sums = self.sums + other.sums
+        self.counts = self.counts + other.counts
+        if other.last_row is not None:
+            self.last_row = last_rows([self.last_row, other.last_row], n=1)
+            self.latest = last_rows([self.latest, other.latest], 'Month')
+            self.month_firsts = first_rows([self.month_firsts, other.month_firsts], 'Month')
+
+    def result(self):
+        means = self.sums / self.counts
         
         # Calculate monthly averages
-        avg_salary = df['Salary (₹)'].mean()
-        avg_expenses = df['Total Expenses (₹)'].mean()
-        avg_savings = df['Savings (₹)'].mean()
-        savings_goal = df['User Savings Goal (₹)'].iloc[-1]  # Get the latest savings goal
+        avg_salary = means['Salary (₹)']
+        avg_expenses = means['Total Expenses (₹)']
+        avg_savings = means['Savings (₹)']
+        savings_goal = self.last_row['User Savings Goal (₹)'].iloc[-1]  # Get the latest savings goal
         
         # Calculate expense breakdown
         expense_categories = {
-            'Rent': df['Rent (₹)'].mean(),
-            'Utilities': df['Electricity Bill (₹)'].mean() + df['Water Bill (₹)'].mean(),
-            'Grocery': df['Grocery (₹)'].mean(),
-            'Transportation': df['Transportation (₹)'].mean(),
-            'Entertainment': df['Entertainment (₹)'].mean(),
-            'Healthcare': df['Healthcare (₹)'].mean(),
-            'Miscellaneous': df['Miscellaneous (₹)'].mean()
+            category: sum(means[column] for column in columns)
+            for category, columns in self.EXPENSE_COLUMNS.items()
         }
         
         # Calculate savings rate
         savings_rate = (avg_savings / avg_salary * 100) if avg_salary > 0 else 0
         
         # Calculate month-over-month growth
-        df = df.sort_values('Month')
-        current_month_savings = df['Savings (₹)'].iloc[-1]
-        previous_month_savings = df['Savings (₹)'].iloc[-2] if len(df) > 1 else 0
+        current_month_savings = self.latest['Savings (₹)'].iloc[-1]
+        previous_month_savings = self.latest['Savings (₹)'].iloc[-2] if len(self.latest) > 1 else 0
         savings_growth = ((current_month_savings - previous_month_savings) / previous_month_savings * 100) if previous_month_savings > 0 else 0
         
         # Get spending patterns
+        month_firsts = self.month_firsts.sort_values('Month', kind='mergesort')
         spending_pattern = []
-        for month in df['Month'].unique():
-            month_data = df[df['Month'] == month]
+        for month, expenses, savings in zip(month_firsts['Month'], month_firsts['Total Expenses (₹)'], month_firsts['Savings (₹)']):
             spending_pattern.append({
                 'month': month,
-                'expenses': float(month_data['Total Expenses (₹)'].iloc[0]),
-                'savings': float(month_data['Savings (₹)'].iloc[0])
+                'expenses': float(expenses),
+                'savings': float(savings)
             })
         
         # Get improvement tips
-        latest_tips = df['Savings Improvement Tips'].iloc[-1]
-        suggested_changes = df['Suggested Changes'].iloc[-1]
+        latest_tips = self.latest['Savings Improvement Tips'].iloc[-1]
+        suggested_changes = self.latest['Suggested Changes'].iloc[-1]
         
         return {
             'monthly_income': round(avg_salary, 2),
@@ -508,68 +1554,850 @@ def process_individual_data():
             'improvement_tips': latest_tips,
             'suggested_changes': suggested_changes
         }
-    except Exception as e:
-        print(f"Error processing individual data: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return None
+
+@lru_cache(maxsize=ANALYTICS_CACHE_SIZE)
+def _individual_analytics(csv_path, signature, chunk_size=None, processes=None, columnar=False):
+    """Calculate individual finance metrics, cached until the file signature changes; columnar (COLUMNAR_CACHE) keeps the two readers' results apart"""
+    return accumulate(IndividualStats, csv_path, (), chunk_size, processes).result()
+
+def analytics_cache_info():
+    """Hit/miss counters and sizes of the CSV analytics caches"""
+    return {
+        'agricultural': _agricultural_analytics.cache_info()._asdict(),
+        'company': _company_analytics.cache_info()._asdict(),
+        'individual': _individual_analytics.cache_info()._asdict()
+    }
+
+@app.cli.command('convert-datasets')
+def convert_datasets_command():
+    """Convert the dataset CSVs to columnar files ahead of the first dashboard request"""
+    for filename in ('agriculture.csv', 'company.csv', 'person.csv'):
+        csv_path = dataset_path(filename)
+        if not os.path.exists(csv_path):
+            print(f"Skipping {csv_path}: file not found")
+            continue
+        print(f"Converted {csv_path} -> {convert_to_columnar(csv_path, app.config['CSV_CHUNK_SIZE'])}")
+
+INDIVIDUAL_RULES = [
+    {'type': 'savings', 'priority': 'high', 'metric': 'savings_rate', 'op': '<', 'threshold': 20,
+     'message': 'Your savings rate is below recommended levels. Consider reducing non-essential expenses.',
+     'action': 'Review and optimize monthly expenses'},
+    {'type': 'goal', 'priority': 'high', 'metric': 'monthly_savings', 'op': '<', 'threshold': 'savings_goal',
+     'message': 'You are currently below your savings goal.',
+     'action': 'Identify additional saving opportunities'},
+    {'type': 'housing', 'priority': 'medium', 'metric': 'expense_breakdown.Rent', 'op': '>', 'threshold': 'monthly_income', 'factor': 0.3,
+     'message': 'Your rent expenses exceed 30% of your income.',
+     'action': 'Consider housing alternatives or additional income sources'},
+    {'type': 'lifestyle', 'priority': 'medium', 'metric': 'expense_breakdown.Entertainment', 'op': '>', 'threshold': 'monthly_income', 'factor': 0.1,
+     'message': 'Entertainment expenses are higher than recommended.',
+     'action': 'Review and optimize entertainment spending'},
+    {'type': 'custom', 'priority': 'medium', 'metric': 'improvement_tips', 'op': 'present',
+     'message_from': 'improvement_tips', 'action_from': 'suggested_changes'},
+]
+INDIVIDUAL_RULESET = compile_rules(INDIVIDUAL_RULES)
 
 def generate_individual_recommendations(individual_data):
     """Generate AI-powered recommendations for better personal finance management"""
-    recommendations = []
-    
-    # Analyze savings rate
-    if individual_data['savings_rate'] < 20:
-        recommendations.append({
-            'type': 'savings',
-            'priority': 'high',
-            'message': 'Your savings rate is below recommended levels. Consider reducing non-essential expenses.',
-            'action': 'Review and optimize monthly expenses'
-        })
-    
-    # Compare with savings goal
-    if individual_data['monthly_savings'] < individual_data['savings_goal']:
-        recommendations.append({
-            'type': 'goal',
-            'priority': 'high',
-            'message': 'You are currently below your savings goal.',
-            'action': 'Identify additional saving opportunities'
-        })
-    
-    # Analyze expense categories
-    expense_breakdown = individual_data['expense_breakdown']
-    income = individual_data['monthly_income']
-    
-    # Check rent expense (should be less than 30% of income)
-    if expense_breakdown['Rent'] > (income * 0.3):
-        recommendations.append({
-            'type': 'housing',
-            'priority': 'medium',
-            'message': 'Your rent expenses exceed 30% of your income.',
-            'action': 'Consider housing alternatives or additional income sources'
-        })
-    
-    # Check entertainment expenses (should be less than 10% of income)
-    if expense_breakdown['Entertainment'] > (income * 0.1):
-        recommendations.append({
-            'type': 'lifestyle',
-            'priority': 'medium',
-            'message': 'Entertainment expenses are higher than recommended.',
-            'action': 'Review and optimize entertainment spending'
-        })
-    
-    # Add improvement tips from data
-    if individual_data['improvement_tips']:
-        recommendations.append({
-            'type': 'custom',
-            'priority': 'medium',
-            'message': individual_data['improvement_tips'],
-            'action': individual_data['suggested_changes']
-        })
-    
-    # Sort recommendations by priority
-    recommendations.sort(key=lambda x: x['priority'] == 'high', reverse=True)
-    return recommendations
+    return entity_recommendations(INDIVIDUAL_RULESET, individual_data)
+
+# Instrumentation
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by label values"""
+
+    def __init__(self, name, documentation, labels, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            counts, total = self._series.get(label_values, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._series[label_values] = (counts, total + value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        for label_values, counts, total in series:
+            labels = ''.join(f'{name}="{value}",' for name, value in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{{{labels}le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels.rstrip(",")}}} {total}')
+            lines.append(f'{self.name}_count{{{labels.rstrip(",")}}} {cumulative}')
+        return lines
+
+class Counter:
+    """Prometheus-style monotonically increasing counter keyed by label values"""
+
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            labels = ','.join(f'{name}="{value}"' for name, value in zip(self.labels, label_values))
+            lines.append(f'{self.name}{{{labels}}} {value}')
+        return lines
+
+REQUEST_DURATION = Histogram('app_request_duration_seconds', 'Request latency by endpoint.', ('endpoint', 'method', 'status'), app.config['METRICS_BUCKETS'])
+STAGE_DURATION = Histogram('app_stage_duration_seconds', 'Time spent per request in each stage, excluding nested stages.', ('stage',), app.config['METRICS_BUCKETS'])
+CACHE_REQUESTS = Counter('app_cache_requests_total', 'Result cache lookups by cache and result.', ('cache', 'result'))
+
+def record_stage(name, seconds):
+    """Add exclusive time to a stage of the current request and take it off the enclosing stage"""
+    if not has_request_context():
+        return
+    timings = g.setdefault('stage_timings', {})
+    timings[name] = timings.get(name, 0.0) + seconds
+    stack = g.get('stage_stack')
+    if stack:
+        stack[-1] += seconds
+
+@contextmanager
+def stage_timer(name):
+    """Time a block as a stage of the current request (no-op outside requests)"""
+    if not has_request_context():
+        yield
+        return
+    stack = g.setdefault('stage_stack', [])
+    stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = stack.pop()
+        record_stage(name, elapsed - nested)
+        if stack:
+            stack[-1] += nested
+
+def timed_iter(iterable, name):
+    """Yield from an iterable, timing only the time spent producing each item"""
+    iterator = iter(iterable)
+    while True:
+        with stage_timer(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+# The start time lives on the statement's execution context, so a statement that raises
+# (and never reaches after_cursor_execute) leaves nothing behind on the pooled connection
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context._query_start = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    record_stage('db', time.perf_counter() - context._query_start)
+
+def profiling_requested():
+    if not app.config['PROFILING_ENABLED']:
+        return None
+    mode = request.headers.get('X-Profile') or request.args.get('profile')
+    if mode in (None, '', '0'):
+        return None
+    return 'pyinstrument' if mode == 'pyinstrument' and pyinstrument is not None else 'cprofile'
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    # g belongs to the app context, which an outer context (CLI, tests) can share across requests
+    g.stage_timings = {}
+    g.stage_stack = []
+    g.profiler = None
+    mode = profiling_requested()
+    if mode == 'pyinstrument':
+        g.profiler = pyinstrument.Profiler()
+        g.profiler.start()
+    elif mode == 'cprofile':
+        g.profiler = cProfile.Profile()
+        try:
+            g.profiler.enable()
+        except ValueError as e:  # another profiler is already running in this process
+            print(f"Profiling not started: {str(e)}")
+            g.profiler = None
+
+def dump_profile(profiler):
+    """Write a finished request profile to PROFILE_DIR and return its path"""
+    directory = app.config['PROFILE_DIR'] or os.path.join(app.instance_path, 'profiles')
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{request.endpoint or 'unknown'}")
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        profiler.dump_stats(stem + '.prof')
+        return stem + '.prof'
+    profiler.stop()
+    with open(stem + '.html', 'w') as f:
+        f.write(profiler.output_html())
+    return stem + '.html'
+
+@app.teardown_request
+def stop_profiler(exc):
+    """Stop a profiler left running by a request that failed before after_request"""
+    profiler = g.pop('profiler', None)
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+    elif profiler is not None:
+        profiler.stop()
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.get('request_start')
+    if start is None:
+        return response
+    total = time.perf_counter() - start
+    profiler = g.get('profiler')
+    if profiler is not None:
+        g.profiler = None
+        # Only the file name; the server's directory layout stays private
+        response.headers['X-Profile-File'] = os.path.basename(dump_profile(profiler))
+    timings = g.get('stage_timings', {})
+    if app.config['METRICS_ENABLED']:
+        REQUEST_DURATION.observe(total, request.endpoint or 'unknown', request.method, str(response.status_code))
+        for name, seconds in timings.items():
+            STAGE_DURATION.observe(seconds, name)
+    if app.config['SERVER_TIMING']:
+        metrics = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in timings.items()]
+        response.headers['Server-Timing'] = ', '.join(metrics + [f'total;dur={total * 1000:.2f}'])
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of request, stage and cache metrics"""
+    token = app.config['METRICS_TOKEN']
+    if not app.config['METRICS_ENABLED'] or not token:
+        return 'Metrics are disabled\n', 404
+    if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+        return 'A valid metrics token is required\n', 401, {'WWW-Authenticate': 'Bearer'}
+    lines = REQUEST_DURATION.render() + STAGE_DURATION.render() + JOB_DURATION.render() + CACHE_REQUESTS.render()
+    lines += ['# HELP app_dataset_cache_requests_total Dataset analytics cache lookups.', '# TYPE app_dataset_cache_requests_total counter']
+    for dataset, info in analytics_cache_info().items():
+        lines.append(f'app_dataset_cache_requests_total{{dataset="{dataset}",result="hit"}} {info["hits"]}')
+        lines.append(f'app_dataset_cache_requests_total{{dataset="{dataset}",result="miss"}} {info["misses"]}')
+    cache = dashboard_cache()
+    if hasattr(cache, 'info'):
+        info = cache.info()
+        lines += ['# HELP app_dashboard_cache_entries Entries held by the in-process dashboard cache.', '# TYPE app_dashboard_cache_entries gauge']
+        lines.append(f'app_dashboard_cache_entries {info["currsize"]}')
+    lines += ['# HELP app_user_cache_entries Users held by the identity cache.', '# TYPE app_user_cache_entries gauge']
+    lines.append(f'app_user_cache_entries {user_cache().info()["currsize"]}')
+    return app.response_class('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+# Per-entity analytics
+def entity_key(value):
+    """Normalized lookup key of an entity id, so 12, 12.0 and '12' find the same rows"""
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+@lru_cache(maxsize=ANALYTICS_CACHE_SIZE)
+def entity_index(directory, column):
+    """Row numbers of every entity of a columnar dataset, grouped once so one entity's rows are found without a scan"""
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        info = json.load(f)['columns'][column]
+    values = np.load(os.path.join(directory, info['file']))
+    if info.get('categories') is not None:
+        codes, keys = values, info['categories']
+    else:
+        codes, keys = pd.factorize(values)
+    # Stable sort keeps each entity's rows in file order; missing ids (code -1) sort first and are skipped
+    order = np.argsort(codes, kind='stable')
+    offsets = np.cumsum(np.bincount(np.asarray(codes) + 1, minlength=len(keys) + 1))
+    return {entity_key(key): order[offsets[code]:offsets[code + 1]]
+            for code, key in enumerate(keys) if offsets[code + 1] > offsets[code]}
+
+def entity_stats(stats_class, csv_path, column, entity_id, args=(), chunk_size=None):
+    """Accumulate only one entity's rows of a dataset; None when it has no rows"""
+    if app.config['COLUMNAR_CACHE']:
+        try:
+            directory = convert_to_columnar(csv_path, chunk_size)
+        except OSError as e:
+            print(f"Error building columnar cache for {csv_path}: {str(e)}")
+        else:
+            rows = entity_index(directory, column).get(entity_id)
+            if rows is None:
+                return None
+            stats = stats_class(*args)
+            stats.update(read_columnar_rows(directory, stats_class.COLUMNS, rows))
+            return stats
+    # Without the columnar cache the rows can only be found by scanning the file
+    stats = None
+    for chunk in read_dataset(csv_path, list(dict.fromkeys(stats_class.COLUMNS + [column])), chunk_size):
+        chunk = chunk[chunk[column].map(entity_key) == entity_id]
+        if len(chunk):
+            stats = stats or stats_class(*args)
+            stats.update(chunk)
+    return stats
+
+@lru_cache(maxsize=ENTITY_ANALYTICS_CACHE_SIZE)
+def _entity_analytics(stats_class, csv_path, signature, column, entity_id, args=(), chunk_size=None, columnar=False):
+    """Calculate one entity's metrics, cached until the file signature or the reader (COLUMNAR_CACHE) changes"""
+    stats = entity_stats(stats_class, csv_path, column, entity_id, args, chunk_size)
+    return stats.result() if stats is not None else None
+
+def entity_analytics(filename, stats_class, entity_id, args=()):
+    """Analytics of one entity's rows, or None when the dataset has no entity column or no rows for the entity"""
+    column = app.config['DATASET_ENTITY_COLUMNS'].get(filename)
+    if column is None or entity_id is None:
+        return None
+    try:
+        csv_path = dataset_path(filename)
+        return copy.deepcopy(_entity_analytics(stats_class, csv_path, file_signature(csv_path), column,
+                                               entity_key(entity_id), args, app.config['CSV_CHUNK_SIZE'], app.config['COLUMNAR_CACHE']))
+    except Exception as e:
+        print(f"Error processing {filename} rows of {entity_id}: {str(e)}")
+        return None
+
+def prepare_entity_index(filename):
+    """Build the columnar copy and entity index that per-entity analytics of a dataset read, ahead of any request"""
+    column = app.config['DATASET_ENTITY_COLUMNS'].get(filename)
+    if column is not None and app.config['COLUMNAR_CACHE']:
+        entity_index(convert_to_columnar(dataset_path(filename), app.config['CSV_CHUNK_SIZE']), column)
+
+@app.cli.command('set-dataset-id')
+@click.argument('email')
+@click.argument('dataset_id', required=False)
+def set_dataset_id_command(email, dataset_id):
+    """Link a user to their rows of the dataset CSVs (omit DATASET_ID to show global figures)"""
+    user = User.query.filter_by(email=email).first()
+    if user is None:
+        raise click.ClickException(f'No user with email {email}')
+    user.dataset_id = dataset_id
+    db.session.commit()
+    invalidate_dashboard_cache(user.id)
+    print(f"{email} now sees {'rows of ' + dataset_id if dataset_id else 'global figures'}")
+
+# Offline analytics
+analytics_cli = AppGroup('analytics', help='Offline analytics over every user')
+app.cli.add_command(analytics_cli)
+
+def user_analytics_record(user_id, user_type, groups, now):
+    """Dashboard totals, expense categories and monthly trend of one user from their grouped transaction rows"""
+    figures = aggregate(((int(year), int(month), transaction_type, category, total, last_date)
+                         for _, year, month, transaction_type, category, total, _, last_date in groups), now)
+    summary = summary_figures(figures, now, 0)
+    return {
+        'user_id': user_id,
+        'user_type': user_type,
+        'transactions': sum(group[6] for group in groups),
+        'total_income': summary['total_income'],
+        'total_expenses': summary['total_expenses'],
+        'remaining_balance': summary['remaining_balance'],
+        'monthly_income': summary['monthly_income'],
+        'monthly_expenses': summary['monthly_expenses'],
+        # Most recently used category first, as on the dashboard
+        'categories': [{'category': category, 'expenses': expenses} for category, expenses in summary['category_expenses'].items()],
+        'months': [{'month': f'{year}-{month:02d}', 'income': from_paise(month_totals.get('income', 0)),
+                    'expenses': from_paise(month_totals.get('expense', 0))}
+                   for (year, month), month_totals in sorted(figures['months'].items())],
+    }
+
+def all_user_analytics(after_user_id=0):
+    """(record, transaction count) of every user with an id above after_user_id in id order, from one grouped scan"""
+    now = datetime.utcnow()
+    year_col = extract('year', Transaction.date)
+    month_col = extract('month', Transaction.date)
+    groups = db.session.query(
+        Transaction.user_id,
+        year_col,
+        month_col,
+        Transaction.transaction_type,
+        Transaction.category,
+        func.sum(Transaction.amount_paise),
+        func.count(Transaction.id),
+        func.max(Transaction.date)
+    ).filter(
+        Transaction.user_id > after_user_id,
+        Transaction.date.isnot(None)
+    ).group_by(
+        Transaction.user_id, year_col, month_col, Transaction.transaction_type, Transaction.category
+    ).order_by(Transaction.user_id).yield_per(ANALYTICS_BUILD_FETCH_SIZE)
+    users = db.session.query(User.id, User.user_type).filter(User.id > after_user_id).order_by(User.id).yield_per(ANALYTICS_BUILD_FETCH_SIZE)
+    # Merge the two id-ordered streams; users without transactions get zero totals
+    grouped = itertools.groupby(groups, key=lambda row: row[0])
+    current = next(grouped, None)
+    for user_id, user_type in users:
+        while current is not None and current[0] < user_id:  # rows of a deleted user
+            current = next(grouped, None)
+        rows = []
+        if current is not None and current[0] == user_id:
+            rows = list(current[1])
+            current = next(grouped, None)
+        record = user_analytics_record(user_id, user_type, rows, now)
+        yield record, record['transactions']
+
+def parquet_schema():
+    return pyarrow.schema([
+        ('user_id', pyarrow.int64()),
+        ('user_type', pyarrow.string()),
+        ('transactions', pyarrow.int64()),
+        ('total_income', pyarrow.float64()),
+        ('total_expenses', pyarrow.float64()),
+        ('remaining_balance', pyarrow.float64()),
+        ('monthly_income', pyarrow.float64()),
+        ('monthly_expenses', pyarrow.float64()),
+        ('categories', pyarrow.list_(pyarrow.struct([('category', pyarrow.string()), ('expenses', pyarrow.float64())]))),
+        ('months', pyarrow.list_(pyarrow.struct([('month', pyarrow.string()), ('income', pyarrow.float64()), ('expenses', pyarrow.float64())]))),
+    ])
+
+def write_build_checkpoint(path, state):
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(state, f)
+    os.replace(temporary, path)
+
+def build_output_intact(output, output_format, state):
+    """Whether everything a build checkpoint records as written is still in the output"""
+    if output_format == 'jsonl':
+        return os.path.isfile(output) and os.path.getsize(output) >= state['offset']
+    return all(os.path.isfile(os.path.join(output, f'part-{part:05d}.parquet')) for part in range(state['parts']))
+
+@analytics_cli.command('build')
+@click.argument('output', type=click.Path())
+@click.option('--format', 'output_format', type=click.Choice(['jsonl', 'parquet']), default='jsonl',
+              help='One JSON line per user, or a directory of Parquet part files (needs pyarrow)')
+@click.option('--batch-users', type=int, default=1000, help='Users written between checkpoints')
+@click.option('--restart', is_flag=True, help='Ignore an earlier checkpoint and start over')
+def analytics_build_command(output, output_format, batch_users, restart):
+    """Write every user's totals, expense categories and monthly trend, resuming an interrupted build"""
+    if output_format == 'parquet' and pyarrow is None:
+        raise click.ClickException('Parquet output needs pyarrow installed')
+    output = output.rstrip(os.sep)
+    checkpoint_path = output + '.checkpoint'
+    state = None
+    if not restart and os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            state = json.load(f)
+        if state['format'] != output_format:
+            raise click.ClickException(f"{output} was started as {state['format']}; pass --restart to rebuild it")
+        if not build_output_intact(output, output_format, state):
+            # The checkpoint no longer describes the output, so nothing written before it can be trusted
+            print(f"{output} is missing or shorter than its checkpoint; starting over")
+            state = None
+        elif state['complete']:
+            print(f"{output} is already complete ({state['users']} users); pass --restart to rebuild it")
+            return
+        else:
+            print(f"Resuming after user {state['last_user_id']} ({state['users']} users written)")
+    resuming = state is not None
+    state = state or {'format': output_format, 'last_user_id': 0, 'users': 0, 'rows': 0, 'offset': 0, 'parts': 0, 'complete': False}
+
+    # The output is cut back to the last checkpoint, so records written after it are not duplicated
+    if output_format == 'jsonl':
+        f = open(output, 'r+b' if resuming else 'wb')
+        f.truncate(state['offset'])
+        f.seek(state['offset'])
+    else:
+        os.makedirs(output, exist_ok=True)
+        if not resuming:
+            for name in os.listdir(output):
+                if name.startswith('part-') and name.endswith('.parquet'):
+                    os.remove(os.path.join(output, name))
+        schema = parquet_schema()
+
+    def write_batch(batch, rows):
+        if output_format == 'jsonl':
+            f.write(''.join(json.dumps(record) + '\n' for record in batch).encode())
+            f.flush()
+            os.fsync(f.fileno())
+            state['offset'] = f.tell()
+        else:
+            table = pyarrow.Table.from_pylist(batch, schema=schema)
+            pyarrow.parquet.write_table(table, os.path.join(output, f"part-{state['parts']:05d}.parquet"))
+            state['parts'] += 1
+        state['last_user_id'] = batch[-1]['user_id']
+        state['users'] += len(batch)
+        state['rows'] += rows
+        write_build_checkpoint(checkpoint_path, state)
+
+    total_users = User.query.count()
+    started = time.perf_counter()
+    rows_this_run = 0
+    batch = []
+    batch_rows = 0
+    try:
+        for record, rows in all_user_analytics(state['last_user_id']):
+            batch.append(record)
+            batch_rows += rows
+            if len(batch) >= batch_users:
+                write_batch(batch, batch_rows)
+                rows_this_run += batch_rows
+                batch, batch_rows = [], 0
+                elapsed = time.perf_counter() - started
+                print(f"{state['users']}/{total_users} users, {state['rows']} transactions "
+                      f"({rows_this_run / elapsed if elapsed else 0:.0f} rows/sec)")
+        if batch:
+            write_batch(batch, batch_rows)
+            rows_this_run += batch_rows
+    finally:
+        if output_format == 'jsonl':
+            f.close()
+    state['complete'] = True
+    write_build_checkpoint(checkpoint_path, state)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {state['users']} users ({state['rows']} transactions) to {output} in {elapsed:.2f}s "
+          f"({rows_this_run / elapsed if elapsed else 0:.0f} rows/sec)")
+
+# Background analytics
+# Dataset name -> (CSV file, function computing its analytics from the path and file signature)
+ANALYTICS_DATASETS = {
+    'agricultural': ('agriculture.csv', lambda csv_path, signature: _agricultural_analytics(
+        csv_path, signature, tuple(app.config['CROP_YIELD_EXTRA_STATS']), app.config['CSV_CHUNK_SIZE'], app.config['ANALYTICS_PROCESSES'],
+        app.config['COLUMNAR_CACHE'])),
+    'company': ('company.csv', lambda csv_path, signature: _company_analytics(
+        csv_path, signature, app.config['CSV_CHUNK_SIZE'], app.config['ANALYTICS_PROCESSES'], app.config['COLUMNAR_CACHE'])),
+    'individual': ('person.csv', lambda csv_path, signature: _individual_analytics(
+        csv_path, signature, app.config['CSV_CHUNK_SIZE'], app.config['ANALYTICS_PROCESSES'], app.config['COLUMNAR_CACHE'])),
+}
+# Finished jobs kept for the job status endpoint
+ANALYTICS_JOB_HISTORY = 100
+
+JOB_DURATION = Histogram('app_analytics_job_duration_seconds', 'Background analytics job duration by dataset.', ('dataset', 'status'), app.config['METRICS_BUCKETS'])
+
+class AnalyticsWorker:
+    """Thread pool recomputing dataset analytics snapshots when their CSVs change; requests only read finished snapshots"""
+
+    def __init__(self, max_workers=1, interval=60):
+        self.interval = interval
+        self.snapshots = {}
+        self.jobs = OrderedDict()
+        self._next_id = 1
+        self._pending = {}  # dataset -> id of its queued or running job
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analytics')
+        self._scheduler = threading.Thread(target=self._schedule, name='analytics-scheduler', daemon=True)
+
+    def start(self):
+        self._scheduler.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, dataset):
+        """Queue a recomputation of one dataset unless one is already queued or running; returns the job"""
+        with self._lock:
+            job_id = self._pending.get(dataset)
+            if job_id is not None:
+                return dict(self.jobs[job_id])
+            job = {'id': self._next_id, 'dataset': dataset, 'status': 'queued', 'queued_at': datetime.utcnow(),
+                   'started_at': None, 'finished_at': None, 'seconds': None, 'signature': None, 'error': None}
+            self._next_id += 1
+            self.jobs[job['id']] = job
+            self._pending[dataset] = job['id']
+            while len(self.jobs) > ANALYTICS_JOB_HISTORY and next(iter(self.jobs.values()))['status'] in ('done', 'failed'):
+                self.jobs.popitem(last=False)
+        self._executor.submit(self._run, job)
+        return dict(job)
+
+    def refresh_stale(self):
+        """Queue every dataset whose CSV changed since its snapshot was computed"""
+        for dataset, (filename, _) in ANALYTICS_DATASETS.items():
+            try:
+                signature = file_signature(dataset_path(filename))
+            except OSError:
+                continue
+            snapshot = self.snapshots.get(dataset)
+            if snapshot is None or snapshot['signature'] != signature:
+                self.submit(dataset)
+
+    def pending(self, dataset):
+        """True while a job recomputing the dataset is queued or running"""
+        with self._lock:
+            return dataset in self._pending
+
+    def snapshot(self, dataset):
+        """Copy of the latest finished analytics of a dataset, or None before the first one finishes"""
+        snapshot = self.snapshots.get(dataset)
+        return copy.deepcopy(snapshot['data']) if snapshot is not None else None
+
+    def status(self):
+        with self._lock:
+            jobs = [dict(job) for job in self.jobs.values()]
+        snapshots = {dataset: {'signature': snapshot['signature'], 'computed_at': snapshot['computed_at']}
+                     for dataset, snapshot in self.snapshots.items()}
+        return {'jobs': jobs, 'snapshots': snapshots}
+
+    def _run(self, job):
+        dataset = job['dataset']
+        filename, compute = ANALYTICS_DATASETS[dataset]
+        started = time.perf_counter()
+        with self._lock:
+            job.update(status='running', started_at=datetime.utcnow())
+        try:
+            with app.app_context():
+                csv_path = dataset_path(filename)
+                signature = file_signature(csv_path)
+                data = compute(csv_path, signature)
+                # Requests then only look an entity's rows up, never convert or index the file themselves
+                prepare_entity_index(filename)
+            # One assignment publishes the new snapshot; readers keep whichever dict they already hold
+            self.snapshots = dict(self.snapshots, **{dataset: {'data': data, 'signature': signature, 'computed_at': datetime.utcnow()}})
+            status, error = 'done', None
+        except Exception as e:
+            print(f"Error computing {dataset} analytics: {str(e)}")
+            status, error, signature = 'failed', str(e), None
+        seconds = time.perf_counter() - started
+        with self._lock:
+            job.update(status=status, error=error, signature=signature, finished_at=datetime.utcnow(), seconds=round(seconds, 3))
+            self._pending.pop(dataset, None)
+        JOB_DURATION.observe(seconds, dataset, status)
+        if status == 'done':
+            invalidate_dashboard_cache()
+
+    def _schedule(self):
+        while not self._stopped.is_set():
+            try:
+                self.refresh_stale()
+            except Exception as e:
+                print(f"Error scheduling analytics refresh: {str(e)}")
+            self._stopped.wait(self.interval)
+
+ANALYTICS_WORKER_LOCK = threading.Lock()
+
+def analytics_worker():
+    """The app's background analytics worker, started on first use"""
+    worker = app.extensions.get('analytics_worker')
+    if worker is None:
+        with ANALYTICS_WORKER_LOCK:
+            worker = app.extensions.get('analytics_worker')
+            if worker is None:
+                worker = AnalyticsWorker(app.config['ANALYTICS_WORKER_THREADS'], app.config['ANALYTICS_REFRESH_INTERVAL'])
+                app.extensions['analytics_worker'] = worker.start()
+    return worker
+
+def analytics_snapshot(dataset, entity_id=None, stats_class=None, args=()):
+    """Latest background snapshot of a dataset, queueing a refresh first if its CSV changed; None until one is published
+
+    A user linked to dataset rows gets the analytics of those rows, read through the columnar copy and
+    entity index the worker prepared for the snapshot's version of the CSV. While the worker catches up
+    with a changed CSV there is nothing to serve them without computing inline, so they get None too.
+    Without the columnar cache an entity's rows could only be found by a scan, so they get the global snapshot.
+    """
+    worker = analytics_worker()
+    worker.refresh_stale()
+    snapshot = worker.snapshots.get(dataset)
+    if snapshot is None:
+        return None
+    filename, _ = ANALYTICS_DATASETS[dataset]
+    if entity_id is not None and app.config['DATASET_ENTITY_COLUMNS'].get(filename) is not None and app.config['COLUMNAR_CACHE']:
+        try:
+            signature = file_signature(dataset_path(filename))
+        except OSError:
+            signature = None
+        if signature != snapshot['signature']:
+            return None
+        data = entity_analytics(filename, stats_class, entity_id, args)
+        if data is not None:
+            return data
+    return copy.deepcopy(snapshot['data'])
+
+def analytics_pending(dataset):
+    """True when the worker is still computing a dataset's analytics, so missing figures are not an error"""
+    return app.config['ANALYTICS_WORKER_ENABLED'] and analytics_worker().pending(dataset)
+
+def dataset_version(filename):
+    """Version of the analytics currently served for a CSV: its file signature, or its snapshot's with the worker"""
+    if app.config['ANALYTICS_WORKER_ENABLED']:
+        dataset = next(name for name, (csv_name, _) in ANALYTICS_DATASETS.items() if csv_name == filename)
+        snapshot = analytics_worker().snapshots.get(dataset)
+        return snapshot['signature'] if snapshot is not None else None
+    try:
+        return file_signature(dataset_path(filename))
+    except OSError:
+        return None
+
+@app.route('/api/v1/jobs')
+@login_required
+def analytics_jobs():
+    """Status and duration of background analytics jobs and the snapshots they published"""
+    if not app.config['ANALYTICS_WORKER_ENABLED']:
+        return jsonify({'error': 'The analytics worker is disabled'}), 404
+    return jsonify(analytics_worker().status())
+
+# Placeholder analytics shown when a dataset cannot be loaded or while charts load asynchronously
+EMPTY_FARM_DATA = {
+    'total_area': 0,
+    'total_yield': 0,
+    'water_usage': 0,
+    'crop_health': 0,
+    'crops': [],
+    'fertilizer_usage': 0,
+    'pesticide_usage': 0,
+    'fertilizer_percentage': 0,
+    'pesticide_percentage': 0,
+    'water_efficiency': 0
+}
+
+EMPTY_COMPANY_DATA = {
+    'total_revenue': 0,
+    'total_expenses': 0,
+    'net_profit': 0,
+    'profit_margin': 0,
+    'departments': [],
+    'resource_utilization': 0,
+    'employee_satisfaction': 0,
+    'customer_satisfaction': 0,
+    'revenue_growth': 0
+}
+
+EMPTY_INDIVIDUAL_DATA = {
+    'monthly_income': 0,
+    'monthly_expenses': 0,
+    'monthly_savings': 0,
+    'savings_goal': 0,
+    'savings_rate': 0,
+    'savings_growth': 0,
+    'expense_breakdown': {},
+    'spending_pattern': [],
+    'improvement_tips': '',
+    'suggested_changes': ''
+}
+
+# Dashboard cache
+class TTLCache:
+    """Thread-safe in-process LRU cache with per-entry expiry, the default dashboard cache backend"""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (entry[1] is not None and entry[1] < time.monotonic()):
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        """Store a value; ttl=None uses the cache default and ttl=0 keeps it until evicted"""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl if ttl else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key):
+        """Atomically increment a counter that never expires and return its new value"""
+        with self._lock:
+            value = self._data.get(key, (0, None))[0] + 1
+            self._data[key] = (value, None)
+            self._data.move_to_end(key)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def info(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'maxsize': self.maxsize, 'currsize': len(self._data)}
+
+def dashboard_cache():
+    """The configured dashboard cache backend, by default an in-process TTLCache"""
+    backend = app.config['DASHBOARD_CACHE_BACKEND']
+    if backend is None:
+        backend = app.extensions.get('dashboard_cache')
+        if backend is None:
+            backend = app.extensions.setdefault('dashboard_cache', TTLCache(app.config['DASHBOARD_CACHE_SIZE'], app.config['DASHBOARD_CACHE_TTL']))
+    return backend
+
+DASHBOARD_DATASETS = {'farmer': 'agriculture.csv', 'company': 'company.csv'}
+# User type -> background analytics dataset whose snapshot its dashboard shows
+USER_TYPE_DATASETS = {'farmer': 'agricultural', 'company': 'company', 'individual': 'individual'}
+
+def dashboard_cache_key(user):
+    """Cache key of a user's dashboard that changes with their transactions, the dataset, month and language; None when disabled"""
+    if not app.config['DASHBOARD_CACHE_ENABLED']:
+        return None
+    cache = dashboard_cache()
+    # Version counters are read on every lookup, so LRU evicts a user's entries before their version
+    user_version = cache.get(f'dashboard-version:{user.id}') or 0
+    global_version = cache.get('dashboard-version:global') or 0
+    dataset = dataset_version(DASHBOARD_DATASETS.get(user.user_type, 'person.csv'))
+    now = datetime.utcnow()
+    lang = session.get('lang', 'en')
+    return f'dashboard:{user.id}:{user_version}:{global_version}:{user.dataset_id}:{dataset}:{now.year}-{now.month}:{lang}'
+
+def invalidate_dashboard_cache(user_id=None):
+    """Drop cached dashboards of one user after their transactions change, or of everyone"""
+    dashboard_cache().incr(f'dashboard-version:{user_id}' if user_id is not None else 'dashboard-version:global')
+
+# User identity cache
+# Column values rather than instances are cached, so entries are never bound to a session
+USER_CACHE_COLUMNS = tuple(attribute.key for attribute in inspect(User).column_attrs)
+
+def user_cache():
+    cache = app.extensions.get('user_cache')
+    if cache is None:
+        cache = app.extensions.setdefault('user_cache', TTLCache(app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_TTL']))
+    return cache
+
+def load_cached_user(user_id):
+    """User with the given id, attached to the current session without a query when cached"""
+    if not app.config['USER_CACHE_ENABLED']:
+        return User.query.get(user_id)
+    cache = user_cache()
+    values = cache.get(user_id)
+    CACHE_REQUESTS.inc('user', 'hit' if values is not None else 'miss')
+    if values is None:
+        user = User.query.get(user_id)
+        if user is not None:
+            cache.set(user_id, {key: getattr(user, key) for key in USER_CACHE_COLUMNS})
+        return user
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def queue_user_cache_invalidation(mapper, connection, target):
+    # Dropped after the change commits; dropping at flush would let a concurrent miss cache the still-committed row
+    object_session(target).info.setdefault('changed_user_ids', set()).add(target.id)
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_user_cache(db_session):
+    for user_id in db_session.info.pop('changed_user_ids', ()):
+        user_cache().delete(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def discard_user_cache_invalidation(db_session):
+    db_session.info.pop('changed_user_ids', None)
 
 # Routes
 @app.route('/')
@@ -593,7 +2421,18 @@ def login(user_type):
         
         user = User.query.filter_by(email=email, user_type=user_type).first()
         
-        if user and user.verify_password(password):
+        try:
+            verified = user is not None and user.verify_password(password)
+        except LoginBusy:
+            flash(get_text('login_busy'), 'error')
+            return render_template('login.html', user_type=user_type), 503
+        if verified and password_needs_rehash(user.password_hash):
+            try:
+                user.password = password  # the configured hash parameters changed since this hash was made
+            except LoginBusy:
+                pass  # rehashing is optional; a later login picks it up
+
+        if verified:
             login_user(user, remember=remember)
             user.last_login = datetime.utcnow()
             db.session.commit()
@@ -640,13 +2479,15 @@ def register(user_type):
             name=name,
             user_type=user_type
         )
-        user.password = password
-        
         try:
+            user.password = password
             db.session.add(user)
             db.session.commit()
             flash('Registration successful! Please login.', 'success')
             return redirect(url_for('login', user_type=user_type))
+        except LoginBusy:
+            flash(get_text('login_busy'), 'error')
+            return redirect(url_for('register', user_type=user_type))
         except Exception as e:
             db.session.rollback()
             flash('An error occurred during registration', 'error')
@@ -662,168 +2503,98 @@ def logout():
     flash('You have been logged out successfully.', 'success')
     return redirect(url_for('base'))
 
-@app.route('/dashboard')
-@login_required
-def dashboard():
-    if current_user.user_type == 'farmer':
+def build_dashboard_context(user):
+    """Compute a user's dashboard template and context; the flag is False when data failed to load and must not be cached"""
+    if user.user_type == 'farmer':
+        complete = True
         # Get agricultural data
-        farm_data = process_agricultural_data()
+        with stage_timer('pandas'):
+            farm_data = process_agricultural_data(user.dataset_id)
+        computing = False
         if farm_data is None:
-            flash('Error loading agricultural data', 'error')
-            farm_data = {
-                'total_area': 0,
-                'total_yield': 0,
-                'water_usage': 0,
-                'crop_health': 0,
-                'crops': [],
-                'fertilizer_usage': 0,
-                'pesticide_usage': 0,
-                'fertilizer_percentage': 0,
-                'pesticide_percentage': 0,
-                'water_efficiency': 0
-            }
+            complete = False
+            farm_data = copy.deepcopy(EMPTY_FARM_DATA)
+            # Before the worker's first snapshot the figures are pending, not failed
+            computing = analytics_pending('agricultural')
+            if computing:
+                flash('Agricultural analytics are being computed and will appear shortly', 'info')
+            else:
+                flash('Error loading agricultural data', 'error')
         
         # Generate recommendations
-        recommendations = generate_farming_recommendations(farm_data)
-        print(farm_data,recommendations)
-        
-        # Get transactions
-        transactions = Transaction.query.filter_by(user_id=current_user.id).order_by(Transaction.date.desc()).all()
-        
-        # Calculate financial statistics
-        total_income = sum(t.amount for t in transactions if t.transaction_type == 'income')
-        total_expenses = sum(t.amount for t in transactions if t.transaction_type == 'expense')
-        remaining_balance = total_income - total_expenses
-        
-        # Calculate monthly statistics
-        current_month = datetime.utcnow().month
-        current_year = datetime.utcnow().year
-        monthly_income = sum(t.amount for t in transactions 
-                           if t.transaction_type == 'income' 
-                           and t.date.month == current_month 
-                           and t.date.year == current_year)
-        monthly_expenses = sum(t.amount for t in transactions 
-                             if t.transaction_type == 'expense' 
-                             and t.date.month == current_month 
-                             and t.date.year == current_year)
-        
-        # Calculate category-wise expenses
-        category_expenses = {}
-        for transaction in transactions:
-            if transaction.transaction_type == 'expense':
-                if transaction.category not in category_expenses:
-                    category_expenses[transaction.category] = 0
-                category_expenses[transaction.category] += transaction.amount
+        with stage_timer('recommendations'):
+            recommendations = generate_farming_recommendations(farm_data) if not computing else []
         
-        # Calculate expense trends (last 3 months)
-        expense_trends = []
-        for i in range(3):
-            month = current_month - i
-            year = current_year
-            if month <= 0:
-                month += 12
-                year -= 1
-            
-            monthly_total = sum(t.amount for t in transactions 
-                              if t.transaction_type == 'expense' 
-                              and t.date.month == month 
-                              and t.date.year == year)
-            expense_trends.append({
-                'month': datetime(year, month, 1).strftime('%B %Y'),
-                'amount': monthly_total
-            })
+        # Get transaction summary and the first page of transactions
+        with stage_timer('orm'):
+            summary = summarize_transactions(user.id)
+            transactions, next_cursor = get_transaction_page(user.id)
         
-        return render_template('farmer_dashboard.html',
-                             farm_data=farm_data,
-                             recommendations=recommendations,
-                             transactions=transactions,
-                             total_income=total_income,
-                             total_expenses=total_expenses,
-                             remaining_balance=remaining_balance,
-                             monthly_income=monthly_income,
-                             monthly_expenses=monthly_expenses,
-                             category_expenses=category_expenses,
-                             expense_trends=expense_trends)
-    elif current_user.user_type == 'company':
+        return 'farmer_dashboard.html', dict(
+            farm_data=farm_data,
+            analytics_computing=computing,
+            recommendations=recommendations,
+            transactions=[transaction_to_dict(t) for t in transactions],
+            next_cursor=next_cursor,
+            total_income=summary['total_income'],
+            total_expenses=summary['total_expenses'],
+            remaining_balance=summary['remaining_balance'],
+            monthly_income=summary['monthly_income'],
+            monthly_expenses=summary['monthly_expenses'],
+            category_expenses=summary['category_expenses'],
+            expense_trends=summary['expense_trends']
+        ), complete
+    elif user.user_type == 'company':
+        complete = True
         # Company dashboard
-        company_data = process_company_data()
+        with stage_timer('pandas'):
+            company_data = process_company_data(user.dataset_id)
+        computing = False
         if company_data is None:
-            flash('Error loading company data', 'error')
-            company_data = {
-                'total_revenue': 0,
-                'total_expenses': 0,
-                'net_profit': 0,
-                'profit_margin': 0,
-                'departments': [],
-                'resource_utilization': 0,
-                'employee_satisfaction': 0,
-                'customer_satisfaction': 0,
-                'revenue_growth': 0
-            }
+            complete = False
+            company_data = copy.deepcopy(EMPTY_COMPANY_DATA)
+            computing = analytics_pending('company')
+            if computing:
+                flash('Company analytics are being computed and will appear shortly', 'info')
+            else:
+                flash('Error loading company data', 'error')
         
-        recommendations = generate_company_recommendations(company_data)
+        with stage_timer('recommendations'):
+            recommendations = generate_company_recommendations(company_data) if not computing else []
         
-        # Get transactions
-        transactions = Transaction.query.filter_by(user_id=current_user.id).order_by(Transaction.date.desc()).all()
+        # Get transaction summary and the first page of transactions
+        with stage_timer('orm'):
+            summary = summarize_transactions(user.id, trend_months=0)
+            transactions, next_cursor = get_transaction_page(user.id)
         
-        # Calculate financial statistics
-        total_income = sum(t.amount for t in transactions if t.transaction_type == 'income')
-        total_expenses = sum(t.amount for t in transactions if t.transaction_type == 'expense')
-        remaining_balance = total_income - total_expenses
-        
-        # Calculate monthly statistics
-        current_month = datetime.utcnow().month
-        current_year = datetime.utcnow().year
-        monthly_income = sum(t.amount for t in transactions 
-                           if t.transaction_type == 'income' 
-                           and t.date.month == current_month 
-                           and t.date.year == current_year)
-        monthly_expenses = sum(t.amount for t in transactions 
-                             if t.transaction_type == 'expense' 
-                             and t.date.month == current_month 
-                             and t.date.year == current_year)
-        
-        return render_template('company_dashboard.html',
-                             company_data=company_data,
-                             recommendations=recommendations,
-                             transactions=transactions,
-                             total_income=total_income,
-                             total_expenses=total_expenses,
-                             remaining_balance=remaining_balance,
-                             monthly_income=monthly_income,
-                             monthly_expenses=monthly_expenses)
+        return 'company_dashboard.html', dict(
+            company_data=company_data,
+            analytics_computing=computing,
+            recommendations=recommendations,
+            transactions=[transaction_to_dict(t) for t in transactions],
+            next_cursor=next_cursor,
+            total_income=summary['total_income'],
+            total_expenses=summary['total_expenses'],
+            remaining_balance=summary['remaining_balance'],
+            monthly_income=summary['monthly_income'],
+            monthly_expenses=summary['monthly_expenses']
+        ), complete
     else:  # individual dashboard
         try:
-            # Get transactions
-            transactions = Transaction.query.filter_by(
-                user_id=current_user.id
-            ).order_by(Transaction.date.desc()).all()
-
-            # Calculate totals
-            total_income = sum(t.amount for t in transactions if t.transaction_type == 'income')
-            total_expenses = sum(t.amount for t in transactions if t.transaction_type == 'expense')
-            remaining_balance = total_income - total_expenses
-
-            # Calculate monthly totals
-            current_month = datetime.utcnow().month
-            current_year = datetime.utcnow().year
-            monthly_transactions = [
-                t for t in transactions 
-                if t.date.month == current_month and t.date.year == current_year
-            ]
-            
-            monthly_income = sum(t.amount for t in monthly_transactions if t.transaction_type == 'income')
-            monthly_expenses = sum(t.amount for t in monthly_transactions if t.transaction_type == 'expense')
-
-            # Calculate category expenses
-            category_expenses = {}
-            for transaction in transactions:
-                if transaction.transaction_type == 'expense':
-                    category = transaction.category or 'Other'
-                    category_expenses[category] = category_expenses.get(category, 0) + transaction.amount
+            # Get transaction summary and the first page of transactions
+            with stage_timer('orm'):
+                summary = summarize_transactions(user.id, default_category='Other', trend_months=0)
+                transactions, next_cursor = get_transaction_page(user.id)
+            total_income = summary['total_income']
+            total_expenses = summary['total_expenses']
+            remaining_balance = summary['remaining_balance']
+            monthly_income = summary['monthly_income']
+            monthly_expenses = summary['monthly_expenses']
+            category_expenses = summary['category_expenses']
 
             # Get individual financial data
-            individual_data = process_individual_data()
+            with stage_timer('pandas'):
+                individual_data = process_individual_data(user.dataset_id)
             if individual_data is None:
                 individual_data = {
                     'monthly_income': monthly_income or 0,
@@ -839,76 +2610,431 @@ def dashboard():
                 }
 
             # Generate recommendations
-            recommendations = generate_individual_recommendations(individual_data)
-
-            return render_template('individual_dashboard.html',
-                                individual_data=individual_data,
-                                recommendations=recommendations,
-                                transactions=transactions,
-                                total_income=total_income,
-                                total_expenses=total_expenses,
-                                remaining_balance=remaining_balance,
-                                monthly_income=monthly_income,
-                                monthly_expenses=monthly_expenses,
-                                category_expenses=category_expenses)
+            with stage_timer('recommendations'):
+                recommendations = generate_individual_recommendations(individual_data)
+
+            return 'individual_dashboard.html', dict(
+                individual_data=individual_data,
+                recommendations=recommendations,
+                transactions=[transaction_to_dict(t) for t in transactions],
+                next_cursor=next_cursor,
+                total_income=total_income,
+                total_expenses=total_expenses,
+                remaining_balance=remaining_balance,
+                monthly_income=monthly_income,
+                monthly_expenses=monthly_expenses,
+                category_expenses=category_expenses
+            ), True
 
         except Exception as e:
             print(f"Error in individual dashboard: {str(e)}")
             flash('An error occurred while loading the dashboard', 'error')
-            return render_template('individual_dashboard.html',
-                                individual_data={
-                                    'monthly_income': 0,
-                                    'monthly_expenses': 0,
-                                    'monthly_savings': 0,
-                                    'savings_goal': 0,
-                                    'savings_rate': 0,
-                                    'savings_growth': 0,
-                                    'expense_breakdown': {},
-                                    'spending_pattern': [],
-                                    'improvement_tips': '',
-                                    'suggested_changes': ''
-                                },
-                                recommendations=[],
-                                transactions=[],
-                                total_income=0,
-                                total_expenses=0,
-                                remaining_balance=0,
-                                monthly_income=0,
-                                monthly_expenses=0,
-                                category_expenses={})
+            return 'individual_dashboard.html', dict(
+                individual_data=copy.deepcopy(EMPTY_INDIVIDUAL_DATA),
+                recommendations=[],
+                transactions=[],
+                next_cursor=None,
+                total_income=0,
+                total_expenses=0,
+                remaining_balance=0,
+                monthly_income=0,
+                monthly_expenses=0,
+                category_expenses={}
+            ), False
+
+def build_dashboard_shell(user):
+    """Dashboard template and placeholder context whose charts are fetched from the analytics API"""
+    transactions, next_cursor = get_transaction_page(user.id)
+    template, data_name, data = {
+        'farmer': ('farmer_dashboard.html', 'farm_data', EMPTY_FARM_DATA),
+        'company': ('company_dashboard.html', 'company_data', EMPTY_COMPANY_DATA),
+    }.get(user.user_type, ('individual_dashboard.html', 'individual_data', EMPTY_INDIVIDUAL_DATA))
+    return template, {
+        data_name: copy.deepcopy(data),
+        'recommendations': [],
+        'transactions': [transaction_to_dict(t) for t in transactions],
+        'next_cursor': next_cursor,
+        'total_income': 0,
+        'total_expenses': 0,
+        'remaining_balance': 0,
+        'monthly_income': 0,
+        'monthly_expenses': 0,
+        'category_expenses': {},
+        'expense_trends': [],
+        'async_charts': True,
+        'analytics_urls': {block: url_for('analytics_api', block=block) for block in analytics_blocks_for(user.user_type)}
+    }
+
+@app.route('/dashboard')
+@login_required
+def dashboard():
+    cache = dashboard_cache()
+    key = dashboard_cache_key(current_user)
+    cache_html = app.config['DASHBOARD_CACHE_HTML'] and not session.get('_flashes')
+    if key is not None and cache_html:
+        html = cache.get(key + ':html')
+        CACHE_REQUESTS.inc('dashboard_html', 'hit' if html is not None else 'miss')
+        if html is not None:
+            return html
+    if app.config['DASHBOARD_ASYNC_CHARTS']:
+        template, context = build_dashboard_shell(current_user)
+        with stage_timer('render'):
+            return render_template(template, **context)
+    cached = cache.get(key) if key is not None else None
+    if key is not None:
+        CACHE_REQUESTS.inc('dashboard', 'hit' if cached is not None else 'miss')
+    if cached is not None:
+        # Only contexts of complete loads are cached
+        template, context = cached
+        complete = True
+    else:
+        template, context, complete = build_dashboard_context(current_user)
+        if key is not None and complete:
+            cache.set(key, (template, context), app.config['DASHBOARD_CACHE_TTL'])
+    with stage_timer('render'):
+        html = render_template(template, **context)
+    # The template has already consumed any error flash by now, so the load's own flag decides
+    if key is not None and cache_html and complete:
+        cache.set(key + ':html', html, app.config['DASHBOARD_CACHE_TTL'])
+    return html
 
 @app.route('/add_transaction', methods=['POST'])
 @login_required
 def add_transaction():
     try:
-        amount = float(request.form.get('amount'))
-        category = request.form.get('category')
-        description = request.form.get('description')
-        transaction_type = request.form.get('transaction_type')
-        
-        if amount <= 0:
-            flash('Amount must be greater than 0', 'error')
-            return redirect(url_for('dashboard'))
-        
+        fields = parse_transaction_fields(request.form)
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('dashboard'))
+    
+    try:
         new_transaction = Transaction(
             user_id=current_user.id,
-            amount=amount,
-            category=category,
-            description=description,
-            transaction_type=transaction_type
+            date=datetime.utcnow(),
+            **fields
         )
         
+        # Keep the monthly rollup in the same DB transaction as the new row
         db.session.add(new_transaction)
+        record_monthly_summary(current_user.id, new_transaction.date, fields['transaction_type'], fields['category'], fields['amount_paise'])
+        record_balance(current_user.id, fields['transaction_type'], fields['amount_paise'])
         db.session.commit()
+        invalidate_dashboard_cache(current_user.id)
         
         flash('Transaction added successfully!', 'success')
-    except ValueError:
-        flash('Invalid amount. Please enter a valid number.', 'error')
     except Exception as e:
+        db.session.rollback()
         flash('An error occurred while adding the transaction.', 'error')
     
     return redirect(url_for('dashboard'))
 
+# Bulk import
+def parse_statement_date(value):
+    """Parse an ISO 8601 statement date into a naive UTC datetime"""
+    try:
+        date = datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f'Invalid date: {value}')
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+    return date
+
+def read_statement_rows(stream, filename):
+    """Yield the transaction rows of a CSV or JSON statement file"""
+    if filename.lower().endswith('.json'):
+        data = json.load(stream)
+        if isinstance(data, dict):
+            data = data.get('transactions', [])
+        yield from data
+    else:
+        yield from csv.DictReader(stream)
+
+def import_transactions(user_id, rows, batch_size=None):
+    """Validate statement rows like add_transaction and insert them in batches, each committed with its rollup changes
+
+    If a batch fails to save, the import stops and the report carries the error next to the count of rows already committed.
+    """
+    batch_size = batch_size or app.config['IMPORT_BATCH_SIZE']
+    started = time.perf_counter()
+    imported = 0
+    errors = []
+    batch = []
+
+    def flush():
+        """Commit the batch with its rollup changes; returns the error message if it could not be saved"""
+        nonlocal imported
+        # Group the batch by rollup key and sum it with int64 arrays
+        keys = {}
+        codes = np.fromiter((keys.setdefault((row['date'].year, row['date'].month, row['transaction_type'], row['category']), len(keys))
+                             for row in batch), dtype=np.int64, count=len(batch))
+        totals = np.zeros(len(keys), dtype=np.int64)
+        np.add.at(totals, codes, np.fromiter((row['amount_paise'] for row in batch), dtype=np.int64, count=len(batch)))
+        counts = np.bincount(codes, minlength=len(keys))
+        last_dates = np.full(len(keys), np.datetime64('NaT'), dtype='datetime64[us]')
+        np.fmax.at(last_dates, codes, np.array([row['date'] for row in batch], dtype='datetime64[us]'))
+        try:
+            db.session.execute(Transaction.__table__.insert(), batch)
+            type_totals = {}
+            for (year, month, transaction_type, category), code in keys.items():
+                record_monthly_summary(user_id, last_dates[code].item(), transaction_type, category, int(totals[code]), int(counts[code]))
+                amount_paise, count = type_totals.get(transaction_type, (0, 0))
+                type_totals[transaction_type] = (amount_paise + int(totals[code]), count + int(counts[code]))
+            for transaction_type, (amount_paise, count) in type_totals.items():
+                record_balance(user_id, transaction_type, amount_paise, count)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error importing transactions: {str(e)}")
+            return str(e)
+        imported += len(batch)
+        batch.clear()
+        return None
+
+    failure = None
+    try:
+        for number, data in enumerate(rows, start=1):
+            try:
+                if not isinstance(data, dict):
+                    raise ValueError('Row must be an object with transaction fields')
+                fields = parse_transaction_fields(data)
+                date = data.get('date')
+                fields['date'] = parse_statement_date(date) if date else datetime.utcnow()
+            except ValueError as e:
+                errors.append({'row': number, 'error': str(e)})
+                continue
+            fields['user_id'] = user_id
+            batch.append(fields)
+            # Earlier batches are already committed, so a failed one ends the import with their count reported
+            if len(batch) >= batch_size:
+                failure = flush()
+                if failure is not None:
+                    break
+        if batch and failure is None:
+            failure = flush()
+    finally:
+        if imported:
+            invalidate_dashboard_cache(user_id)
+
+    seconds = time.perf_counter() - started
+    report = {
+        'imported': imported,
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(imported / seconds, 1) if seconds > 0 else 0
+    }
+    if failure is not None:
+        report['failure'] = failure
+    return report
+
+@app.route('/import_transactions', methods=['POST'])
+@login_required
+def import_transactions_route():
+    """Import a CSV or JSON bank statement for the current user"""
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'A CSV or JSON statement file is required'}), 400
+    try:
+        stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig')
+        report = import_transactions(current_user.id, read_statement_rows(stream, upload.filename))
+    except (ValueError, csv.Error) as e:
+        return jsonify({'error': f'Could not read statement file: {str(e)}'}), 400
+    except Exception as e:
+        print(f"Error importing transactions: {str(e)}")
+        return jsonify({'error': 'An error occurred while importing transactions'}), 500
+    error_count = len(report['errors'])
+    report['errors'] = report['errors'][:IMPORT_MAX_REPORTED_ERRORS]
+    report['error_count'] = error_count
+    if report.pop('failure', None) is not None:
+        # The rows counted in imported were saved; the rest of the file was not
+        report['error'] = 'An error occurred while importing transactions'
+        return jsonify(report), 500
+    return jsonify(report)
+
+@app.cli.command('import-transactions')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--email', required=True, help='Email of the user the statement belongs to')
+@click.option('--batch-size', type=int, help='Rows inserted per batch')
+def import_transactions_command(path, email, batch_size):
+    """Import a CSV or JSON bank statement file"""
+    user = User.query.filter_by(email=email).first()
+    if user is None:
+        raise click.ClickException(f'No user with email {email}')
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        report = import_transactions(user.id, read_statement_rows(f, path), batch_size)
+    for error in report['errors']:
+        print(f"Row {error['row']}: {error['error']}")
+    if 'failure' in report:
+        raise click.ClickException(f"Import stopped after {report['imported']} transactions: {report['failure']}")
+    print(f"Imported {report['imported']} transactions with {len(report['errors'])} errors "
+          f"in {report['seconds']}s ({report['rows_per_second']} rows/sec)")
+
+@app.route('/api/transactions')
+@login_required
+def transactions_api():
+    """Further pages of the current user's transactions for the dashboard to fetch"""
+    limit = request.args.get('limit', app.config['TRANSACTIONS_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, app.config['TRANSACTIONS_MAX_PAGE_SIZE']))
+    try:
+        transactions, next_cursor = get_transaction_page(current_user.id, request.args.get('cursor'), limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'transactions': [dict(transaction_to_dict(t), date=t.date.isoformat()) for t in transactions],
+        'next_cursor': next_cursor
+    })
+
+@app.route('/api/v1/analytics/range')
+@login_required
+def analytics_range_api():
+    """Income, expense and category series of the current user's transactions between two dates, per bucket"""
+    bucket = request.args.get('bucket', 'month')
+    try:
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else datetime.utcnow().date()
+        start = date.fromisoformat(request.args['start']) if request.args.get('start') else end.replace(day=1)
+    except ValueError:
+        return jsonify({'error': 'Dates must be given as YYYY-MM-DD'}), 400
+    if bucket not in BUCKETS:
+        return jsonify({'error': f"Bucket must be one of {', '.join(BUCKETS)}"}), 400
+    if end < start:
+        return jsonify({'error': 'The end date must not be before the start date'}), 400
+    # Bucket and month steps run up to a year past the end date, which must stay within date's range
+    if end.year >= MAXYEAR:
+        return jsonify({'error': f'The end date must be before {MAXYEAR}-01-01'}), 400
+    # The end date is inclusive
+    stop = end + timedelta(days=1)
+    max_buckets = app.config['RANGE_MAX_BUCKETS']
+    if sum(1 for _ in itertools.islice(bucket_starts(start, stop, bucket), max_buckets + 1)) > max_buckets:
+        return jsonify({'error': f"At most {max_buckets} buckets per request; use a coarser bucket"}), 400
+    default_category = 'Other' if current_user.user_type == 'individual' else None
+    with stage_timer('range'):
+        series = aggregate_range(current_user.id, start, stop, bucket, default_category)
+    buckets = []
+    categories = {}
+    for bucket_start, figures in series.items():
+        income = figures['totals'].get('income', 0)
+        expenses = figures['totals'].get('expense', 0)
+        for category, paise in figures['categories'].items():
+            categories[category] = categories.get(category, 0) + paise
+        buckets.append({
+            'start': bucket_start.isoformat(),
+            'income': from_paise(income),
+            'expenses': from_paise(expenses),
+            'net': from_paise(income - expenses),
+            'category_expenses': {category: from_paise(paise) for category, paise
+                                  in sorted(figures['categories'].items(), key=lambda item: item[1], reverse=True)}
+        })
+    total_income = sum(figures['totals'].get('income', 0) for figures in series.values())
+    total_expenses = sum(figures['totals'].get('expense', 0) for figures in series.values())
+    return jsonify({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'bucket': bucket,
+        'buckets': buckets,
+        'total_income': from_paise(total_income),
+        'total_expenses': from_paise(total_expenses),
+        'category_expenses': {category: from_paise(paise) for category, paise
+                              in sorted(categories.items(), key=lambda item: item[1], reverse=True)}
+    })
+
+# Analytics API
+def individual_analytics(user):
+    """Individual dataset analytics, falling back to the user's own transaction totals"""
+    individual_data = process_individual_data(user.dataset_id)
+    if individual_data is None:
+        summary = summarize_transactions(user.id, default_category='Other', trend_months=0)
+        monthly_income = summary['monthly_income']
+        monthly_expenses = summary['monthly_expenses']
+        individual_data = dict(
+            copy.deepcopy(EMPTY_INDIVIDUAL_DATA),
+            monthly_income=monthly_income or 0,
+            monthly_expenses=monthly_expenses or 0,
+            monthly_savings=(monthly_income - monthly_expenses) if monthly_income and monthly_expenses else 0,
+            expense_breakdown=summary['category_expenses'] or {}
+        )
+    return individual_data
+
+def analytics_recommendations(user):
+    if user.user_type == 'farmer':
+        farm_data = process_agricultural_data(user.dataset_id)
+        return generate_farming_recommendations(farm_data) if farm_data is not None else None
+    if user.user_type == 'company':
+        company_data = process_company_data(user.dataset_id)
+        return generate_company_recommendations(company_data) if company_data is not None else None
+    return generate_individual_recommendations(individual_analytics(user))
+
+def analytics_summary(user):
+    summary = summarize_transactions(user.id, trend_months=0)
+    return {key: summary[key] for key in ('total_income', 'total_expenses', 'remaining_balance', 'monthly_income', 'monthly_expenses')}
+
+# Block name -> (function of the user returning the block or None on error, user types allowed to fetch it)
+ANALYTICS_BLOCKS = {
+    'summary': (analytics_summary, None),
+    'categories': (lambda user: summarize_transactions(user.id, default_category='Other' if user.user_type == 'individual' else None, trend_months=0)['category_expenses'], None),
+    'trends': (lambda user: summarize_transactions(user.id)['expense_trends'], None),
+    'farm': (lambda user: process_agricultural_data(user.dataset_id), ('farmer',)),
+    'company': (lambda user: process_company_data(user.dataset_id), ('company',)),
+    'individual': (lambda user: individual_analytics(user), ('individual',)),
+    'recommendations': (analytics_recommendations, None),
+}
+
+def analytics_blocks_for(user_type):
+    return [name for name, (_, user_types) in ANALYTICS_BLOCKS.items() if user_types is None or user_type in user_types]
+
+def analytics_etag(body):
+    return hashlib.sha1(body).hexdigest()
+
+@app.route('/api/v1/analytics/<block>')
+@login_required
+def analytics_api(block):
+    """One dashboard analytics block as JSON, revalidated with ETag/If-None-Match"""
+    if block not in analytics_blocks_for(current_user.user_type):
+        return jsonify({'error': f'Unknown analytics block: {block}'}), 404
+    cache = dashboard_cache()
+    key = dashboard_cache_key(current_user)
+    if key is not None:
+        key = f'{key}:api:{block}'
+        etag = cache.get(key + ':etag')
+        # Unchanged inputs give an unchanged key, so a matching ETag is answered without computing anything
+        CACHE_REQUESTS.inc('analytics_api', 'hit' if etag is not None else 'miss')
+        if etag is not None and request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        body = cache.get(key)
+    else:
+        body = None
+    if body is None:
+        function, _ = ANALYTICS_BLOCKS[block]
+        try:
+            with stage_timer(block):
+                data = function(current_user)
+        except Exception as e:
+            print(f"Error computing analytics block {block}: {str(e)}")
+            data = None
+        if data is None:
+            if analytics_pending(USER_TYPE_DATASETS.get(current_user.user_type)):
+                response = jsonify({'error': f'{block} data is still being computed'})
+                response.headers['Retry-After'] = '5'
+                return response, 503
+            return jsonify({'error': f'Error loading {block} data'}), 503
+        body = json.dumps({'version': 1, 'block': block, 'data': data}, default=json_default).encode()
+        if key is not None:
+            cache.set(key, body, app.config['DASHBOARD_CACHE_TTL'])
+            cache.set(key + ':etag', analytics_etag(body), app.config['DASHBOARD_CACHE_TTL'])
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(analytics_etag(body), weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+def json_default(value):
+    """Serialize numpy scalars and datetimes left in analytics results"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
 @app.context_processor
 def utility_processor():
     def get_translated_text(key):
@@ -924,106 +3050,11 @@ def set_language(lang):
 @login_required
 def individual_dashboard():
     """Individual dashboard endpoint"""
-    try:
-        if current_user.user_type != 'individual':
-            flash('Unauthorized access', 'error')
-            return redirect(url_for('dashboard'))
-        
-        # Initialize default values
-        total_income = 0
-        total_expenses = 0
-        remaining_balance = 0
-        monthly_income = 0
-        monthly_expenses = 0
-        category_expenses = {}
-        transactions = []
-
-        try:
-            # Get transactions from database
-            transactions = Transaction.query.filter_by(user_id=current_user.id).order_by(Transaction.date.desc()).all()
-            
-            # Calculate financial statistics
-            total_income = sum(t.amount for t in transactions if t.transaction_type == 'income')
-            total_expenses = sum(t.amount for t in transactions if t.transaction_type == 'expense')
-            remaining_balance = total_income - total_expenses
-            
-            # Calculate monthly statistics
-            current_month = datetime.utcnow().month
-            current_year = datetime.utcnow().year
-            monthly_transactions = [t for t in transactions 
-                                 if t.date.month == current_month 
-                                 and t.date.year == current_year]
-            
-            monthly_income = sum(t.amount for t in monthly_transactions if t.transaction_type == 'income')
-            monthly_expenses = sum(t.amount for t in monthly_transactions if t.transaction_type == 'expense')
-            
-            # Calculate category-wise expenses
-            category_expenses = {}
-            for transaction in transactions:
-                if transaction.transaction_type == 'expense':
-                    category = transaction.category or 'Other'
-                    if category not in category_expenses:
-                        category_expenses[category] = 0
-                    category_expenses[category] += transaction.amount
-                    
-        except Exception as e:
-            print(f"Database error: {str(e)}")
-            flash('Error loading transaction data', 'error')
-
-        # Get individual financial data from CSV
-        individual_data = process_individual_data()
-        if individual_data is None:
-            individual_data = {
-                'monthly_income': monthly_income or 0,
-                'monthly_expenses': monthly_expenses or 0,
-                'monthly_savings': (monthly_income - monthly_expenses) if monthly_income and monthly_expenses else 0,
-                'savings_goal': 0,
-                'savings_rate': 0,
-                'savings_growth': 0,
-                'expense_breakdown': category_expenses or {},
-                'spending_pattern': [],
-                'improvement_tips': '',
-                'suggested_changes': ''
-            }
-        
-        # Generate recommendations
-        recommendations = generate_individual_recommendations(individual_data)
-        
-        return render_template('individual_dashboard.html',
-                             individual_data=individual_data,
-                             recommendations=recommendations,
-                             transactions=transactions,
-                             total_income=total_income,
-                             total_expenses=total_expenses,
-                             remaining_balance=remaining_balance,
-                             monthly_income=monthly_income,
-                             monthly_expenses=monthly_expenses,
-                             category_expenses=category_expenses)
-
-    except Exception as e:
-        print(f"Error in individual_dashboard: {str(e)}")
-        flash('An error occurred while loading the dashboard', 'error')
-        return render_template('individual_dashboard.html',
-                             individual_data={
-                                 'monthly_income': 0,
-                                 'monthly_expenses': 0,
-                                 'monthly_savings': 0,
-                                 'savings_goal': 0,
-                                 'savings_rate': 0,
-                                 'savings_growth': 0,
-                                 'expense_breakdown': {},
-                                 'spending_pattern': [],
-                                 'improvement_tips': '',
-                                 'suggested_changes': ''
-                             },
-                             recommendations=[],
-                             transactions=[],
-                             total_income=0,
-                             total_expenses=0,
-                             remaining_balance=0,
-                             monthly_income=0,
-                             monthly_expenses=0,
-                             category_expenses={})
+    if current_user.user_type != 'individual':
+        flash('Unauthorized access', 'error')
+        return redirect(url_for('dashboard'))
+    template, context, _ = build_dashboard_context(current_user)
+    return render_template(template, **context)
 
 def calculate_growth_rate(monthly_data):
     """Calculate growth rate from monthly data"""
@@ -1051,7 +3082,12 @@ def calculate_cash_flow(monthly_data):
 def base():
     return render_template("user_type_selection.html") 
 
+# With the worker enabled, start it with the app so the first snapshots are under way before
+# the first request; process pool children importing the app must not start their own
+if app.config['ANALYTICS_WORKER_ENABLED'] and multiprocessing.parent_process() is None:
+    analytics_worker()
+
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        upgrade_database()
     app.run(debug=True) 
@@ -0,0 +1,189 @@
+"""End-to-end request benchmark of the dashboards, logins and transaction writes.
+
+Generates a throwaway database with N users of each type x M transactions and
+synthetic agriculture/company/person CSVs, points the app at them through
+DATABASE_URL and DATASET_DIR, then drives the Flask test client and reports
+p50/p95/p99 latency, throughput and peak RSS per scenario. Results can be saved
+as a JSON baseline and later runs compared against it.
+
+Usage:
+    python benchmarks/bench_dashboard.py --users 20 --transactions 2000 --csv-rows 100000 --save baseline.json
+    python benchmarks/bench_dashboard.py --users 20 --transactions 2000 --csv-rows 100000 --compare baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic
+
+# Stand-ins used only when the checkout has no templates directory
+FALLBACK_TEMPLATES = {
+    name: '{{ transactions|length if transactions is defined }}'
+    for name in ('farmer_dashboard.html', 'company_dashboard.html', 'individual_dashboard.html',
+                 'login.html', 'register.html', 'user_type_selection.html', 'index.html', 'base.html')
+}
+
+
+def peak_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def summarize(timings, elapsed):
+    return {
+        'requests': len(timings),
+        'p50_ms': percentile(timings, 50),
+        'p95_ms': percentile(timings, 95),
+        'p99_ms': percentile(timings, 99),
+        'mean_ms': statistics.fmean(timings),
+        'throughput_rps': len(timings) / elapsed if elapsed else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def timed_requests(count, send):
+    """Call send(i) count times; send returns a response that must not be a server error"""
+    timings = []
+    started = time.perf_counter()
+    for i in range(count):
+        start = time.perf_counter()
+        response = send(i)
+        timings.append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 500:
+            raise RuntimeError(f'Request failed with status {response.status_code}')
+    return summarize(timings, time.perf_counter() - started)
+
+
+def login(client, email, user_type):
+    return client.post(f'/login/{user_type}', data={'email': email, 'password': synthetic.PASSWORD})
+
+
+def run_scenarios(app, accounts, args):
+    results = {}
+    clients = {}
+    for email, user_type in accounts:
+        client = app.test_client()
+        login(client, email, user_type)
+        clients.setdefault(user_type, []).append(client)
+
+    for user_type in synthetic.USER_TYPES:
+        type_accounts = [account for account in accounts if account[1] == user_type]
+        results[f'login:{user_type}'] = timed_requests(
+            args.login_requests,
+            lambda i: login(app.test_client(), *type_accounts[i % len(type_accounts)])
+        )
+        type_clients = clients[user_type]
+        for _ in range(args.warmup):
+            type_clients[0].get('/dashboard')
+        results[f'dashboard:{user_type}'] = timed_requests(
+            args.requests, lambda i: type_clients[i % len(type_clients)].get('/dashboard')
+        )
+
+    individual_clients = clients['individual']
+    results['add_transaction'] = timed_requests(
+        args.requests,
+        lambda i: individual_clients[i % len(individual_clients)].post('/add_transaction', data={
+            'amount': '125.50', 'category': 'Grocery', 'description': 'benchmark', 'transaction_type': 'expense'
+        })
+    )
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the change of every scenario against a baseline; returns the regressed scenario names"""
+    regressions = []
+    print(f"\nCompared with baseline from {baseline['created_at']}:")
+    for name, current in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            print(f'  {name:24} (new)')
+            continue
+        changes = {metric: (current[metric] - previous[metric]) / previous[metric] * 100 if previous[metric] else 0.0
+                   for metric in ('p50_ms', 'p95_ms', 'p99_ms')}
+        regressed = changes['p50_ms'] > threshold or changes['p95_ms'] > threshold
+        if regressed:
+            regressions.append(name)
+        print(f'  {name:24} p50 {changes["p50_ms"]:+7.1f}%  p95 {changes["p95_ms"]:+7.1f}%  '
+              f'p99 {changes["p99_ms"]:+7.1f}%{"  REGRESSION" if regressed else ""}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=10, help='users of each type')
+    parser.add_argument('--transactions', type=int, default=1000, help='transactions per user')
+    parser.add_argument('--csv-rows', type=int, default=50000, help='rows in each dataset CSV')
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per dashboard and write scenario')
+    parser.add_argument('--login-requests', type=int, default=20, help='timed requests per login scenario')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--cache', action='store_true', help='keep the dashboard result cache enabled')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a saved JSON baseline')
+    parser.add_argument('--threshold', type=float, default=10.0, help='percent p50/p95 slowdown reported as a regression')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        dataset_dir = os.path.join(tmpdir, 'dataset')
+        print(f'Writing {args.csv_rows} rows per dataset CSV...')
+        synthetic.write_datasets(dataset_dir, args.csv_rows, args.seed)
+        # The app reads both at import time
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmpdir, 'bench.db')
+        os.environ['DATASET_DIR'] = dataset_dir
+        from app import app, db
+
+        app.config['DASHBOARD_CACHE_ENABLED'] = args.cache
+        if not os.path.isdir(os.path.join(app.root_path, app.template_folder)):
+            import jinja2
+            print('No templates directory; rendering minimal stand-in templates')
+            app.jinja_loader = jinja2.DictLoader(FALLBACK_TEMPLATES)
+
+        print(f'Generating {args.users} users per type x {args.transactions} transactions...')
+        accounts = synthetic.populate_database(app, db, args.users, args.transactions, args.seed)
+        with app.app_context():
+            results = run_scenarios(app, accounts, args)
+            db.session.remove()
+            db.engine.dispose()
+
+    print(f"\n{'scenario':24} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'peak RSS MB':>12}")
+    for name, result in results.items():
+        print(f"{name:24} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['p99_ms']:9.2f} "
+              f"{result['throughput_rps']:9.1f} {result['peak_rss_mb']:12.1f}")
+
+    report = {
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'parameters': {key: value for key, value in vars(args).items() if key not in ('save', 'compare', 'threshold')},
+        'results': results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nSaved baseline to {args.save}')
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['parameters'] != report['parameters']:
+            print('Warning: the baseline was recorded with different parameters')
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark login throughput under concurrency, with and without the password hashing pool.
+
+Creates a throwaway database of synthetic users, then for each profile runs login
+threads that post valid credentials in a loop next to API threads that read
+/api/transactions as already logged-in users. The script reports logins per second,
+login and API p95 latency, and logins turned away because the pool was full. The
+API latency shows how much the hashing slows down the rest of the app.
+
+Usage:
+    python benchmarks/bench_login.py --login-threads 16 --api-threads 4 --workers 1 2 --seconds 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic
+from bench_dashboard import FALLBACK_TEMPLATES, login, percentile
+
+
+def run(app, accounts, args, pool, workers):
+    app.config['PASSWORD_HASH_POOL'] = pool
+    app.config['PASSWORD_HASH_WORKERS'] = workers
+    api_clients = []
+    for email, user_type in accounts[:args.api_threads]:
+        client = app.test_client()
+        login(client, email, user_type)
+        api_clients.append(client)
+
+    deadline = time.perf_counter() + args.seconds
+    results = {'login': [], 'api': [], 'busy': 0}
+    lock = threading.Lock()
+
+    def login_loop(index):
+        timings = []
+        busy = 0
+        while time.perf_counter() < deadline:
+            email, user_type = accounts[index % len(accounts)]
+            index += args.login_threads
+            start = time.perf_counter()
+            response = login(app.test_client(), email, user_type)
+            if response.status_code == 503:
+                busy += 1
+            elif response.status_code != 302:
+                raise RuntimeError(f'Login failed with status {response.status_code}')
+            else:
+                timings.append((time.perf_counter() - start) * 1000)
+        with lock:
+            results['login'].extend(timings)
+            results['busy'] += busy
+
+    def api_loop(client):
+        timings = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = client.get('/api/transactions?limit=20')
+            if response.status_code != 200:
+                raise RuntimeError(f'API request failed with status {response.status_code}')
+            timings.append((time.perf_counter() - start) * 1000)
+        with lock:
+            results['api'].extend(timings)
+
+    threads = [threading.Thread(target=login_loop, args=(i,)) for i in range(args.login_threads)]
+    threads += [threading.Thread(target=api_loop, args=(client,)) for client in api_clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        'logins_per_second': len(results['login']) / args.seconds,
+        'login_p95_ms': percentile(results['login'], 95) if results['login'] else 0.0,
+        'api_per_second': len(results['api']) / args.seconds,
+        'api_p95_ms': percentile(results['api'], 95) if results['api'] else 0.0,
+        'busy': results['busy'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20, help='users of each type')
+    parser.add_argument('--login-threads', type=int, default=16)
+    parser.add_argument('--api-threads', type=int, default=4)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='pool sizes to compare with inline hashing')
+    parser.add_argument('--pool', choices=('thread', 'process'), default='thread')
+    parser.add_argument('--method', help='PASSWORD_HASH_METHOD, e.g. pbkdf2:sha256:600000')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmpdir, 'bench.db')
+        if args.method:
+            os.environ['PASSWORD_HASH_METHOD'] = args.method
+        from app import app, db
+
+        if not os.path.isdir(os.path.join(app.root_path, app.template_folder)):
+            import jinja2
+            app.jinja_loader = jinja2.DictLoader(FALLBACK_TEMPLATES)
+        accounts = synthetic.populate_database(app, db, args.users, 50, args.seed)
+        accounts = [account for account in accounts if account[1] == 'individual']
+
+        print(f"{'hashing':12} {'logins/s':>9} {'login p95 ms':>13} {'api/s':>8} {'api p95 ms':>11} {'busy':>6}")
+        for pool, workers in [(None, None)] + [(args.pool, workers) for workers in args.workers]:
+            result = run(app, accounts, args, pool, workers)
+            name = f'{pool} x{workers}' if pool else 'inline'
+            print(f"{name:12} {result['logins_per_second']:9.1f} {result['login_p95_ms']:13.1f} "
+                  f"{result['api_per_second']:8.1f} {result['api_p95_ms']:11.1f} {result['busy']:6}")
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
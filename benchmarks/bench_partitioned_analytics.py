@@ -0,0 +1,66 @@
+"""Benchmark dataset analytics computed in-process against row-range partitions on worker processes.
+
+Writes synthetic dataset CSVs, converts them to the columnar cache once, then times
+each analytics computation with ANALYTICS_PROCESSES unset and with 2, 4, ... worker
+processes, checking that every partitioned result equals the sequential one.
+
+Usage:
+    python benchmarks/bench_partitioned_analytics.py --rows 2000000 --processes 1 2 4 8
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000, help='rows in each dataset CSV')
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f'Writing {args.rows} rows per dataset CSV...')
+        synthetic.write_datasets(tmpdir, args.rows, args.seed)
+        os.environ['DATASET_DIR'] = tmpdir
+        import app as finance
+
+        datasets = {
+            'agricultural': ('agriculture.csv', finance._agricultural_analytics, ((),)),
+            'company': ('company.csv', finance._company_analytics, ()),
+            'individual': ('person.csv', finance._individual_analytics, ()),
+        }
+        print(f"{'dataset':14} {'processes':>9} {'median s':>9} {'speedup':>8}  matches")
+        with finance.app.app_context():
+            for name, (filename, compute, extra_args) in datasets.items():
+                csv_path = finance.dataset_path(filename)
+                signature = finance.file_signature(csv_path)
+                finance.convert_to_columnar(csv_path)
+                baseline = None
+                for processes in args.processes:
+                    timings = []
+                    for _ in range(args.repeat):
+                        compute.cache_clear()
+                        start = time.perf_counter()
+                        result = compute(csv_path, signature, *extra_args, None, processes)
+                        timings.append(time.perf_counter() - start)
+                    median = statistics.median(timings)
+                    if baseline is None:
+                        baseline = (median, result)
+                    print(f'{name:14} {processes:9} {median:9.3f} {baseline[0] / median:7.2f}x  {result == baseline[1]}')
+            _, pool = finance.app.extensions.get('analytics_process_pool', (None, None))
+            if pool is not None:
+                pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
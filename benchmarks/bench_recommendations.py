@@ -0,0 +1,138 @@
+"""Benchmark batch evaluation of the recommendation rules against per-entity calls.
+
+Builds random metric DataFrames for N farms, companies and individuals (with crop
+and department item tables), then times evaluate_recommendations over all of them.
+It also times the single-entity generate_*_recommendations calls the dashboards make
+over a sample of the same entities, and checks that both give the same recommendations.
+
+Usage:
+    python benchmarks/bench_recommendations.py --entities 500000 --single 20000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CROPS = ['Wheat', 'Rice', 'Maize', 'Cotton']
+DEPARTMENTS = ['Sales', 'Operations', 'Finance', 'HR']
+
+
+def farming_inputs(rng, count):
+    index = pd.Index([f'farm{i}' for i in range(count)])
+    metrics = pd.DataFrame({
+        'water_efficiency': rng.uniform(0, 100, count),
+        'fertilizer_percentage': rng.uniform(0, 200, count),
+        'pesticide_percentage': rng.uniform(0, 200, count),
+        'crop_health': rng.uniform(0, 100, count),
+    }, index=index)
+    crops = pd.DataFrame({
+        'entity': np.repeat(index, len(CROPS)),
+        'name': np.tile(CROPS, count),
+        'growth_percentage': rng.uniform(0, 100, count * len(CROPS)),
+    })
+    return metrics, {'crops': crops}
+
+
+def company_inputs(rng, count):
+    index = pd.Index([f'company{i}' for i in range(count)])
+    metrics = pd.DataFrame({
+        'profit_margin': rng.uniform(0, 30, count),
+        'resource_utilization': rng.uniform(50, 100, count),
+        'employee_satisfaction': rng.uniform(50, 100, count),
+        'customer_satisfaction': rng.uniform(50, 100, count),
+        'revenue_growth': rng.uniform(-5, 15, count),
+    }, index=index)
+    departments = pd.DataFrame({
+        'entity': np.repeat(index, len(DEPARTMENTS)),
+        'name': np.tile(DEPARTMENTS, count),
+        'performance': rng.uniform(40, 100, count * len(DEPARTMENTS)),
+    })
+    return metrics, {'departments': departments}
+
+
+def individual_inputs(rng, count):
+    income = rng.uniform(2e4, 2e5, count)
+    metrics = pd.DataFrame({
+        'savings_rate': rng.uniform(0, 50, count),
+        'monthly_savings': rng.uniform(0, 5e4, count),
+        'savings_goal': rng.uniform(1e4, 5e4, count),
+        'monthly_income': income,
+        'expense_breakdown.Rent': income * rng.uniform(0.1, 0.5, count),
+        'expense_breakdown.Entertainment': income * rng.uniform(0, 0.2, count),
+        'improvement_tips': rng.choice(['', 'Cook at home', 'Use public transport'], count),
+        'suggested_changes': rng.choice(['Reduce dining out', 'Switch to a cheaper phone plan'], count),
+    }, index=pd.Index([f'person{i}' for i in range(count)]))
+    return metrics, {}
+
+
+def entity_inputs(metrics, items, count):
+    """The nested analytics dicts a dashboard would pass for the first count entities of the batch inputs"""
+    inputs = []
+    entities = metrics.index[:count]
+    item_rows = {name: {entity: rows.drop(columns='entity').to_dict('records')
+                        for entity, rows in table[table['entity'].isin(entities)].groupby('entity', sort=False)}
+                 for name, table in items.items()}
+    for entity, record in zip(entities, metrics.iloc[:count].to_dict('records')):
+        data = {}
+        for column, value in record.items():
+            target = data
+            *parents, key = column.split('.')
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[key] = value
+        for name, rows in item_rows.items():
+            data[name] = rows.get(entity, [])
+        inputs.append(data)
+    return inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entities', type=int, default=200000, help='entities of each kind in the batch')
+    parser.add_argument('--single', type=int, default=10000, help='entities timed with single-entity calls')
+    parser.add_argument('--check', type=int, default=200, help='entities compared between batch and single calls')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    import app as finance
+
+    kinds = {
+        'farming': (farming_inputs, finance.FARMING_RULESET, finance.generate_farming_recommendations),
+        'company': (company_inputs, finance.COMPANY_RULESET, finance.generate_company_recommendations),
+        'individual': (individual_inputs, finance.INDIVIDUAL_RULESET, finance.generate_individual_recommendations),
+    }
+    rng = np.random.default_rng(args.seed)
+    print(f"{'rules':11} {'batch s':>8} {'entities/s':>11} {'single us':>10} {'entities/s':>11} {'speedup':>8}  matches")
+    for name, (make_inputs, ruleset, generate) in kinds.items():
+        metrics, items = make_inputs(rng, args.entities)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            batch = finance.evaluate_recommendations(ruleset, metrics, items)
+            timings.append(time.perf_counter() - start)
+        batch_seconds = statistics.median(timings)
+
+        inputs = entity_inputs(metrics, items, args.single)
+        start = time.perf_counter()
+        for data in inputs:
+            generate(data)
+        single_seconds = (time.perf_counter() - start) / len(inputs)
+
+        sample = metrics.index[:args.check]
+        checked = batch[batch['entity'].isin(sample)]
+        grouped = {entity: rows.drop(columns='entity').to_dict('records') for entity, rows in checked.groupby('entity', sort=False)}
+        matches = all(grouped.get(entity, []) == generate(data) for entity, data in zip(sample, inputs))
+        batch_rate = len(metrics) / batch_seconds
+        print(f'{name:11} {batch_seconds:8.3f} {batch_rate:11.0f} {single_seconds * 1e6:10.1f} '
+              f'{1 / single_seconds:11.0f} {batch_rate * single_seconds:7.1f}x  {matches}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Benchmark concurrent dashboard reads and transaction writes under different SQLite profiles.
+
+Each profile runs in a fresh interpreter with its settings in the environment (the
+engine is created when the app is imported). Reader threads load a user's
+dashboard totals and first transaction page; writer threads add transactions
+with their rollup update. Both loop for a fixed duration. The script reports
+throughput, p95 latency and "database is locked" failures per profile.
+
+Usage:
+    python benchmarks/bench_sqlite_concurrency.py --readers 8 --writers 4 --seconds 10
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings of the app before the tuning layer: rollback journal, full sync, default
+# cache, no mmap and a new connection per checkout
+PROFILES = {
+    'legacy': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_CACHE_SIZE': '-2000',
+        'SQLITE_MMAP_SIZE': '0',
+        'settings': "from sqlalchemy.pool import NullPool\nSQLALCHEMY_ENGINE_OPTIONS = {'poolclass': NullPool}\n",
+    },
+    'tuned': {},
+}
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def run_profile(args):
+    """Worker mode: populate a database and run the readers and writers against it"""
+    import synthetic
+    from sqlalchemy.exc import OperationalError
+    from app import (Transaction, app, db, get_transaction_page, record_balance, record_monthly_summary,
+                     summarize_transactions)
+
+    synthetic.populate_database(app, db, args.users, args.transactions, args.seed)
+    with app.app_context():
+        user_ids = [user_id for (user_id,) in db.session.query(Transaction.user_id).distinct()]
+    deadline = time.perf_counter() + args.seconds
+    results = {'read': [], 'write': [], 'errors': 0}
+    lock = threading.Lock()
+
+    def reader(seed):
+        rng = random.Random(seed)
+        timings = []
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                user_id = rng.choice(user_ids)
+                start = time.perf_counter()
+                summarize_transactions(user_id)
+                get_transaction_page(user_id)
+                db.session.rollback()  # end the read transaction so WAL checkpoints can proceed
+                timings.append((time.perf_counter() - start) * 1000)
+        with lock:
+            results['read'].extend(timings)
+
+    def writer(seed):
+        rng = random.Random(seed)
+        timings = []
+        errors = 0
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                user_id = rng.choice(user_ids)
+                start = time.perf_counter()
+                try:
+                    date = datetime.utcnow()
+                    amount_paise = rng.randint(100, 100000)
+                    db.session.add(Transaction(user_id=user_id, date=date, amount_paise=amount_paise,
+                                               category='Grocery', transaction_type='expense'))
+                    record_monthly_summary(user_id, date, 'expense', 'Grocery', amount_paise)
+                    record_balance(user_id, 'expense', amount_paise)
+                    db.session.commit()
+                    timings.append((time.perf_counter() - start) * 1000)
+                except OperationalError:
+                    db.session.rollback()
+                    errors += 1
+        with lock:
+            results['write'].extend(timings)
+            results['errors'] += errors
+
+    threads = [threading.Thread(target=reader, args=(args.seed + i,)) for i in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(args.seed + 1000 + i,)) for i in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(json.dumps({
+        'reads_per_second': len(results['read']) / args.seconds,
+        'writes_per_second': len(results['write']) / args.seconds,
+        'read_p95_ms': percentile(results['read'], 95),
+        'write_p95_ms': percentile(results['write'], 95),
+        'read_median_ms': statistics.median(results['read']) if results['read'] else 0.0,
+        'write_median_ms': statistics.median(results['write']) if results['write'] else 0.0,
+        'locked_errors': results['errors'],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20, help='users of each type')
+    parser.add_argument('--transactions', type=int, default=1000, help='transactions per user')
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--profile', choices=sorted(PROFILES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        run_profile(args)
+        return
+
+    results = {}
+    for name, settings in PROFILES.items():
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(tmpdir, 'bench.db'))
+            env.update({key: value for key, value in settings.items() if key != 'settings'})
+            if 'settings' in settings:
+                env['FINANCE_SETTINGS'] = os.path.join(tmpdir, 'settings.cfg')
+                with open(env['FINANCE_SETTINGS'], 'w') as f:
+                    f.write(settings['settings'])
+            print(f'Running profile {name}...')
+            output = subprocess.run([sys.executable, __file__, '--profile', name] + sys.argv[1:],
+                                    env=env, check=True, capture_output=True, text=True).stdout
+            results[name] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"\n{'profile':10} {'reads/s':>9} {'writes/s':>9} {'read p95 ms':>12} {'write p95 ms':>13} {'locked':>7}")
+    for name, result in results.items():
+        print(f"{name:10} {result['reads_per_second']:9.1f} {result['writes_per_second']:9.1f} "
+              f"{result['read_p95_ms']:12.2f} {result['write_p95_ms']:13.2f} {result['locked_errors']:7}")
+
+
+if __name__ == '__main__':
+    main()
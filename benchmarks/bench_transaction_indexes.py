@@ -0,0 +1,169 @@
+"""Benchmark the queries that still read the transaction table, before and after its composite indexes.
+
+Dashboard totals come from the monthly rollup and running balances, so requests only
+read the transaction table for pages of transactions (the dashboard's first page and
+further /api/transactions pages) and in aggregate_range() for day and week buckets and
+partial edge months; check-balances and rebuilding a user's monthly rollup read it too.
+Builds a throwaway SQLite database with the app's ``transaction`` table, fills it with
+synthetic rows, then prints the query plan and median latency of each of those queries
+without indexes and again after creating the model's indexes.
+
+Usage:
+    python benchmarks/bench_transaction_indexes.py --users 200 --transactions 2000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from dateutil.relativedelta import relativedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app import Transaction, User
+
+CATEGORIES = ['Seeds', 'Fertilizer', 'Labor', 'Fuel', 'Equipment', 'Rent', 'Grocery', 'Salary', 'Sales']
+
+# The statements issued by get_transaction_page() and transaction_day_rows(), and by
+# ledger_balances() and rebuild_monthly_summary() for one user
+PAGE_COLUMNS = 'id, user_id, amount_paise, category, description, date, transaction_type'
+MONTH = "CAST(STRFTIME('%Y', date) AS INTEGER), CAST(STRFTIME('%m', date) AS INTEGER)"
+DAY = MONTH + ", CAST(STRFTIME('%d', date) AS INTEGER)"
+QUERIES = {
+    'first page': (
+        f'SELECT {PAGE_COLUMNS} FROM "transaction" WHERE user_id = :user_id '
+        'ORDER BY date DESC, id DESC LIMIT :limit OFFSET 0'
+    ),
+    'next page': (
+        f'SELECT {PAGE_COLUMNS} FROM "transaction" WHERE user_id = :user_id '
+        'AND (date, id) < (:cursor_date, :cursor_id) ORDER BY date DESC, id DESC LIMIT :limit OFFSET 0'
+    ),
+    'range days': (
+        f'SELECT {DAY}, transaction_type, category, SUM(amount_paise) FROM "transaction" '
+        'WHERE user_id = :user_id AND date >= :range_start AND date < :range_end '
+        f'GROUP BY {DAY}, transaction_type, category'
+    ),
+    'balance check': (
+        "SELECT user_id, SUM(CASE WHEN transaction_type = 'income' THEN amount_paise ELSE 0 END), "
+        "SUM(CASE WHEN transaction_type = 'expense' THEN amount_paise ELSE 0 END), COUNT(id) "
+        'FROM "transaction" WHERE user_id = :user_id GROUP BY user_id'
+    ),
+    'rollup rebuild': (
+        f'SELECT user_id, {MONTH}, transaction_type, category, SUM(amount_paise), COUNT(id), MAX(date) '
+        'FROM "transaction" WHERE date IS NOT NULL AND user_id = :user_id '
+        f'GROUP BY user_id, {MONTH}, transaction_type, category'
+    ),
+}
+
+
+def create_schema(connection):
+    """Create the user and transaction tables without secondary indexes"""
+    dialect = sqlite.dialect()
+    for table in (User.__table__, Transaction.__table__):
+        connection.execute(str(CreateTable(table).compile(dialect=dialect)))
+
+
+def create_indexes(connection):
+    dialect = sqlite.dialect()
+    for index in Transaction.__table__.indexes:
+        connection.execute(str(CreateIndex(index).compile(dialect=dialect)))
+    connection.execute('ANALYZE')
+
+
+def populate(connection, users, transactions_per_user, seed):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    connection.executemany(
+        'INSERT INTO user (id, name, email, password_hash, user_type, is_active) VALUES (?, ?, ?, ?, ?, 1)',
+        [(user_id, f'User {user_id}', f'user{user_id}@example.com', '-', 'individual')
+         for user_id in range(1, users + 1)]
+    )
+    rows = []
+    for user_id in range(1, users + 1):
+        for _ in range(transactions_per_user):
+            date = now - timedelta(seconds=rng.randint(0, 3 * 365 * 24 * 3600))
+            rows.append((
+                user_id,
+                rng.randint(1000, 5000000),
+                rng.choice(CATEGORIES),
+                None,
+                date.strftime('%Y-%m-%d %H:%M:%S.%f'),
+                rng.choice(('income', 'expense'))
+            ))
+    # Insert in date order so rows of one user are scattered across the table like real traffic
+    rows.sort(key=lambda row: row[4])
+    connection.executemany(
+        'INSERT INTO "transaction" (user_id, amount_paise, category, description, date, transaction_type) '
+        'VALUES (?, ?, ?, ?, ?, ?)',
+        rows
+    )
+    connection.commit()
+
+
+def query_params(user_id):
+    now = datetime.utcnow()
+    today = datetime(now.year, now.month, now.day)
+    return {
+        'user_id': user_id,
+        # A page of /api/transactions (50 rows, plus one to detect a next page) a year and a half back
+        'limit': 51,
+        'cursor_date': (now - relativedelta(months=18)).strftime('%Y-%m-%d %H:%M:%S.%f'),
+        'cursor_id': 2 ** 62,
+        # A 90-day range in day buckets
+        'range_start': (today - timedelta(days=89)).strftime('%Y-%m-%d %H:%M:%S.%f'),
+        'range_end': (today + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S.%f'),
+    }
+
+
+def measure(connection, users, repeat, seed):
+    rng = random.Random(seed)
+    results = {}
+    for name, sql in QUERIES.items():
+        plan = [row[3] for row in connection.execute('EXPLAIN QUERY PLAN ' + sql, query_params(1))]
+        timings = []
+        for _ in range(repeat):
+            params = query_params(rng.randint(1, users))
+            start = time.perf_counter()
+            connection.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = {'plan': plan, 'median_ms': statistics.median(timings)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--transactions', type=int, default=1000, help='transactions per user')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        connection = sqlite3.connect(os.path.join(tmpdir, 'bench.db'))
+        create_schema(connection)
+        print(f'Generating {args.users} users x {args.transactions} transactions...')
+        populate(connection, args.users, args.transactions, args.seed)
+
+        before = measure(connection, args.users, args.repeat, args.seed)
+        create_indexes(connection)
+        after = measure(connection, args.users, args.repeat, args.seed)
+        connection.close()
+
+    for name in QUERIES:
+        print(f'\n== {name} ==')
+        print('  before: ' + '; '.join(before[name]['plan']))
+        print('  after:  ' + '; '.join(after[name]['plan']))
+        speedup = before[name]['median_ms'] / after[name]['median_ms'] if after[name]['median_ms'] else float('inf')
+        print(f"  median latency: {before[name]['median_ms']:.3f} ms -> {after[name]['median_ms']:.3f} ms ({speedup:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Synthetic users, transactions and dataset CSVs for the benchmarks.
+
+The CSV generators write files with the columns the dashboard analytics read;
+populate_database() fills the app's own database (whatever DATABASE_URL points
+at) through its models and rebuilds the monthly rollup and running balances.
+"""
+import os
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+USER_TYPES = ('farmer', 'company', 'individual')
+PASSWORD = 'Bench-passw0rd'
+CATEGORIES = ['Seeds', 'Fertilizer', 'Labor', 'Fuel', 'Equipment', 'Rent', 'Grocery', 'Salary', 'Sales']
+CROPS = ['Wheat', 'Rice', 'Maize', 'Cotton', 'Sugarcane', 'Soybean', 'Barley', 'Tomato']
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August',
+          'September', 'October', 'November', 'December']
+
+
+def write_agriculture_csv(path, rows, rng):
+    pd.DataFrame({
+        'Farm_ID': rng.integers(1, 1000, rows),
+        'Crop_Type': rng.choice(CROPS, rows),
+        'Farm_Area(acres)': rng.uniform(1, 500, rows).round(2),
+        'Irrigation_Type': rng.choice(['Drip', 'Flood', 'Sprinkler', 'Manual'], rows),
+        'Fertilizer_Used(tons)': rng.uniform(0, 10, rows).round(2),
+        'Pesticide_Used(kg)': rng.uniform(0, 5, rows).round(2),
+        'Yield(tons)': rng.uniform(0, 50, rows).round(2),
+        'Soil_Type': rng.choice(['Clay', 'Loamy', 'Sandy', 'Silty'], rows),
+        'Season': rng.choice(['Kharif', 'Rabi', 'Zaid'], rows),
+        'Water_Usage(cubic meters)': rng.uniform(1000, 100000, rows).round(2),
+    }).to_csv(path, index=False)
+
+
+def write_company_csv(path, rows, rng):
+    pd.DataFrame({
+        'Month': [MONTHS[i % 12] for i in range(rows)],
+        'Total Revenue (₹)': rng.uniform(1e5, 1e6, rows).round(2),
+        'Expenses (₹)': rng.uniform(1e4, 1e5, rows).round(2),
+        'Total Cost (₹)': rng.uniform(1e4, 1e5, rows).round(2),
+        'Variance Income %': rng.uniform(-10, 10, rows).round(2),
+    }).to_csv(path, index=False)
+
+
+def write_person_csv(path, rows, rng):
+    pd.DataFrame({
+        'Person_ID': rng.integers(1, 1000, rows),
+        'Month': rng.choice([f'2024-{month:02d}' for month in range(1, 13)], rows),
+        'Salary (₹)': rng.uniform(2e4, 2e5, rows).round(2),
+        'Total Expenses (₹)': rng.uniform(1e4, 1e5, rows).round(2),
+        'Savings (₹)': rng.uniform(0, 5e4, rows).round(2),
+        'User Savings Goal (₹)': rng.uniform(1e4, 5e4, rows).round(2),
+        'Rent (₹)': rng.uniform(5e3, 5e4, rows).round(2),
+        'Electricity Bill (₹)': rng.uniform(500, 5000, rows).round(2),
+        'Water Bill (₹)': rng.uniform(100, 1000, rows).round(2),
+        'Grocery (₹)': rng.uniform(1e3, 1e4, rows).round(2),
+        'Transportation (₹)': rng.uniform(500, 5e3, rows).round(2),
+        'Entertainment (₹)': rng.uniform(0, 2e4, rows).round(2),
+        'Healthcare (₹)': rng.uniform(0, 1e4, rows).round(2),
+        'Miscellaneous (₹)': rng.uniform(0, 5e3, rows).round(2),
+        'Savings Improvement Tips': rng.choice(['Cook at home', 'Use public transport', 'Cancel unused subscriptions'], rows),
+        'Suggested Changes': rng.choice(['Reduce dining out', 'Switch to a cheaper phone plan'], rows),
+    }).to_csv(path, index=False)
+
+
+def write_datasets(directory, rows, seed=42):
+    """Write agriculture.csv, company.csv and person.csv with the given number of rows each"""
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    write_agriculture_csv(os.path.join(directory, 'agriculture.csv'), rows, rng)
+    write_company_csv(os.path.join(directory, 'company.csv'), rows, rng)
+    write_person_csv(os.path.join(directory, 'person.csv'), rows, rng)
+
+
+def populate_database(app, db, users_per_type, transactions_per_user, seed=42, days=3 * 365):
+    """Create users of every type with random transactions; returns (email, user_type) pairs"""
+    from app import Transaction, User, hash_password, rebuild_monthly_summary, rebuild_user_balances, upgrade_database
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    with app.app_context():
+        upgrade_database()
+        # Hashing is deliberately slow, so every synthetic user shares one hash
+        password_hash = hash_password(PASSWORD)
+        accounts = [(f'{user_type}{i}@bench.example.com', user_type)
+                    for user_type in USER_TYPES for i in range(users_per_type)]
+        db.session.execute(User.__table__.insert(), [
+            {'name': email.split('@')[0], 'email': email, 'password_hash': password_hash,
+             'user_type': user_type, 'created_at': now, 'is_active': True}
+            for email, user_type in accounts
+        ])
+        user_ids = [user_id for (user_id,) in db.session.query(User.id).order_by(User.id)]
+        for user_id in user_ids if transactions_per_user else ():
+            db.session.execute(Transaction.__table__.insert(), [
+                {'user_id': user_id,
+                 'amount_paise': rng.randint(1000, 5000000),
+                 'category': rng.choice(CATEGORIES),
+                 'description': None,
+                 'date': now - timedelta(seconds=rng.randint(0, days * 24 * 3600)),
+                 'transaction_type': rng.choice(('income', 'expense'))}
+                for _ in range(transactions_per_user)
+            ])
+        db.session.commit()
+        rebuild_monthly_summary()
+        rebuild_user_balances()
+    return accounts
@@ -1,14 +1,33 @@
 from datetime import datetime
-from app import db
+from sqlalchemy.ext.hybrid import hybrid_property
+from app import db, from_paise, to_paise, PAISE_PER_RUPEE
 
 class Transaction(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-    amount = db.Column(db.Float, nullable=False)
+    amount_paise = db.Column(db.BigInteger, nullable=False)
     category = db.Column(db.String(50))
     description = db.Column(db.String(200))
     transaction_type = db.Column(db.String(20), nullable=False)  # 'income' or 'expense'
 
+    __table_args__ = (
+        db.Index('ix_transaction_user_date', 'user_id', 'date'),
+        db.Index('ix_transaction_user_type_date', 'user_id', 'transaction_type', 'date', 'amount_paise'),
+        db.Index('ix_transaction_user_type_category', 'user_id', 'transaction_type', 'category', 'date', 'amount_paise'),
+    )
+
+    @hybrid_property
+    def amount(self):
+        return from_paise(self.amount_paise)
+
+    @amount.setter
+    def amount(self, value):
+        self.amount_paise = to_paise(value)
+
+    @amount.expression
+    def amount(cls):
+        return cls.amount_paise / float(PAISE_PER_RUPEE)
+
     def __repr__(self):
         return f'<Transaction {self.id}: {self.amount} - {self.category}>'
\ No newline at end of file
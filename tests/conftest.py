@@ -0,0 +1,125 @@
+"""Fixtures shared by the tests: a throwaway database and dataset directory and logged-in users.
+
+The database engine is created when app.py is imported, so DATABASE_URL and
+DATASET_DIR are pointed at a temporary directory before the import. The dataset
+CSVs are copied from tests/data so columnar conversions never land in the repo.
+"""
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import jinja2
+import pytest
+from dateutil.relativedelta import relativedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+WORK_DIR = tempfile.mkdtemp(prefix='finance-tests-')
+
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(WORK_DIR, 'finance.db')
+os.environ['DATASET_DIR'] = os.path.join(WORK_DIR, 'dataset')
+os.environ['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'  # keeps logins fast
+shutil.copytree(DATA_DIR, os.environ['DATASET_DIR'])
+sys.path.insert(0, ROOT)
+
+import app as finance  # noqa: E402
+
+PASSWORD = 'Test-passw0rd'
+
+# The templates are not part of the repo; these stand-ins show the flashed messages
+# the way the real templates do, so flashes are consumed when a page renders
+STUB_TEMPLATE = "{{ get_flashed_messages()|join('\\n') }}"
+TEMPLATES = ('farmer_dashboard.html', 'company_dashboard.html', 'individual_dashboard.html', 'login.html',
+             'register.html', 'user_type_selection.html', 'index.html', 'base.html')
+
+# (months before the current one, days into that month, type, category, amount in rupees)
+TRANSACTIONS = {
+    'farmer': [
+        (0, 0, 'income', 'Sales', '5000.00'),
+        (0, 0, 'expense', 'Seeds', '1200.50'),
+        (1, 4, 'expense', 'Fuel', '300.25'),
+        (2, 2, 'expense', 'Seeds', '799.75'),
+        (4, 9, 'income', 'Sales', '2500.00'),
+        (14, 1, 'expense', 'Labor', '100.00'),
+    ],
+    'company': [
+        (0, 0, 'income', 'Consulting', '90000.00'),
+        (0, 0, 'expense', 'Payroll', '45000.50'),
+        (1, 3, 'expense', 'Rent', '12000.25'),
+        (3, 5, 'income', 'Consulting', '30000.00'),
+        (3, 6, 'expense', 'Payroll', '41000.75'),
+    ],
+    'individual': [
+        (0, 0, 'income', 'Salary', '60000.00'),
+        (0, 0, 'expense', 'Grocery', '4500.50'),
+        (0, 0, 'expense', '', '250.25'),
+        (1, 2, 'expense', 'Rent', '15000.00'),
+        (1, 3, 'expense', 'Grocery', '3999.75'),
+        (2, 1, 'income', 'Salary', '58000.00'),
+    ],
+}
+
+
+def transaction_date(now, months_back, days):
+    """A date days into the month months_back before now's"""
+    return datetime(now.year, now.month, 1) - relativedelta(months=months_back) + timedelta(days=days, hours=1)
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = finance.app
+    if not os.path.isdir(os.path.join(app.root_path, app.template_folder)):
+        app.jinja_loader = jinja2.DictLoader({name: STUB_TEMPLATE for name in TEMPLATES})
+    with app.app_context():
+        finance.upgrade_database()
+    yield app
+    with app.app_context():
+        finance.db.session.remove()
+        finance.db.engine.dispose()
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def users(app):
+    """One user of each type with the TRANSACTIONS above; user type -> email"""
+    now = datetime.utcnow()
+    emails = {}
+    with app.app_context():
+        for user_type, transactions in TRANSACTIONS.items():
+            user = finance.User(name=user_type.title(), email=f'{user_type}@example.com', user_type=user_type)
+            user.password = PASSWORD
+            finance.db.session.add(user)
+            finance.db.session.flush()
+            for i, (months_back, days, transaction_type, category, amount) in enumerate(transactions):
+                finance.db.session.add(finance.Transaction(
+                    user_id=user.id, date=transaction_date(now, months_back, days) + timedelta(seconds=i),
+                    amount_paise=finance.to_paise(amount), category=category,
+                    description=f'{category} {i}', transaction_type=transaction_type))
+            emails[user_type] = user.email
+        finance.db.session.commit()
+        finance.rebuild_monthly_summary()
+        finance.rebuild_user_balances()
+    return emails
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(app):
+    """Each test starts without cached dashboards or dataset analytics"""
+    yield
+    finance.dashboard_cache().clear()
+    for function in (finance._agricultural_analytics, finance._company_analytics,
+                     finance._individual_analytics, finance._entity_analytics, finance.entity_index):
+        function.cache_clear()
+
+
+@pytest.fixture
+def login(app, users):
+    """Log a test client in as the user of a type"""
+    def login(user_type):
+        client = app.test_client()
+        response = client.post(f'/login/{user_type}', data={'email': users[user_type], 'password': PASSWORD})
+        assert response.status_code == 302
+        return client
+    return login
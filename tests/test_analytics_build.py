@@ -0,0 +1,43 @@
+"""Resuming `flask analytics build` from its checkpoint."""
+import json
+import os
+
+
+def build(app, output):
+    result = app.test_cli_runner().invoke(args=['analytics', 'build', str(output), '--batch-users', '1'])
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+def interrupt(output, **state):
+    """Make the checkpoint look like the build stopped part-way"""
+    checkpoint = f'{output}.checkpoint'
+    with open(checkpoint) as f:
+        saved = json.load(f)
+    saved.update(state, complete=False)
+    with open(checkpoint, 'w') as f:
+        json.dump(saved, f)
+
+
+def test_resume_without_output_starts_over(app, users, tmp_path):
+    output = tmp_path / 'users.jsonl'
+    build(app, output)
+    expected = output.read_text()
+    assert len(expected.splitlines()) == len(users)
+
+    interrupt(output)
+    os.remove(output)
+    assert 'starting over' in build(app, output)
+    assert output.read_text() == expected
+
+
+def test_resume_with_truncated_output_starts_over(app, users, tmp_path):
+    output = tmp_path / 'users.jsonl'
+    build(app, output)
+    expected = output.read_text()
+
+    interrupt(output)
+    with open(output, 'r+') as f:
+        f.truncate(10)
+    assert 'starting over' in build(app, output)
+    assert output.read_text() == expected
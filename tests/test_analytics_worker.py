@@ -0,0 +1,75 @@
+"""Dashboards served from background analytics snapshots."""
+import threading
+
+import pytest
+
+import app as finance
+
+
+@pytest.fixture
+def worker(app, monkeypatch):
+    """The analytics worker with the agricultural job held until the test releases it"""
+    release = threading.Event()
+    filename, compute = finance.ANALYTICS_DATASETS['agricultural']
+
+    def held_compute(csv_path, signature):
+        release.wait(10)
+        return compute(csv_path, signature)
+
+    monkeypatch.setitem(finance.ANALYTICS_DATASETS, 'agricultural', (filename, held_compute))
+    monkeypatch.setitem(app.config, 'ANALYTICS_WORKER_ENABLED', True)
+    monkeypatch.setitem(app.config, 'ANALYTICS_REFRESH_INTERVAL', 3600)
+    worker = finance.analytics_worker()
+    yield worker, release
+    release.set()
+    worker.stop()
+    app.extensions.pop('analytics_worker', None)
+
+
+def wait_for_snapshot(worker, dataset):
+    for _ in range(200):
+        if worker.snapshots.get(dataset) is not None:
+            return
+        threading.Event().wait(0.05)
+    raise AssertionError(f'No {dataset} snapshot was published')
+
+
+def test_cold_start_shows_computing_placeholder(app, login, worker):
+    worker, release = worker
+    client = login('farmer')
+    page = client.get('/dashboard').data
+    assert b'being computed' in page
+    assert b'Error loading' not in page
+    response = client.get('/api/v1/analytics/farm')
+    assert response.status_code == 503 and response.headers['Retry-After']
+
+    release.set()
+    wait_for_snapshot(worker, 'agricultural')
+    assert client.get('/dashboard').data.strip() == b''
+    assert client.get('/api/v1/analytics/farm').get_json()['data'] == finance.process_agricultural_data()
+
+
+def test_entity_analytics_come_from_the_worker(app, monkeypatch, worker):
+    worker, release = worker
+    entity_stats = finance.entity_stats
+    calls = []
+
+    def recorded_entity_stats(*args, **kwargs):
+        calls.append(threading.current_thread().name)
+        return entity_stats(*args, **kwargs)
+
+    monkeypatch.setattr(finance, 'entity_stats', recorded_entity_stats)
+    # Nothing is converted, indexed or accumulated on the request thread before the first snapshot
+    assert finance.process_agricultural_data('2') is None
+    assert calls == []
+
+    release.set()
+    wait_for_snapshot(worker, 'agricultural')
+    misses = finance.entity_index.cache_info().misses
+    data = finance.process_agricultural_data('2')
+    # The worker built the entity index; the request only looked the rows up
+    assert finance.entity_index.cache_info().misses == misses
+    assert data != finance.process_agricultural_data()
+
+    monkeypatch.setitem(app.config, 'ANALYTICS_WORKER_ENABLED', False)
+    assert finance.process_agricultural_data('2') == data
@@ -0,0 +1,16 @@
+"""Cached dashboards must never keep serving a failed load."""
+import app as finance
+
+
+def test_failed_load_is_not_cached_as_html(app, login, monkeypatch):
+    monkeypatch.setitem(app.config, 'DASHBOARD_CACHE_HTML', True)
+    client = login('farmer')
+    process_agricultural_data = finance.process_agricultural_data
+    monkeypatch.setattr(finance, 'process_agricultural_data', lambda entity_id=None: None)
+    assert b'Error loading agricultural data' in client.get('/dashboard').data
+
+    # The dataset recovers; the next request recomputes and that result is cached
+    monkeypatch.setattr(finance, 'process_agricultural_data', process_agricultural_data)
+    assert b'Error loading' not in client.get('/dashboard').data
+    monkeypatch.setattr(finance, 'build_dashboard_context', None)
+    assert b'Error loading' not in client.get('/dashboard').data
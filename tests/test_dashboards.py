@@ -0,0 +1,225 @@
+"""Dashboard figures pinned to what the original per-view dashboard code computed.
+
+The expected values were rendered by the dashboards as they were before the monthly
+rollup, running balances and shared aggregation engine existed, for the transactions in
+tests/conftest.py and the CSVs in tests/data. Expense trend labels depend on the
+current month, so only their amounts are pinned.
+"""
+from datetime import datetime
+
+import pytest
+from dateutil.relativedelta import relativedelta
+
+import app as finance
+from aggregation import aggregate, transaction_rows
+
+FARMER = {'farm_data': {'total_area': 4134.2,
+               'total_yield': 470.1,
+               'water_usage': 913338.3,
+               'crop_health': 22.7,
+               'crops': [{'name': 'Rice', 'growth_percentage': 100.0},
+                         {'name': 'Barley', 'growth_percentage': 85.0},
+                         {'name': 'Wheat', 'growth_percentage': 100.0},
+                         {'name': 'Cotton', 'growth_percentage': 72.0},
+                         {'name': 'Maize', 'growth_percentage': 68.6},
+                         {'name': 'Soybean', 'growth_percentage': 100.0},
+                         {'name': 'Tomato', 'growth_percentage': 100.0},
+                         {'name': 'Sugarcane', 'growth_percentage': 82.5}],
+               'fertilizer_usage': 77.8,
+               'pesticide_usage': 40.8,
+               'fertilizer_percentage': 18.8,
+               'pesticide_percentage': 19.8,
+               'water_efficiency': 0.1},
+ 'recommendations': [{'type': 'water',
+                      'priority': 'high',
+                      'message': 'Water efficiency is low. Consider implementing drip irrigation systems to reduce '
+                                 'water wastage and improve crop yield.',
+                      'action': 'Upgrade irrigation system to drip irrigation'},
+                     {'type': 'crop_health',
+                      'priority': 'high',
+                      'message': 'Overall crop health is poor. Review soil quality, nutrient levels, and pest '
+                                 'management practices.',
+                      'action': 'Conduct comprehensive crop health assessment'},
+                     {'type': 'fertilizer',
+                      'priority': 'medium',
+                      'message': 'Fertilizer usage is below optimal. Consider increasing fertilizer application to '
+                                 'improve crop yield.',
+                      'action': 'Increase fertilizer application'}],
+ 'transactions': [(1200.5, 'Seeds', 'expense', 'Seeds 1'),
+                  (5000.0, 'Sales', 'income', 'Sales 0'),
+                  (300.25, 'Fuel', 'expense', 'Fuel 2'),
+                  (799.75, 'Seeds', 'expense', 'Seeds 3'),
+                  (2500.0, 'Sales', 'income', 'Sales 4'),
+                  (100.0, 'Labor', 'expense', 'Labor 5')],
+ 'total_income': 7500.0,
+ 'total_expenses': 2400.5,
+ 'remaining_balance': 5099.5,
+ 'monthly_income': 5000.0,
+ 'monthly_expenses': 1200.5,
+ 'category_expenses': {'Seeds': 2000.25, 'Fuel': 300.25, 'Labor': 100.0}}
+
+COMPANY = {'company_data': {'total_revenue': 6158645.06,
+                  'total_expenses': 1581480.74,
+                  'net_profit': 4577164.32,
+                  'profit_margin': 74.3,
+                  'departments': [{'name': 'Sales', 'performance': 69.0, 'efficiency': 69.0, 'productivity': 69.0},
+                                  {'name': 'Operations', 'performance': 69.0, 'efficiency': 69.0, 'productivity': 69.0},
+                                  {'name': 'Marketing', 'performance': 69.0, 'efficiency': 69.0, 'productivity': 69.0},
+                                  {'name': 'Finance', 'performance': 69.0, 'efficiency': 69.0, 'productivity': 69.0}],
+                  'resource_utilization': 389.4,
+                  'employee_satisfaction': 74.0,
+                  'customer_satisfaction': 79.0,
+                  'revenue_growth': -35.4},
+ 'recommendations': [{'type': 'hr',
+                      'priority': 'high',
+                      'message': 'Employee satisfaction needs improvement. Review HR policies and work environment.',
+                      'action': 'Conduct employee satisfaction survey and implement improvements'},
+                     {'type': 'customer',
+                      'priority': 'high',
+                      'message': 'Customer satisfaction could be improved. Review customer service and product '
+                                 'quality.',
+                      'action': 'Implement customer feedback system'},
+                     {'type': 'department',
+                      'priority': 'medium',
+                      'message': 'Sales department performance is below target. Review operations and provide '
+                                 'necessary support.',
+                      'action': 'Review Sales department operations'},
+                     {'type': 'department',
+                      'priority': 'medium',
+                      'message': 'Operations department performance is below target. Review operations and provide '
+                                 'necessary support.',
+                      'action': 'Review Operations department operations'},
+                     {'type': 'department',
+                      'priority': 'medium',
+                      'message': 'Marketing department performance is below target. Review operations and provide '
+                                 'necessary support.',
+                      'action': 'Review Marketing department operations'},
+                     {'type': 'department',
+                      'priority': 'medium',
+                      'message': 'Finance department performance is below target. Review operations and provide '
+                                 'necessary support.',
+                      'action': 'Review Finance department operations'},
+                     {'type': 'growth',
+                      'priority': 'medium',
+                      'message': 'Revenue growth is slow. Consider new market opportunities and sales strategies.',
+                      'action': 'Develop revenue growth strategy'}],
+ 'transactions': [(45000.5, 'Payroll', 'expense', 'Payroll 1'),
+                  (90000.0, 'Consulting', 'income', 'Consulting 0'),
+                  (12000.25, 'Rent', 'expense', 'Rent 2'),
+                  (41000.75, 'Payroll', 'expense', 'Payroll 4'),
+                  (30000.0, 'Consulting', 'income', 'Consulting 3')],
+ 'total_income': 120000.0,
+ 'total_expenses': 98001.5,
+ 'remaining_balance': 21998.5,
+ 'monthly_income': 90000.0,
+ 'monthly_expenses': 45000.5}
+
+INDIVIDUAL = {'individual_data': {'monthly_income': 82441.23,
+                     'monthly_expenses': 55333.7,
+                     'monthly_savings': 29761.15,
+                     'savings_goal': 36497.85,
+                     'savings_rate': 36.1,
+                     'savings_growth': 86.2,
+                     'expense_breakdown': {'Rent': 22399.31,
+                                           'Utilities': 3374.33,
+                                           'Grocery': 6101.2,
+                                           'Transportation': 3168.9,
+                                           'Entertainment': 8163.56,
+                                           'Healthcare': 4302.51,
+                                           'Miscellaneous': 2614.73},
+                     'spending_pattern': [{'month': '2024-01', 'expenses': 83042.87, 'savings': 43140.46},
+                                          {'month': '2024-02', 'expenses': 96406.38, 'savings': 31937.5},
+                                          {'month': '2024-07', 'expenses': 38234.93, 'savings': 36102.37},
+                                          {'month': '2024-09', 'expenses': 64967.57, 'savings': 6456.9},
+                                          {'month': '2024-10', 'expenses': 69222.35, 'savings': 39856.35},
+                                          {'month': '2024-11', 'expenses': 61695.53, 'savings': 44131.04},
+                                          {'month': '2024-12', 'expenses': 86860.82, 'savings': 30466.71}],
+                     'improvement_tips': 'Cancel unused subscriptions',
+                     'suggested_changes': 'Switch to a cheaper phone plan'},
+ 'recommendations': [{'type': 'goal',
+                      'priority': 'high',
+                      'message': 'You are currently below your savings goal.',
+                      'action': 'Identify additional saving opportunities'},
+                     {'type': 'custom',
+                      'priority': 'medium',
+                      'message': 'Cancel unused subscriptions',
+                      'action': 'Switch to a cheaper phone plan'}],
+ 'transactions': [(250.25, '', 'expense', ' 2'),
+                  (4500.5, 'Grocery', 'expense', 'Grocery 1'),
+                  (60000.0, 'Salary', 'income', 'Salary 0'),
+                  (3999.75, 'Grocery', 'expense', 'Grocery 4'),
+                  (15000.0, 'Rent', 'expense', 'Rent 3'),
+                  (58000.0, 'Salary', 'income', 'Salary 5')],
+ 'total_income': 118000.0,
+ 'total_expenses': 23750.5,
+ 'remaining_balance': 94249.5,
+ 'monthly_income': 60000.0,
+ 'monthly_expenses': 4750.75,
+ 'category_expenses': {'Other': 250.25, 'Grocery': 8500.25, 'Rent': 15000.0}}
+
+FARMER_EXPENSE_TRENDS = [1200.5, 300.25, 799.75]
+
+
+def expense_trends(amounts):
+    month_start = datetime(datetime.utcnow().year, datetime.utcnow().month, 1)
+    return [{'month': (month_start - relativedelta(months=i)).strftime('%B %Y'), 'amount': amount}
+            for i, amount in enumerate(amounts)]
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Template contexts the dashboards render, in order"""
+    contexts = []
+    render_template = finance.render_template
+
+    def capture(template, **context):
+        contexts.append(context)
+        return render_template(template, **context)
+
+    monkeypatch.setattr(finance, 'render_template', capture)
+    return contexts
+
+
+def dashboard(client, rendered, path, expected):
+    """The pinned part of the context a dashboard page renders"""
+    assert client.get(path).status_code == 200
+    context = dict(rendered[-1])
+    context['transactions'] = [(t['amount'], t['category'], t['transaction_type'], t['description'])
+                               for t in context['transactions']]
+    return {key: context[key] for key in expected}
+
+
+@pytest.fixture(params=[True, False], ids=['columnar', 'csv'])
+def reader(request, app, monkeypatch):
+    monkeypatch.setitem(app.config, 'COLUMNAR_CACHE', request.param)
+
+
+def test_farmer_dashboard(login, rendered, reader):
+    expected = dict(FARMER, expense_trends=expense_trends(FARMER_EXPENSE_TRENDS))
+    assert dashboard(login('farmer'), rendered, '/dashboard', expected) == expected
+
+
+def test_company_dashboard(login, rendered, reader):
+    assert dashboard(login('company'), rendered, '/dashboard', COMPANY) == COMPANY
+
+
+@pytest.mark.parametrize('path', ['/dashboard', '/individual/dashboard'])
+def test_individual_dashboard(login, rendered, reader, path):
+    assert dashboard(login('individual'), rendered, path, INDIVIDUAL) == INDIVIDUAL
+
+
+@pytest.mark.parametrize('user_type', ['farmer', 'company', 'individual'])
+def test_rollup_matches_ledger(app, users, user_type):
+    default_category = 'Other' if user_type == 'individual' else None
+    with app.app_context():
+        user = finance.User.query.filter_by(email=users[user_type]).one()
+        summary = finance.summarize_transactions(user.id, default_category, trend_months=24)
+        transactions = finance.db.session.query(
+            finance.Transaction.date, finance.Transaction.transaction_type,
+            finance.Transaction.category, finance.Transaction.amount_paise
+        ).filter(finance.Transaction.user_id == user.id)
+        now = datetime.utcnow()
+        ledger = finance.summary_figures(aggregate(transaction_rows(transactions), now, default_category), now, 24)
+    assert summary == ledger
+    # Category order is by most recent use, which the two sources must agree on too
+    assert list(summary['category_expenses']) == list(ledger['category_expenses'])
@@ -0,0 +1,38 @@
+"""Dataset analytics read from the CSVs and from their columnar copies must agree."""
+import pytest
+
+import app as finance
+
+PROCESSORS = [finance.process_agricultural_data, finance.process_company_data, finance.process_individual_data]
+
+
+def analytics(app, monkeypatch, processor, entity_id, columnar, chunk_size=None):
+    monkeypatch.setitem(app.config, 'COLUMNAR_CACHE', columnar)
+    monkeypatch.setitem(app.config, 'CSV_CHUNK_SIZE', chunk_size)
+    with app.app_context():
+        return processor(entity_id)
+
+
+@pytest.mark.parametrize('processor', PROCESSORS)
+@pytest.mark.parametrize('entity_id', [None, '2'])
+@pytest.mark.parametrize('chunk_size', [None, 5])
+def test_columnar_matches_csv(app, monkeypatch, processor, entity_id, chunk_size):
+    columnar = analytics(app, monkeypatch, processor, entity_id, True, chunk_size)
+    assert columnar is not None
+    assert analytics(app, monkeypatch, processor, entity_id, False, chunk_size) == columnar
+
+
+def test_company_growth_uses_calendar_month_order(app, monkeypatch):
+    # December against November in the fixture CSV, whichever reader is used
+    for columnar in (True, False):
+        data = analytics(app, monkeypatch, finance.process_company_data, None, columnar)
+        assert data['revenue_growth'] == round((615999.45 - 953311.66) / 953311.66 * 100, 1)
+
+
+def test_readers_are_cached_apart(app, monkeypatch):
+    analytics(app, monkeypatch, finance.process_company_data, None, True)
+    analytics(app, monkeypatch, finance.process_company_data, None, False)
+    assert finance._company_analytics.cache_info().misses == 2
+    analytics(app, monkeypatch, finance.process_individual_data, '2', True)
+    analytics(app, monkeypatch, finance.process_individual_data, '2', False)
+    assert finance._entity_analytics.cache_info().misses == 2
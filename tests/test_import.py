@@ -0,0 +1,69 @@
+"""Bulk statement import: per-row validation and partial imports."""
+import io
+import json
+
+import pytest
+
+import app as finance
+
+
+@pytest.fixture
+def importer(app):
+    """A user with no transactions yet, removed again after the test"""
+    with app.app_context():
+        user = finance.User(name='Importer', email='importer@example.com', user_type='individual')
+        user.password = 'Test-passw0rd'
+        finance.db.session.add(user)
+        finance.db.session.commit()
+        user_id = user.id
+    yield user_id
+    with app.app_context():
+        for model in (finance.Transaction, finance.MonthlySummary, finance.UserBalance):
+            model.query.filter_by(user_id=user_id).delete()
+        finance.User.query.filter_by(id=user_id).delete()
+        finance.db.session.commit()
+
+
+def row(category='Grocery', **fields):
+    return dict({'date': '2024-03-01', 'amount': '10.50', 'category': category, 'transaction_type': 'expense'}, **fields)
+
+
+def test_rows_with_non_text_fields_are_reported(app, importer):
+    rows = [row(), row(['x']), row(description={'a': 1}), row(transaction_type=['expense']), row()]
+    with app.app_context():
+        report = finance.import_transactions(importer, rows)
+        assert report['imported'] == 2
+        assert [error['row'] for error in report['errors']] == [2, 3, 4]
+        assert finance.Transaction.query.filter_by(user_id=importer).count() == 2
+
+
+def test_failed_batch_reports_rows_already_saved(app, importer, monkeypatch):
+    record_balance = finance.record_balance
+    calls = []
+
+    def failing_record_balance(*args):
+        calls.append(args)
+        if len(calls) > 1:
+            raise RuntimeError('disk full')
+        record_balance(*args)
+
+    monkeypatch.setattr(finance, 'record_balance', failing_record_balance)
+    with app.app_context():
+        report = finance.import_transactions(importer, [row() for _ in range(5)], batch_size=2)
+        assert report['imported'] == 2
+        assert report['failure'] == 'disk full'
+        assert finance.Transaction.query.filter_by(user_id=importer).count() == 2
+
+
+def test_import_endpoint_reports_failed_batch(app, importer, monkeypatch):
+    def failing_record_balance(*args):
+        raise RuntimeError('disk full')
+
+    monkeypatch.setattr(finance, 'record_balance', failing_record_balance)
+    client = app.test_client()
+    client.post('/login/individual', data={'email': 'importer@example.com', 'password': 'Test-passw0rd'})
+    statement = io.BytesIO(json.dumps([row(), row(['x'])]).encode())
+    response = client.post('/import_transactions', data={'file': (statement, 'statement.json')})
+    assert response.status_code == 500
+    assert response.get_json()['imported'] == 0
+    assert response.get_json()['error_count'] == 1
@@ -0,0 +1,68 @@
+"""Running balances and the monthly rollup under concurrent first writes for a user."""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+import app as finance
+
+
+@pytest.fixture
+def newcomer(app):
+    """A user with no balance row yet, removed again after the test"""
+    with app.app_context():
+        user = finance.User(name='Newcomer', email='newcomer@example.com', user_type='individual')
+        user.password = 'Test-passw0rd'
+        finance.db.session.add(user)
+        finance.db.session.commit()
+        user_id = user.id
+    yield user_id
+    with app.app_context():
+        for model in (finance.MonthlySummary, finance.UserBalance):
+            model.query.filter_by(user_id=user_id).delete()
+        finance.User.query.filter_by(id=user_id).delete()
+        finance.db.session.commit()
+
+
+def concurrent_first_write(table, write):
+    """Run write() on the connection just before this session's first INSERT into table, as if
+    another request's first write for the same key landed between our lookup and our insert"""
+    done = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not done and statement.lstrip().upper().startswith(f'INSERT INTO {table.upper()}'):
+            done.append(True)
+            conn.exec_driver_sql(*write)
+
+    event.listen(finance.db.engine, 'before_cursor_execute', before_cursor_execute)
+    return lambda: event.remove(finance.db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def test_first_balance_write_applied_twice(app, newcomer):
+    with app.app_context():
+        remove = concurrent_first_write('user_balance', (
+            'INSERT INTO user_balance (user_id, income_paise, expense_paise, transaction_count) VALUES (?, 0, 1000, 1)',
+            (newcomer,)))
+        try:
+            finance.record_balance(newcomer, 'expense', 2500)
+            finance.db.session.commit()
+        finally:
+            remove()
+        balance = finance.db.session.get(finance.UserBalance, newcomer)
+        assert (balance.income_paise, balance.expense_paise, balance.transaction_count) == (0, 3500, 2)
+
+
+def test_first_monthly_summary_write_applied_twice(app, newcomer):
+    day = datetime(2024, 3, 10, 12)
+    with app.app_context():
+        remove = concurrent_first_write('monthly_summary', (
+            'INSERT INTO monthly_summary (user_id, year, month, transaction_type, category, total_paise, count, last_date) '
+            "VALUES (?, 2024, 3, 'expense', 'Grocery', 1000, 1, '2024-03-20 09:00:00.000000')", (newcomer,)))
+        try:
+            finance.record_monthly_summary(newcomer, day, 'expense', 'Grocery', 2500)
+            finance.db.session.commit()
+        finally:
+            remove()
+        rows = finance.MonthlySummary.query.filter_by(user_id=newcomer).all()
+        assert [(row.year, row.month, row.total_paise, row.count, row.last_date) for row in rows] == [
+            (2024, 3, 3500, 2, datetime(2024, 3, 20, 9))]
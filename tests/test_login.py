@@ -0,0 +1,24 @@
+"""Logins while the password hashing pool is busy."""
+import app as finance
+from conftest import PASSWORD
+
+
+def busy(*args, **kwargs):
+    raise finance.LoginBusy()
+
+
+def test_busy_rehash_still_logs_in(app, users, monkeypatch):
+    with app.app_context():
+        stored = finance.User.query.filter_by(email=users['farmer']).one().password_hash
+    monkeypatch.setattr(finance, 'password_needs_rehash', lambda password_hash: True)
+    monkeypatch.setattr(finance, 'hash_password', busy)
+    response = app.test_client().post('/login/farmer', data={'email': users['farmer'], 'password': PASSWORD})
+    assert response.status_code == 302
+    with app.app_context():
+        assert finance.User.query.filter_by(email=users['farmer']).one().password_hash == stored
+
+
+def test_busy_verification_is_turned_away(app, users, monkeypatch):
+    monkeypatch.setattr(finance, 'run_password_job', busy)
+    response = app.test_client().post('/login/farmer', data={'email': users['farmer'], 'password': PASSWORD})
+    assert response.status_code == 503
@@ -0,0 +1,44 @@
+"""Request timing, profiling and the metrics endpoint."""
+import copy
+
+import pytest
+from sqlalchemy import exc, text
+
+import app as finance
+
+
+def test_failed_statements_leave_no_query_timers(app):
+    with app.test_request_context('/'):
+        finance.start_request_timer()
+        connection = finance.db.session.connection()
+        info = {key: copy.copy(value) for key, value in connection.info.items()}
+        for _ in range(3):
+            with pytest.raises(exc.OperationalError):
+                connection.execute(text('SELECT * FROM no_such_table'))
+        connection.execute(text('SELECT 1'))
+        assert dict(connection.info) == info
+        assert 0 < finance.g.stage_timings['db'] < 1
+        finance.db.session.rollback()
+
+
+def test_profile_header_names_only_the_file(app, monkeypatch, tmp_path):
+    monkeypatch.setitem(app.config, 'PROFILING_ENABLED', True)
+    monkeypatch.setitem(app.config, 'PROFILE_DIR', str(tmp_path))
+    response = app.test_client().get('/', headers={'X-Profile': '1'})
+    name = response.headers['X-Profile-File']
+    assert name == name.rsplit('/', 1)[-1]
+    assert (tmp_path / name).is_file()
+
+
+def test_metrics_are_off_by_default(app):
+    assert app.test_client().get('/metrics').status_code == 404
+
+
+def test_metrics_require_the_token(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 's3cret')
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+    assert response.status_code == 200
+    assert b'app_request_duration_seconds' in response.data
@@ -0,0 +1,62 @@
+"""The date range analytics API against sums over the fixture transactions, and its request validation."""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from aggregation import BUCKETS, bucket_start
+from conftest import TRANSACTIONS, transaction_date
+
+
+def expected_buckets(user_type, start, end, bucket):
+    """bucket start -> (income, expenses) summed straight from the fixture transactions dated in [start, end]"""
+    now = datetime.utcnow()
+    buckets = {}
+    for i, (months_back, days, transaction_type, _, amount) in enumerate(TRANSACTIONS[user_type]):
+        day = (transaction_date(now, months_back, days) + timedelta(seconds=i)).date()
+        if start <= day <= end:
+            income, expenses = buckets.get(bucket_start(day, bucket), (Decimal(0), Decimal(0)))
+            if transaction_type == 'income':
+                income += Decimal(amount)
+            else:
+                expenses += Decimal(amount)
+            buckets[bucket_start(day, bucket)] = (income, expenses)
+    return {key.isoformat(): (float(income), float(expenses)) for key, (income, expenses) in buckets.items()}
+
+
+@pytest.mark.parametrize('bucket', BUCKETS)
+@pytest.mark.parametrize('user_type', ['farmer', 'company'])
+def test_buckets_match_transactions(login, user_type, bucket):
+    # Both ends fall mid-month, so the partial edge months and the rollup months are all read
+    end = datetime.utcnow().date()
+    start = date(end.year - 1, end.month, 1) - timedelta(days=20)
+    response = login(user_type).get('/api/v1/analytics/range', query_string={
+        'start': start.isoformat(), 'end': end.isoformat(), 'bucket': bucket})
+    assert response.status_code == 200
+    body = response.get_json()
+    buckets = {b['start']: (b['income'], b['expenses']) for b in body['buckets'] if b['income'] or b['expenses']}
+    assert buckets == expected_buckets(user_type, start, end, bucket)
+    assert body['total_income'] == sum(income for income, _ in buckets.values())
+    assert body['total_expenses'] == pytest.approx(sum(expenses for _, expenses in buckets.values()))
+
+
+@pytest.mark.parametrize('query', [
+    {'start': '2024-13-01'},
+    {'bucket': 'fortnight'},
+    {'start': '2024-02-01', 'end': '2024-01-31'},
+    {'start': '2000-01-01', 'end': '2024-12-31', 'bucket': 'day'},
+    {'start': '2024-01-01', 'end': '9999-12-31'},
+    {'start': '9999-12-01', 'end': '9999-12-31', 'bucket': 'year'},
+])
+def test_invalid_ranges_are_rejected(login, query):
+    response = login('farmer').get('/api/v1/analytics/range', query_string=query)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.mark.parametrize('bucket', BUCKETS)
+def test_latest_end_date(login, bucket):
+    response = login('farmer').get('/api/v1/analytics/range', query_string={
+        'start': '9998-12-01', 'end': '9998-12-31', 'bucket': bucket})
+    assert response.status_code == 200
+    assert response.get_json()['total_expenses'] == 0
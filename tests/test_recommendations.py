@@ -0,0 +1,30 @@
+"""The 'present' rule condition keeps the truthiness of the checks it replaced."""
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as finance
+
+TIPS = [('Cook at home', 'Plan weekly meals', True), (np.nan, np.nan, True), ('', 'Unused', False), (None, None, False)]
+
+
+def individual(tips, changes):
+    return dict(copy.deepcopy(finance.EMPTY_INDIVIDUAL_DATA), expense_breakdown={'Rent': 0, 'Entertainment': 0},
+                improvement_tips=tips, suggested_changes=changes)
+
+
+@pytest.mark.parametrize('tips, changes, fires', TIPS)
+def test_custom_tip_of_one_entity(tips, changes, fires):
+    custom = [r for r in finance.generate_individual_recommendations(individual(tips, changes)) if r['type'] == 'custom']
+    assert len(custom) == int(fires)
+    if fires:
+        assert [custom[0]['message'], custom[0]['action']] == pytest.approx([tips, changes], nan_ok=True)
+
+
+def test_custom_tips_in_batch():
+    metrics = pd.DataFrame([{name: finance.metric_value(individual(tips, changes), name)
+                             for name in finance.INDIVIDUAL_RULESET['metrics']} for tips, changes, _ in TIPS], dtype=object)
+    custom = finance.evaluate_recommendations(finance.INDIVIDUAL_RULESET, metrics).query("type == 'custom'")
+    assert list(custom['entity']) == [i for i, (_, _, fires) in enumerate(TIPS) if fires]
@@ -0,0 +1,74 @@
+"""Keyset pagination of /api/transactions."""
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as finance
+from conftest import PASSWORD
+
+
+@pytest.fixture
+def pager(app):
+    """(client, ids newest first) of a logged-in user whose transactions share dates in groups of four"""
+    with app.app_context():
+        user = finance.User(name='Pager', email='pager@example.com', user_type='individual')
+        user.password = PASSWORD
+        finance.db.session.add(user)
+        finance.db.session.flush()
+        start = datetime(2024, 5, 1, 9)
+        transactions = [finance.Transaction(
+            user_id=user.id, date=start + timedelta(days=i // 4), amount_paise=100 + i, category='Grocery',
+            description=f'Grocery {i}', transaction_type='expense') for i in range(23)]
+        finance.db.session.add_all(transactions)
+        finance.db.session.commit()
+        user_id = user.id
+        ids = [t.id for t in sorted(transactions, key=lambda t: (t.date, t.id), reverse=True)]
+    client = app.test_client()
+    assert client.post('/login/individual', data={'email': 'pager@example.com', 'password': PASSWORD}).status_code == 302
+    yield client, ids
+    with app.app_context():
+        finance.Transaction.query.filter_by(user_id=user_id).delete()
+        finance.User.query.filter_by(id=user_id).delete()
+        finance.db.session.commit()
+
+
+@pytest.mark.parametrize('limit', [1, 3, 4, 5, 23, 50])
+def test_walk_returns_every_transaction_once(pager, limit):
+    client, ids = pager
+    seen = []
+    cursor = None
+    while True:
+        query = {'limit': limit, 'cursor': cursor} if cursor else {'limit': limit}
+        body = client.get('/api/transactions', query_string=query).get_json()
+        assert 0 < len(body['transactions']) <= limit
+        seen += [t['id'] for t in body['transactions']]
+        cursor = body['next_cursor']
+        if cursor is None:
+            break
+    assert seen == ids
+
+
+@pytest.mark.parametrize('limit, size', [(0, 1), (-5, 1), (7, 7), (1000, 10), ('many', 10)])
+def test_limit_is_bounded(app, pager, monkeypatch, limit, size):
+    monkeypatch.setitem(app.config, 'TRANSACTIONS_PAGE_SIZE', 10)
+    monkeypatch.setitem(app.config, 'TRANSACTIONS_MAX_PAGE_SIZE', 10)
+    client, ids = pager
+    body = client.get('/api/transactions', query_string={'limit': limit}).get_json()
+    assert [t['id'] for t in body['transactions']] == ids[:size]
+    assert body['next_cursor'] is not None
+
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor',
+    '%%%',
+    base64.urlsafe_b64encode(b'2024-05-01T09:00:00').decode(),
+    base64.urlsafe_b64encode(b'yesterday|12').decode(),
+    base64.urlsafe_b64encode(b'2024-05-01T09:00:00|twelve').decode(),
+    base64.urlsafe_b64encode(b'\xff\xfe|1').decode(),
+])
+def test_malformed_cursor_is_rejected(pager, cursor):
+    client, _ = pager
+    response = client.get('/api/transactions', query_string={'cursor': cursor})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor'}
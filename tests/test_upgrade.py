@@ -0,0 +1,44 @@
+"""Upgrading the shipped baseline database in place."""
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The engine is created when app.py is imported, so the upgrade runs in a fresh interpreter
+UPGRADE = 'from app import app, upgrade_database\nwith app.app_context():\n    upgrade_database()\n'
+
+
+def upgrade(database):
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{database}')
+    subprocess.run([sys.executable, '-c', UPGRADE], cwd=ROOT, env=env, check=True, capture_output=True)
+
+
+def test_upgrade_baseline_database(tmp_path):
+    database = tmp_path / 'finance.db'
+    shutil.copy(os.path.join(ROOT, 'finance.db'), database)
+    with sqlite3.connect(database) as connection:
+        connection.execute("INSERT INTO user (id, name, email, password_hash, user_type) "
+                           "VALUES (100, 'Old', 'old@example.com', 'x', 'individual')")
+        connection.executemany(
+            'INSERT INTO "transaction" (user_id, amount, category, date, transaction_type) VALUES (100, ?, ?, ?, ?)',
+            [(1000.1, 'Salary', '2024-01-05 10:00:00', 'income'),
+             (250.2, 'Grocery', '2024-01-06 10:00:00', 'expense'),
+             (99.99, 'Grocery', '2024-02-01 10:00:00', 'expense')])
+
+    upgrade(database)
+    upgrade(database)  # a second run has nothing left to do
+
+    with sqlite3.connect(database) as connection:
+        columns = {row[1] for row in connection.execute('PRAGMA table_info("transaction")')}
+        assert 'amount_paise' in columns and 'amount' not in columns
+        assert sorted(row[0] for row in connection.execute('SELECT amount_paise FROM "transaction" WHERE user_id = 100')) == [9999, 25020, 100010]
+        assert sorted(connection.execute(
+            'SELECT year, month, transaction_type, category, total_paise, count FROM monthly_summary WHERE user_id = 100')) == [
+            (2024, 1, 'expense', 'Grocery', 25020, 1), (2024, 1, 'income', 'Salary', 100010, 1),
+            (2024, 2, 'expense', 'Grocery', 9999, 1)]
+        assert connection.execute(
+            'SELECT income_paise, expense_paise, transaction_count FROM user_balance WHERE user_id = 100').fetchone() == (100010, 35019, 3)
+        assert 'dataset_id' in {row[1] for row in connection.execute('PRAGMA table_info(user)')}